@@ -41,15 +41,11 @@ class Command(BaseCommand):
             team='PROJECT_MANAGER'
         )
         
-        notifications_created = 0
-        
-        for manager in managers:
-            # Create attendance session notification
-            NotificationMixin.notify_attendance_session_created(
-                manager, session_name, session_date
-            )
-            notifications_created += 1
-            
+        # One bulk insert for every manager
+        notifications_created = NotificationMixin.notify_attendance_session_created(
+            managers, session_name, session_date
+        )
+
         self.stdout.write(
             self.style.SUCCESS(
                 f'Successfully created attendance session "{session_name}" '
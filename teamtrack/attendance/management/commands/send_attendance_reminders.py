@@ -31,13 +31,9 @@ class Command(BaseCommand):
         # Get all active team members
         team_members = User.objects.filter(is_active=True)
         
-        notifications_created = 0
-        
-        for member in team_members:
-            # Create attendance reminder notification
-            NotificationMixin.notify_attendance_reminder(member, reminder_date)
-            notifications_created += 1
-            
+        # One bulk insert for every member
+        notifications_created = NotificationMixin.notify_attendance_reminder(team_members, reminder_date)
+
         self.stdout.write(
             self.style.SUCCESS(
                 f'Successfully sent {notifications_created} attendance reminders for {reminder_date}'
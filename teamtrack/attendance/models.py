@@ -18,6 +18,9 @@ class AttendanceRecord(models.Model):
     class Meta:
         app_label = 'attendance'
         unique_together = ['member', 'date']
+        indexes = [
+            models.Index(fields=['date', 'status'], name='attendance_date_status_idx'),
+        ]
         ordering = ['-date', 'member__name']
     
     def __str__(self):
@@ -1,3 +1,146 @@
+from datetime import date
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from notifications.models import Notification
+from .models import AttendanceRecord
+
+
+def add_members(count, start=0):
+    User.objects.bulk_create([
+        User(email=f'member{i}@example.com', name=f'Member {i}', team='TECH')
+        for i in range(start, start + count)
+    ])
+
+
+class MarkAttendanceTests(TestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user(
+            email='pm@example.com', password='pass1234', name='PM', team='PROJECT_MANAGER'
+        )
+        self.client.force_login(self.manager)
+        self.url = reverse('attendance:mark')
+
+    def mark(self, present_ids, day='2025-10-01'):
+        return self.client.post(self.url, {'date': day, 'present_users[]': [str(pk) for pk in present_ids]})
+
+    def test_marks_and_upserts(self):
+        add_members(3)
+        members = list(User.objects.exclude(pk=self.manager.pk))
+
+        response = self.mark([members[0].pk])
+        self.assertEqual(response.json(), {
+            'success': True,
+            'message': 'Attendance marked for 2025-10-01',
+            'present_count': 1,
+            'total_count': 4,
+        })
+        self.assertEqual(AttendanceRecord.objects.filter(date=date(2025, 10, 1), status='Present').count(), 1)
+
+        # Marking the same day again updates in place
+        self.mark([members[1].pk, members[2].pk])
+        records = AttendanceRecord.objects.filter(date=date(2025, 10, 1))
+        self.assertEqual(records.count(), 4)
+        self.assertEqual(
+            set(records.filter(status='Present').values_list('member_id', flat=True)),
+            {members[1].pk, members[2].pk},
+        )
+        # One notification per member plus the manager summary, per marking
+        self.assertEqual(Notification.objects.count(), 2 * (4 + 1))
+
+    def test_rejects_invalid_date(self):
+        response = self.mark([], day='01/10/2025')
+        self.assertEqual(response.status_code, 400)
+
+    def test_members_cannot_mark(self):
+        add_members(1)
+        self.client.force_login(User.objects.get(email='member0@example.com'))
+        self.assertEqual(self.mark([]).status_code, 403)
+
+
+class MarkAttendanceBenchmarkTests(TestCase):
+    """Query count for marking attendance must not grow with headcount"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(
+            email='pm@example.com', password='pass1234', name='PM', team='PROJECT_MANAGER'
+        )
+        self.client.force_login(self.manager)
+
+    def queries_for_marking(self, day):
+        present = User.objects.values_list('pk', flat=True)[:5]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                reverse('attendance:mark'),
+                {'date': day, 'present_users[]': [str(pk) for pk in present]},
+            )
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_query_count_is_constant(self):
+        # Sizes stay under the smallest backend batch limit (SQLite's
+        # 999 parameters), above which bulk_create splits into batches.
+        add_members(10)
+        small = self.queries_for_marking('2025-10-01')
+        add_members(140, start=10)
+        large = self.queries_for_marking('2025-10-02')
+        self.assertEqual(small, large)
+        self.assertEqual(AttendanceRecord.objects.filter(date=date(2025, 10, 2)).count(), 151)
+
+
+class AttendanceListTests(TestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user(
+            email='pm@example.com', password='pass1234', name='PM', team='PROJECT_MANAGER'
+        )
+        add_members(4)
+        self.members = list(User.objects.exclude(pk=self.manager.pk))
+        self.client.force_login(self.manager)
+
+    def add_days(self, start, count):
+        AttendanceRecord.objects.bulk_create([
+            AttendanceRecord(
+                member=member,
+                date=date.fromordinal(start.toordinal() - offset),
+                status='Present' if index % 2 else 'Absent',
+            )
+            for offset in range(count)
+            for index, member in enumerate(self.members)
+        ])
+
+    def test_one_window_with_daily_totals(self):
+        self.add_days(date(2025, 10, 31), 10)
+        response = self.client.get(reverse('attendance:list'))
+        days = response.context['attendance_days']
+        self.assertEqual(len(days), 7)
+        self.assertEqual(days[0]['date'], date(2025, 10, 31))
+        self.assertEqual((days[0]['present'], days[0]['absent'], days[0]['late']), (2, 2, 0))
+        self.assertEqual(len(days[0]['records']), 4)
+        # The summary counts the window's records, not the whole history
+        self.assertEqual(response.context['total_records'], 28)
+        self.assertEqual(response.context['active_members'], 2)
+        self.assertIsNone(response.context['newer_after'])
+
+        older = response.context['older_before']
+        response = self.client.get(reverse('attendance:list'), {'before': older.isoformat()})
+        days = response.context['attendance_days']
+        self.assertEqual([d['date'] for d in days], [date(2025, 10, 24), date(2025, 10, 23), date(2025, 10, 22)])
+        self.assertEqual(response.context['total_records'], 12)
+        self.assertIsNone(response.context['older_before'])
+
+        response = self.client.get(reverse('attendance:list'), {'after': response.context['newer_after'].isoformat()})
+        self.assertEqual(response.context['attendance_days'][-1]['date'], date(2025, 10, 25))
 
-# Create your tests here.
+    def test_query_count_independent_of_history(self):
+        self.add_days(date(2025, 10, 31), 7)
+        with CaptureQueriesContext(connection) as short_history:
+            self.client.get(reverse('attendance:list'))
+        self.add_days(date(2025, 10, 24), 60)
+        with CaptureQueriesContext(connection) as long_history:
+            response = self.client.get(reverse('attendance:list'))
+        self.assertEqual(len(response.context['attendance_days']), 7)
+        self.assertEqual(len(short_history.captured_queries), len(long_history.captured_queries))
@@ -3,9 +3,39 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from django.utils import timezone
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils.dateparse import parse_date
 from .models import AttendanceRecord
 from accounts.models import User
+from notifications.services import NotificationBatch
+from core.versioned_cache import bump
+
+DAYS_PER_PAGE = 7
+
+
+def date_window(records, before=None, after=None, days=DAYS_PER_PAGE):
+    """
+    Return (dates, older, newer) for one page of distinct record dates, newest first.
+    older/newer are the boundary dates to link to, or None at either end.
+    """
+    dates = records.order_by().values_list('date', flat=True).distinct()
+    if after:
+        window = list(dates.filter(date__gt=after).order_by('date')[:days + 1])
+        has_newer = len(window) > days
+        window = window[:days][::-1]
+        has_older = True
+    else:
+        if before:
+            dates = dates.filter(date__lt=before)
+        window = list(dates.order_by('-date')[:days + 1])
+        has_older = len(window) > days
+        window = window[:days]
+        has_newer = before is not None
+    if not window:
+        return [], None, None
+    return window, window[-1] if has_older else None, window[0] if has_newer else None
+
 
 @login_required
 def attendance_list(request):
@@ -16,30 +46,68 @@ def attendance_list(request):
     
     if is_manager_or_admin:
         # Managers/admins can see all attendance records
-        records = AttendanceRecord.objects.all().order_by('-date', 'member__name')
+        records = AttendanceRecord.objects.all()
         team_members = User.objects.filter(is_active=True)
         total_members = team_members.count()
-        active_members = team_members.filter(attendance_records__status='Present').distinct().count()
     else:
         # Regular members can only see their own attendance records
-        records = AttendanceRecord.objects.filter(member=request.user).order_by('-date')
+        records = AttendanceRecord.objects.filter(member=request.user)
         team_members = User.objects.filter(id=request.user.id)
         total_members = 1
-        active_members = 1 if records.filter(status='Present').exists() else 0
     
-    # Group records by date
-    attendance_by_date = {}
-    for record in records:
-        date_key = record.date.strftime('%Y-%m-%d')
-        if date_key not in attendance_by_date:
-            attendance_by_date[date_key] = []
-        attendance_by_date[date_key].append(record)
+    # One window of days at a time, newest first
+    dates, older, newer = date_window(
+        records,
+        before=parse_date(request.GET.get('before', '')),
+        after=parse_date(request.GET.get('after', '')),
+    )
+    window_records = records.filter(date__in=dates)
+    
+    # Per-day totals computed in the database
+    day_totals = {
+        row['date']: row
+        for row in window_records.order_by().values('date').annotate(
+            records=Count('id'),
+            present=Count('id', filter=Q(status='Present')),
+            absent=Count('id', filter=Q(status='Absent')),
+            late=Count('id', filter=Q(status='Late')),
+        )
+    }
+    
+    # Summary cards cover the window too, so no query scans the whole history
+    total_records = sum(row['records'] for row in day_totals.values())
+    if is_manager_or_admin:
+        active_members = window_records.aggregate(
+            active_members=Count(
+                'member', distinct=True, filter=Q(status='Present', member__is_active=True)
+            ),
+        )['active_members']
+    else:
+        active_members = 1 if any(row['present'] for row in day_totals.values()) else 0
+    
+    # Group the window's records by date
+    records_by_date = {day: [] for day in dates}
+    for record in window_records.select_related('member').order_by('-date', 'member__name'):
+        records_by_date[record.date].append(record)
+    
+    attendance_days = [
+        {
+            'date': day,
+            'records': records_by_date[day],
+            'present': day_totals.get(day, {}).get('present', 0),
+            'absent': day_totals.get(day, {}).get('absent', 0),
+            'late': day_totals.get(day, {}).get('late', 0),
+        }
+        for day in dates
+    ]
     
     context = {
-        'attendance_by_date': attendance_by_date,
+        'attendance_days': attendance_days,
+        'older_before': older,
+        'newer_after': newer,
         'team_members': team_members,
         'total_members': total_members,
-        'total_records': records.count(),
+        'total_records': total_records,
         'active_members': active_members,
         'is_manager_or_admin': is_manager_or_admin,
     }
@@ -58,45 +126,47 @@ def mark_attendance(request):
         if not date:
             return JsonResponse({'error': 'Date is required.'}, status=400)
         
+        attendance_date = parse_date(date)
+        if attendance_date is None:
+            return JsonResponse({'error': 'Date must be in YYYY-MM-DD format.'}, status=400)
+        
         # Get all team members
-        team_members = User.objects.filter(is_active=True)
+        member_ids = list(User.objects.filter(is_active=True).values_list('id', flat=True))
+        present_ids = set(present_user_ids)
         
-        # Create/update attendance records
-        for member in team_members:
-            status = 'Present' if str(member.id) in present_user_ids else 'Absent'
-            AttendanceRecord.objects.update_or_create(
-                member=member,
-                date=date,
-                defaults={'status': status}
-            )
-            
-            # Create notification for each member
-            try:
-                from notifications.models import Notification
-                Notification.objects.create(
-                    user=member,
-                    message=f'Attendance marked: {status} on {date}',
-                    notification_type='attendance'
-                )
-            except ImportError:
-                pass
+        records = []
+        present_members, absent_members = [], []
+        for member_id in member_ids:
+            status = 'Present' if str(member_id) in present_ids else 'Absent'
+            records.append(AttendanceRecord(member_id=member_id, date=attendance_date, status=status))
+            (present_members if status == 'Present' else absent_members).append(member_id)
+        
+        # Per-member notifications plus a summary for the manager
+        notifications = NotificationBatch()
+        notifications.add(present_members, 'Attendance marked: Present on {date}', date=date)
+        notifications.add(absent_members, 'Attendance marked: Absent on {date}', date=date)
+        notifications.add(
+            request.user, 'Attendance marked for {date}: {present}/{total} present',
+            date=date, present=len(present_user_ids), total=len(member_ids),
+        )
         
-        # Create summary notification for manager
-        try:
-            from notifications.models import Notification
-            Notification.objects.create(
-                user=request.user,
-                message=f'Attendance marked for {date}: {len(present_user_ids)}/{team_members.count()} present',
-                notification_type='attendance_summary'
+        # Upsert every record and insert all notifications in one transaction
+        with transaction.atomic():
+            AttendanceRecord.objects.bulk_create(
+                records,
+                update_conflicts=True,
+                unique_fields=['member', 'date'],
+                update_fields=['status', 'updated_at'],
             )
-        except ImportError:
-            pass
+            # bulk_create sends no post_save, so invalidate cached dashboards here
+            bump('attendance')
+            notifications.send()
         
         return JsonResponse({
             'success': True,
             'message': f'Attendance marked for {date}',
             'present_count': len(present_user_ids),
-            'total_count': team_members.count()
+            'total_count': len(member_ids)
         })
     
     # GET request - show the marking interface
@@ -105,7 +175,9 @@ def mark_attendance(request):
     
     # Get existing attendance for today
     existing_records = AttendanceRecord.objects.filter(date=today)
-    present_user_ids = [str(record.member.id) for record in existing_records.filter(status='Present')]
+    present_user_ids = [
+        str(member_id) for member_id in existing_records.filter(status='Present').values_list('member_id', flat=True)
+    ]
     
     context = {
         'team_members': team_members,
@@ -0,0 +1,261 @@
+"""
+Streaming CSV/XLSX exports of tasks, comments and attendance
+
+Rows come from values_list(...).iterator(chunk_size=CHUNK_SIZE): no model
+instances are built and, on PostgreSQL, a server-side cursor hands them
+over a chunk at a time, so memory stays flat however many rows there are.
+The writers are generators of bytes meant for StreamingHttpResponse or a
+file. XLSX is written without a third-party library: one worksheet of
+inline strings, zipped as it is produced.
+"""
+import csv
+import re
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from django.apps import apps
+from django.utils import timezone
+
+# Rows fetched per round trip
+CHUNK_SIZE = 2000
+
+# Rows per chunk handed to the response
+FLUSH_ROWS = 500
+
+# Excel stops reading a sheet here (including the header row)
+XLSX_MAX_ROWS = 1048576
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+@dataclass(frozen=True)
+class Dataset:
+    model: str
+    # (header, values_list path) pairs
+    columns: tuple
+    # Lookups the date range and the team filter apply to
+    date_field: str
+    team_field: str
+
+    @property
+    def headers(self):
+        return [header for header, _ in self.columns]
+
+
+DATASETS = {
+    'tasks': Dataset(
+        model='tasks.Task',
+        columns=(
+            ('ID', 'id'), ('Title', 'title'), ('Description', 'description'), ('Status', 'status'),
+            ('Priority', 'priority'), ('Team', 'team'), ('Due date', 'due_date'),
+            ('Assigned to', 'assigned_to__name'), ('Assignee email', 'assigned_to__email'),
+            ('Assigned by', 'assigned_by__name'), ('Assigner email', 'assigned_by__email'),
+            ('Created at', 'created_at'), ('Updated at', 'updated_at'),
+        ),
+        date_field='created_at__date',
+        team_field='team',
+    ),
+    'comments': Dataset(
+        model='tasks.TaskComment',
+        columns=(
+            ('ID', 'id'), ('Task ID', 'task_id'), ('Task', 'task__title'), ('Author', 'author__name'),
+            ('Type', 'comment_type'), ('Message', 'message'), ('Created at', 'created_at'),
+        ),
+        date_field='created_at__date',
+        team_field='task__team',
+    ),
+    'attendance': Dataset(
+        model='attendance.AttendanceRecord',
+        columns=(
+            ('Date', 'date'), ('Member', 'member__name'), ('Email', 'member__email'),
+            ('Team', 'member__team'), ('Status', 'status'),
+        ),
+        date_field='date',
+        team_field='member__team',
+    ),
+}
+
+
+def export_rows(kind, date_from=None, date_to=None, team=None):
+    """Iterator of value tuples for DATASETS[kind], filtered by an inclusive date range and team"""
+    dataset = DATASETS[kind]
+    queryset = apps.get_model(dataset.model).objects.all()
+    if date_from:
+        queryset = queryset.filter(**{f'{dataset.date_field}__gte': date_from})
+    if date_to:
+        queryset = queryset.filter(**{f'{dataset.date_field}__lte': date_to})
+    if team:
+        queryset = queryset.filter(**{dataset.team_field: team})
+    # Primary key order keeps the scan on an index and the output stable
+    paths = [path for _, path in dataset.columns]
+    return queryset.order_by('pk').values_list(*paths).iterator(chunk_size=CHUNK_SIZE)
+
+
+def export(kind, fmt, **filters):
+    """Bytes chunks of the whole export in fmt ('csv' or 'xlsx')"""
+    writer = write_xlsx if fmt == 'xlsx' else write_csv
+    return writer(DATASETS[kind].headers, export_rows(kind, **filters), sheet_name=kind.title())
+
+
+def cell_text(value, tz):
+    """Text for one cell; aware datetimes are shown in tz, since spreadsheets have no time zones"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(tz)
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)
+
+
+# A spreadsheet reads a CSV cell starting with one of these as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def csv_cell(value, tz):
+    """
+    cell_text, with user-entered text that would start a formula prefixed
+    with ' so Excel shows it rather than running it (XLSX cells are inline
+    strings and never formulas)
+    """
+    text = cell_text(value, tz)
+    if isinstance(value, str) and text.startswith(FORMULA_PREFIXES):
+        return "'" + text
+    return text
+
+
+def unquote_csv_cell(text):
+    """Undo csv_cell's quoting, so an export reads back as it was (tasks.imports)"""
+    if text.startswith("'") and text[1:].startswith(FORMULA_PREFIXES):
+        return text[1:]
+    return text
+
+
+class Echo:
+    """File-like object that hands back what is written, for csv.writer"""
+    def write(self, value):
+        return value
+
+
+def write_csv(headers, rows, sheet_name=None, batch=FLUSH_ROWS):
+    """UTF-8 CSV with a BOM so Excel detects the encoding; yields a chunk per batch of rows"""
+    writer = csv.writer(Echo())
+    # Looked up once; it is a context-local read per call
+    tz = timezone.get_current_timezone()
+    yield ('\ufeff' + writer.writerow(headers)).encode()
+    lines = []
+    for row in rows:
+        lines.append(writer.writerow([csv_cell(value, tz) for value in row]))
+        if len(lines) >= batch:
+            yield ''.join(lines).encode()
+            lines = []
+    if lines:
+        yield ''.join(lines).encode()
+
+
+# Characters XML 1.0 cannot carry at all
+ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_END = '</sheetData></worksheet>'
+
+
+class Drain:
+    """Unseekable sink for ZipFile; what has been written so far is taken with drain()"""
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def xlsx_row(values, tz):
+    cells = []
+    for value in values:
+        if isinstance(value, int) and not isinstance(value, bool):
+            cells.append(f'<c><v>{value}</v></c>')
+        else:
+            text = escape(ILLEGAL_XML.sub('', cell_text(value, tz)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row>{"".join(cells)}</row>'
+
+
+def write_xlsx(headers, rows, sheet_name='Export', batch=FLUSH_ROWS):
+    """
+    Single-sheet workbook; yields compressed chunks as rows are added.
+    Rows past Excel's limit are dropped rather than producing a file it won't open.
+    """
+    sink = Drain()
+    tz = timezone.get_current_timezone()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content.replace('{sheet_name}', escape(sheet_name[:31])))
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((SHEET_START + xlsx_row(headers, tz)).encode())
+            written = 1
+            lines = []
+            for row in rows:
+                if written >= XLSX_MAX_ROWS:
+                    break
+                lines.append(xlsx_row(row, tz))
+                written += 1
+                if len(lines) >= batch:
+                    sheet.write(''.join(lines).encode())
+                    lines = []
+                    yield sink.drain()
+            sheet.write((''.join(lines) + SHEET_END).encode())
+    yield sink.drain()
@@ -0,0 +1,129 @@
+import json
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+
+class WorkerSessionStore(cached_db.SessionStore):
+    """cached_db sessions read through a given cache instance (one per simulated worker)"""
+
+    def __init__(self, cache, session_key=None):
+        super().__init__(session_key)
+        self._cache = cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare cached_db session lookup latency across CACHE_PROFILES while '
+        'requests are spread over several simulated gunicorn workers'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', default='locmem,file,db,redis,memcached',
+                            help='Comma-separated CACHE_PROFILES to try; unreachable ones are skipped')
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Simulated worker processes (default 4)')
+        parser.add_argument('--sessions', type=int, default=200,
+                            help='Sessions created per profile (default 200)')
+        parser.add_argument('--lookups', type=int, default=2000,
+                            help='Session loads timed per profile (default 2000)')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['sessions'] < 1:
+            raise CommandError('--workers and --sessions must be >= 1')
+
+        results = []
+        for profile in options['profiles'].split(','):
+            profile = profile.strip()
+            if profile not in settings.CACHE_PROFILES:
+                raise CommandError(f'Unknown cache profile "{profile}"')
+            try:
+                workers = self.worker_caches(profile, options['workers'])
+            except Exception as e:
+                if not options['json']:
+                    self.stdout.write(self.style.WARNING(f'⏭️  {profile}: unavailable ({e})'))
+                continue
+            results.append(self.run(profile, workers, options))
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"\n{'profile':<10} {'hit %':>6} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+        for row in results:
+            self.stdout.write(
+                f"{row['profile']:<10} {row['hit_rate']:>6.1f} {row['p50_ms']:>8.3f} "
+                f"{row['p95_ms']:>8.3f} {row['mean_ms']:>8.3f}"
+            )
+
+    def worker_caches(self, profile, count):
+        """
+        One cache instance per simulated worker. locmem instances get separate
+        locations, since each real worker process has its own memory; shared
+        profiles all point at the same store.
+        """
+        config = dict(settings.CACHE_PROFILES[profile])
+        if profile == 'file':
+            config['LOCATION'] = tempfile.mkdtemp(prefix='session-bench-')
+        if profile == 'db':
+            call_command('createcachetable', config['LOCATION'], verbosity=0)
+
+        backend = import_string(config['BACKEND'])
+        caches = []
+        for index in range(count):
+            location = f"{config['LOCATION']}-worker{index}" if profile == 'locmem' else config['LOCATION']
+            caches.append(backend(location, {**config, 'TIMEOUT': 300}))
+
+        # Fail early if the server behind the profile isn't reachable
+        caches[0].set('session-bench-ping', 1, 5)
+        if caches[-1].get('session-bench-ping') != 1 and profile != 'locmem':
+            raise RuntimeError('cache did not return a written value')
+        return caches
+
+    def run(self, profile, workers, options):
+        # Each login happens on one worker, which caches the session it writes
+        keys = []
+        for index in range(options['sessions']):
+            store = WorkerSessionStore(workers[index % len(workers)])
+            store['user_id'] = index
+            store.create()
+            keys.append(store.session_key)
+
+        # The load balancer sends each following request to any worker
+        timings = []
+        hits = 0
+        rng = random.Random(0)
+        for _ in range(options['lookups']):
+            cache = rng.choice(workers)
+            store = WorkerSessionStore(cache, rng.choice(keys))
+            hits += cache.get(store.cache_key) is not None
+            started = time.perf_counter()
+            store.load()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        for key in keys:
+            WorkerSessionStore(workers[0], key).delete()
+        if profile == 'file':
+            shutil.rmtree(workers[0]._dir, ignore_errors=True)
+        elif profile == 'locmem':
+            for cache in workers:
+                cache.clear()
+
+        timings.sort()
+        return {
+            'profile': profile,
+            'workers': len(workers),
+            'lookups': len(timings),
+            'hit_rate': round(hits / len(timings) * 100, 1),
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+        }
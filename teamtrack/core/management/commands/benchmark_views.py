@@ -0,0 +1,244 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import date
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from attendance.models import AttendanceRecord
+from core.middleware import RequestQueries
+from core.seeding import MANAGER_EMAIL
+from notifications.models import Notification
+from tasks.models import Task, TaskComment, TaskEvent
+
+# mark_attendance is benchmarked against a day no real record uses, so its
+# (rolled back) upserts don't contend with real rows
+MARK_DATE = date(2000, 1, 1)
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the hot views through the test client and report p50/p95 latency, '
+        'query count and peak memory per endpoint, optionally saved as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Timed requests per endpoint (default 20)')
+        parser.add_argument('--warmup', type=int, default=2,
+                            help='Untimed requests per endpoint first (default 2)')
+        parser.add_argument('--cold', action='store_true',
+                            help='Clear the cache before every request')
+        parser.add_argument('--only', help='Comma-separated endpoint labels to run')
+        parser.add_argument('--allow-writes', action='store_true',
+                            help='Also benchmark endpoints that write (POST); each request is rolled back')
+        parser.add_argument('--output', metavar='PATH', help='Write the results to this JSON file')
+        parser.add_argument('--compare', metavar='PATH',
+                            help='Show the change against an earlier --output file')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1 or options['warmup'] < 0:
+            raise CommandError('--repeat must be >= 1 and --warmup >= 0')
+
+        manager = (
+            User.objects.filter(email=MANAGER_EMAIL).first()
+            or User.objects.filter(team='PROJECT_MANAGER', is_active=True).first()
+        )
+        task = (
+            Task.objects.exclude(assigned_to__team='PROJECT_MANAGER')
+            .select_related('assigned_to').order_by('-created_at').first()
+        )
+        if not manager or not task:
+            raise CommandError('Need a Project Manager and a task assigned to a member (try seed_data)')
+        member = task.assigned_to
+
+        endpoints = self.endpoints(manager, member, task)
+        if not options['allow_writes']:
+            endpoints = [endpoint for endpoint in endpoints if endpoint[3] == 'get']
+        if options['only']:
+            wanted = set(options['only'].split(','))
+            endpoints = [endpoint for endpoint in endpoints if endpoint[0] in wanted]
+            if not endpoints:
+                raise CommandError(f"No endpoints match --only {options['only']} (POST ones need --allow-writes)")
+
+        results = {}
+        # Budgets are reported alongside the counts here rather than enforced
+        with override_settings(QUERY_BUDGET_STRICT=False):
+            for endpoint in endpoints:
+                results[endpoint[0]] = self.measure(*endpoint, options)
+                self.stdout.write(self.format_row(endpoint[0], results[endpoint[0]]))
+
+        report = {'meta': self.meta(options), 'results': results}
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"💾 Saved to {options['output']}")
+        if options['compare']:
+            self.compare(report, options['compare'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Benchmarked {len(results)} endpoints'))
+
+    def endpoints(self, manager, member, task):
+        """(label, URL name, user, method, path, POST data)"""
+        # Stay under DATA_UPLOAD_MAX_NUMBER_FIELDS; everyone else is marked absent
+        mark_data = {
+            'date': MARK_DATE.isoformat(),
+            'present_users[]': list(
+                User.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True)[:500]
+            ),
+        }
+        return [
+            ('task_list', 'tasks:task_list', manager, 'get', reverse('tasks:task_list'), None),
+            ('task_list_member_pending', 'tasks:task_list', member, 'get',
+             reverse('tasks:task_list') + '?status=PENDING', None),
+            ('task_list_search', 'tasks:task_list', manager, 'get', reverse('tasks:task_list') + f'?search={task.pk}', None),
+            ('task_detail', 'tasks:task_detail', member, 'get', reverse('tasks:task_detail', args=[task.pk]), None),
+            ('admin_dashboard', 'dashboard:admin', manager, 'get', reverse('dashboard:admin'), None),
+            ('member_dashboard', 'dashboard:member', member, 'get', reverse('dashboard:member'), None),
+            ('attendance_list', 'attendance:list', manager, 'get', reverse('attendance:list'), None),
+            ('notification_list', 'notifications:list', member, 'get', reverse('notifications:list'), None),
+            ('task_timeline', 'api:task-timeline', member, 'get', reverse('api:task-timeline', args=[task.pk]), None),
+            ('task_analytics', 'api:task-analytics', manager, 'get', reverse('api:task-analytics'), None),
+            ('mark_attendance', 'attendance:mark', manager, 'post', reverse('attendance:mark'), mark_data),
+        ]
+
+    def measure(self, label, view_name, user, method, path, data, options):
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+
+        def request():
+            if options['cold']:
+                cache.clear()
+                client.force_login(user)
+            collector = RequestQueries()
+            # Writes run in a transaction that is rolled back, so no rows stay
+            # behind and no on_commit work (notification publishing) happens
+            with nullcontext() if method == 'get' else rolled_back():
+                with connection.execute_wrapper(collector):
+                    started = time.perf_counter()
+                    response = getattr(client, method)(path, data)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                    elapsed = time.perf_counter() - started
+            return response, elapsed, collector
+
+        for _ in range(options['warmup']):
+            request()
+
+        timings, counts, db_times = [], [], []
+        for _ in range(options['repeat']):
+            response, elapsed, collector = request()
+            timings.append(elapsed * 1000)
+            counts.append(collector.count)
+            db_times.append(collector.db_time * 1000)
+
+        # Memory is sampled on its own request since tracing slows everything down
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            request()
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            tracemalloc.stop()
+
+        budgets = getattr(settings, 'QUERY_BUDGETS', {})
+        return {
+            'path': path,
+            'method': method.upper(),
+            'status': response.status_code,
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'mean_ms': round(statistics.fmean(timings), 2),
+            'queries': max(counts),
+            'db_ms': round(statistics.median(db_times), 2),
+            'query_budget': budgets.get(view_name, getattr(settings, 'QUERY_BUDGET_DEFAULT', None)),
+            'peak_kib': round(peak / 1024, 1),
+        }
+
+    def format_row(self, label, row):
+        over = row['query_budget'] is not None and row['queries'] > row['query_budget']
+        line = (
+            f"{label:<26} {row['status']}  p50 {row['p50_ms']:>8.2f}ms  p95 {row['p95_ms']:>8.2f}ms  "
+            f"{row['queries']:>3} queries ({row['db_ms']:.2f}ms)  peak {row['peak_kib']:>9.1f} KiB"
+        )
+        if over:
+            return self.style.WARNING(f"{line}  over budget {row['query_budget']}")
+        return line
+
+    def meta(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, timeout=5,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            'commit': commit,
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'cache': settings.CACHES['default']['BACKEND'],
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'repeat': options['repeat'],
+            'cold': options['cold'],
+            'rows': {
+                'users': User.objects.count(),
+                'tasks': Task.objects.count(),
+                'comments': TaskComment.objects.count(),
+                'task_events': TaskEvent.objects.count(),
+                'notifications': Notification.objects.count(),
+                'attendance': AttendanceRecord.objects.count(),
+            },
+        }
+
+    def compare(self, report, path):
+        try:
+            with open(path, encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {path}: {e}')
+
+        self.stdout.write(f"\n📊 Against {path} (commit {baseline['meta'].get('commit') or 'unknown'})")
+        for label, row in report['results'].items():
+            before = baseline['results'].get(label)
+            if not before:
+                self.stdout.write(f'{label:<26} new endpoint')
+                continue
+            self.stdout.write(
+                f"{label:<26} p50 {change(before['p50_ms'], row['p50_ms'])}  "
+                f"p95 {change(before['p95_ms'], row['p95_ms'])}  "
+                f"queries {before['queries']} → {row['queries']}"
+            )
+
+
+@contextmanager
+def rolled_back():
+    """A transaction that is always rolled back"""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def change(before, after):
+    if not before:
+        return f'{after:.2f}ms'
+    return f'{before:.2f} → {after:.2f}ms ({(after - before) / before * 100:+.0f}%)'
@@ -0,0 +1,48 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import exports
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream tasks, comments or attendance to a CSV or XLSX file in constant memory '
+        '(e.g. export_data tasks --format xlsx --from 2025-01-01 --team TECH -o tasks.xlsx)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(exports.DATASETS))
+        parser.add_argument('--format', dest='fmt', choices=list(exports.FORMATS), default='csv')
+        parser.add_argument('-o', '--output', metavar='PATH',
+                            help='File to write (default: standard output, CSV only)')
+        parser.add_argument('--from', dest='date_from', type=date.fromisoformat, metavar='YYYY-MM-DD',
+                            help='First day to include')
+        parser.add_argument('--to', dest='date_to', type=date.fromisoformat, metavar='YYYY-MM-DD',
+                            help='Last day to include')
+        parser.add_argument('--team', help='Only this team (the task team, or the member team for attendance)')
+
+    def handle(self, *args, **options):
+        if options['fmt'] == 'xlsx' and not options['output']:
+            raise CommandError('XLSX needs --output')
+
+        started = time.monotonic()
+        chunks = exports.export(
+            options['kind'], options['fmt'],
+            date_from=options['date_from'], date_to=options['date_to'], team=options['team'],
+        )
+        size = 0
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+                    size += len(chunk)
+            self.stderr.write(self.style.SUCCESS(
+                f"📤 Wrote {size / 1024:.0f} KiB of {options['kind']} to {options['output']} "
+                f"in {time.monotonic() - started:.1f}s"
+            ))
+        else:
+            # CSV chunks end on whole lines, so each decodes on its own
+            for chunk in chunks:
+                self.stdout.write(chunk.decode(), ending='')
@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import seeding
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk insert seeded synthetic users, tasks, comments, notifications and '
+        'attendance for load testing (e.g. --users 10000 --tasks 1000000 --notifications 5000000)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200,
+                            help='Seeded users in total, including earlier runs (default 200)')
+        parser.add_argument('--tasks', type=int, default=0, help='Tasks to add')
+        parser.add_argument('--comments', type=int, default=0, help='Task comments to add')
+        parser.add_argument('--notifications', type=int, default=0, help='Notifications to add')
+        parser.add_argument('--attendance-days', type=int, default=0,
+                            help='Days of attendance to record for every seeded user')
+        parser.add_argument('--batch-size', type=int, default=seeding.BATCH_SIZE,
+                            help=f'Rows per bulk insert (default {seeding.BATCH_SIZE})')
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Random seed; the same seed and sizes give the same data (default 42)')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete all seeded data instead of adding to it')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if options['clear']:
+            deleted = seeding.clear()
+            summary = ', '.join(f'{count} {label}' for label, count in deleted.items())
+            self.stdout.write(self.style.SUCCESS(f'🧹 Deleted {summary} in {time.monotonic() - started:.1f}s'))
+            return
+
+        if options['batch_size'] < 1 or min(
+            options['users'], options['tasks'], options['comments'],
+            options['notifications'], options['attendance_days'],
+        ) < 0:
+            raise CommandError('Sizes must be >= 0 and --batch-size >= 1')
+
+        inserted = seeding.seed(
+            users=options['users'],
+            tasks=options['tasks'],
+            comments=options['comments'],
+            notifications=options['notifications'],
+            attendance_days=options['attendance_days'],
+            batch_size=options['batch_size'],
+            random_seed=options['seed'],
+            progress=self.progress if options['verbosity'] > 0 else None,
+        )
+        elapsed = time.monotonic() - started
+        rows = sum(inserted.values())
+        summary = ', '.join(f'{count} {label}' for label, count in inserted.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'🌱 Inserted {summary} in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)'
+        ))
+
+    def progress(self, label, done, total):
+        self.stdout.write(f'  {label}: {done}/{total}', ending='\r' if done < total else '\n')
@@ -0,0 +1,170 @@
+"""
+Per-request SQL instrumentation
+
+QueryInstrumentationMiddleware wraps every query a request runs (via
+connection.execute_wrapper, so it works with DEBUG off) and records the
+count, total database time, the slowest statement and the time spent
+rendering templates (when TEMPLATES uses the InstrumentedDjangoTemplates
+backend below). It can
+
+- add a Server-Timing header (settings.SERVER_TIMING), which browser dev
+  tools show under the request's Timing tab;
+- enforce settings.QUERY_BUDGETS, a maximum query count per URL name;
+  exceeding one raises QueryBudgetExceeded when settings.QUERY_BUDGET_STRICT
+  is on (tests) and logs a warning otherwise;
+- log a stack trace when the same SELECT runs settings.QUERY_DUPLICATE_THRESHOLD
+  times in one request, which is what an N+1 loop looks like.
+"""
+import logging
+import time
+import traceback
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connection
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+logger = logging.getLogger(__name__)
+
+# Innermost project frames kept in a duplicate query's stack trace
+STACK_DEPTH = 8
+LOGGED_SQL_LENGTH = 500
+
+_current = ContextVar('request_queries', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """A view ran more queries than its QUERY_BUDGETS entry allows"""
+
+
+class RequestQueries:
+    """Queries and timings collected for one request (an execute_wrapper)"""
+
+    def __init__(self, duplicate_threshold=3):
+        self.duplicate_threshold = duplicate_threshold
+        self.count = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql = ''
+        self.statements = Counter()
+        # SQL -> stack trace where it reached duplicate_threshold
+        self.duplicates = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.db_time += duration
+            if duration > self.slowest_time:
+                self.slowest_time, self.slowest_sql = duration, sql
+            # Parameters stay out of the key: the same SELECT run per row with
+            # different ids is the N+1 pattern. Writes repeat legitimately when
+            # bulk_create splits a large insert into batches.
+            if sql.lstrip()[:6].upper() == 'SELECT':
+                self.statements[sql] += 1
+                if self.statements[sql] == self.duplicate_threshold:
+                    self.duplicates[sql] = project_stack()
+
+    def server_timing(self, total):
+        metrics = [
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.count} queries"',
+            f'db-slowest;dur={self.slowest_time * 1000:.1f}',
+            f'render;dur={self.render_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ]
+        if self.duplicates:
+            metrics.append(f'db-duplicates;desc="{len(self.duplicates)} repeated statements"')
+        return ', '.join(metrics)
+
+
+def project_stack():
+    """Formatted stack of this project's own frames, innermost last"""
+    base = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(base) and frame.filename != __file__
+        and 'site-packages' not in frame.filename
+    ]
+    return ''.join(traceback.format_list(frames[-STACK_DEPTH:]))
+
+
+class InstrumentedTemplate(Template):
+    """Adds its render time to the current request's RequestQueries, if any"""
+
+    def render(self, context=None, request=None):
+        collector = _current.get()
+        if collector is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            collector.render_time += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, returning InstrumentedTemplates. Only
+    templates loaded through the backend (render(), TemplateResponse) are
+    timed, so {% include %}s count once, inside their parent.
+    """
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return InstrumentedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class QueryInstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        collector = RequestQueries(getattr(settings, 'QUERY_DUPLICATE_THRESHOLD', 3))
+        token = _current.set(collector)
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(collector):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        match = request.resolver_match
+        view_name = match.view_name if match else request.path
+        logger.debug(
+            '%s: %d queries, db %.1fms (slowest %.1fms), render %.1fms, total %.1fms',
+            view_name, collector.count, collector.db_time * 1000, collector.slowest_time * 1000,
+            collector.render_time * 1000, total * 1000,
+        )
+        if collector.slowest_sql and logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s slowest query: %s', view_name, collector.slowest_sql[:LOGGED_SQL_LENGTH])
+        for sql, stack in collector.duplicates.items():
+            logger.warning(
+                '%s ran the same query %d times (possible N+1): %s\n%s',
+                view_name, collector.statements[sql], sql[:LOGGED_SQL_LENGTH], stack,
+            )
+
+        if getattr(settings, 'SERVER_TIMING', False):
+            response['Server-Timing'] = collector.server_timing(total)
+
+        budget = None
+        if match:
+            budgets = getattr(settings, 'QUERY_BUDGETS', {})
+            budget = budgets.get(view_name, getattr(settings, 'QUERY_BUDGET_DEFAULT', None))
+        if budget is not None and collector.count > budget:
+            message = f'{view_name} ran {collector.count} queries, over its budget of {budget}'
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,139 @@
+"""
+Keyset (cursor) pagination on (created_at, id)
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db import connections
+from django.db.models import Q
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def encode_cursor(obj, direction=NEXT):
+    """Opaque token pointing past obj, forwards (older) or backwards (newer)"""
+    payload = json.dumps(
+        {'c': obj.created_at.isoformat(), 'i': obj.pk, 'd': direction},
+        separators=(',', ':'),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Return (created_at, id, direction) for a token, or None if it is missing or malformed
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = payload.get('d', NEXT)
+        if direction not in (NEXT, PREVIOUS):
+            return None
+        return datetime.fromisoformat(payload['c']), int(payload['i']), direction
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return None
+
+
+def estimate_count(queryset):
+    """
+    Planner row estimate on PostgreSQL; None elsewhere, since the only
+    alternative is the COUNT(*) an estimate is meant to avoid
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CursorPage:
+    """
+    One page of a keyset-paginated queryset, newest first
+    """
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+def cursor_paginate(queryset, cursor=None, per_page=20, count=None):
+    """
+    Return the CursorPage addressed by cursor.
+    Fetches per_page + 1 rows to know whether another page exists in the
+    direction of travel, so no OFFSET is ever issued. count may be None
+    (skip counting), 'exact' or 'approximate' (None where the database
+    can't estimate).
+    """
+    total = None
+    if count == 'exact':
+        total = queryset.count()
+    elif count == 'approximate':
+        total = estimate_count(queryset)
+
+    position = decode_cursor(cursor)
+    if position is None:
+        rows = list(queryset.order_by('-created_at', '-pk')[:per_page + 1])
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        return CursorPage(
+            rows,
+            next_cursor=encode_cursor(rows[-1], NEXT) if has_more else None,
+            count=total,
+        )
+
+    created_at, pk, direction = position
+    if direction == NEXT:
+        rows = list(
+            queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+            .order_by('-created_at', '-pk')[:per_page + 1]
+        )
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        has_next, has_previous = has_more, True
+    else:
+        rows = list(
+            queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+            .order_by('created_at', 'pk')[:per_page + 1]
+        )
+        has_more = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next, has_previous = True, has_more
+
+    if not rows:
+        return CursorPage(rows, count=total)
+    return CursorPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1], NEXT) if has_next else None,
+        previous_cursor=encode_cursor(rows[0], PREVIOUS) if has_previous else None,
+        count=total,
+    )
@@ -0,0 +1,242 @@
+"""
+Pluggable full-text search for tasks and their comments
+
+The backend is chosen by settings.SEARCH_BACKEND (a dotted path). When it
+is unset the database vendor decides: PostgreSQL uses SearchVector with GIN
+indexes, SQLite uses an FTS5 virtual table kept in sync by signals, and
+anything else (or a backend whose index is missing) falls back to icontains.
+"""
+import re
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Exists, FloatField, OuterRef, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+# Text search configuration shared with the GIN indexes in tasks/migrations
+SEARCH_CONFIG = 'english'
+
+FTS_TABLE = 'tasks_task_fts'
+
+# Copies tasks and their concatenated comment text into the FTS5 table
+FTS_INSERT_SQL = (
+    f'INSERT INTO {FTS_TABLE} (rowid, title, description, comments) '
+    'SELECT t.id, t.title, t.description, '
+    "COALESCE((SELECT group_concat(c.message, ' ') FROM tasks_taskcomment c WHERE c.task_id = t.id), '') "
+    'FROM tasks_task t'
+)
+
+# Ids per statement when (re)indexing many tasks; stays under SQLite's 999 parameters
+INDEX_BATCH_SIZE = 500
+
+_suspended = threading.local()
+
+
+@contextmanager
+def indexing_suspended():
+    """
+    Signal handlers skip index maintenance inside the block (e.g. while a
+    QuerySet.delete() cascades row by row); the caller reindexes what it touched
+    """
+    depth = getattr(_suspended, 'depth', 0)
+    _suspended.depth = depth + 1
+    try:
+        yield
+    finally:
+        _suspended.depth = depth
+
+
+def is_indexing_suspended():
+    return getattr(_suspended, 'depth', 0) > 0
+
+
+def icontains_filter(queryset, query, fields):
+    """OR together field__icontains lookups"""
+    q_objects = Q()
+    for field in fields:
+        q_objects |= Q(**{f"{field}__icontains": query})
+    return queryset.filter(q_objects)
+
+
+def is_task_queryset(queryset):
+    return queryset.model._meta.label == 'tasks.Task'
+
+
+class IContainsSearchBackend:
+    """
+    LIKE '%q%' matching; works everywhere but cannot use an index
+    """
+    def is_available(self):
+        return True
+
+    def search(self, queryset, query, fields=()):
+        """
+        Filter queryset by query. Task querysets also match comment text and
+        are annotated with search_rank; other models use icontains on fields.
+        """
+        if not is_task_queryset(queryset):
+            return icontains_filter(queryset, query, fields)
+        return self.search_tasks(queryset, query)
+
+    def search_tasks(self, queryset, query):
+        from tasks.models import TaskComment
+        comments = TaskComment.objects.filter(task=OuterRef('pk'), message__icontains=query)
+        return queryset.filter(
+            Q(title__icontains=query) | Q(description__icontains=query) | Exists(comments)
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    # Index maintenance hooks, called from tasks.signals
+    def index_task(self, task_id):
+        pass
+
+    def remove_task(self, task_id):
+        pass
+
+    def index_tasks(self, task_ids):
+        pass
+
+    def remove_tasks(self, task_ids):
+        pass
+
+    def rebuild(self):
+        return 0
+
+
+class PostgresSearchBackend(IContainsSearchBackend):
+    """
+    to_tsvector matching served by GIN expression indexes, ranked with ts_rank
+    """
+    def is_available(self):
+        return connection.vendor == 'postgresql'
+
+    @staticmethod
+    def task_vector():
+        from django.contrib.postgres.search import SearchVector
+        return (
+            SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        )
+
+    @staticmethod
+    def comment_vector():
+        from django.contrib.postgres.search import SearchVector
+        return SearchVector('message', config=SEARCH_CONFIG)
+
+    def search_tasks(self, queryset, query):
+        """
+        Collect matching task ids from each GIN-indexed source separately and
+        UNION them; ORing the match with a correlated EXISTS would make the
+        planner evaluate to_tsvector on every task instead
+        """
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        from tasks.models import Task, TaskComment
+
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        task_hits = Task.objects.annotate(
+            search_vector=self.task_vector()
+        ).filter(search_vector=search_query).order_by().values('pk')
+        comment_hits = TaskComment.objects.annotate(
+            search_vector=self.comment_vector()
+        ).filter(search_vector=search_query).order_by().values('task_id')
+        return queryset.filter(pk__in=task_hits.union(comment_hits)).annotate(
+            search_rank=SearchRank(self.task_vector(), search_query),
+        )
+
+
+class SQLiteFTSSearchBackend(IContainsSearchBackend):
+    """
+    FTS5 virtual table (title, description, comments) keyed by task id, ranked with bm25
+    """
+    # bm25 column weights for title, description, comments
+    WEIGHTS = (10.0, 4.0, 1.0)
+
+    # Set once the FTS table has been seen, so signals don't introspect on every save
+    table_exists = False
+
+    def is_available(self):
+        if connection.vendor != 'sqlite':
+            return False
+        if not SQLiteFTSSearchBackend.table_exists:
+            SQLiteFTSSearchBackend.table_exists = FTS_TABLE in connection.introspection.table_names()
+        return SQLiteFTSSearchBackend.table_exists
+
+    @staticmethod
+    def match_expression(query):
+        """Quote each word so user input is never parsed as FTS5 syntax; prefix-match the last one"""
+        words = re.findall(r'\w+', query)
+        if not words:
+            return None
+        terms = [f'"{word}"' for word in words]
+        terms[-1] += '*'
+        return ' '.join(terms)
+
+    def search_tasks(self, queryset, query):
+        match = self.match_expression(query)
+        if match is None:
+            return super().search_tasks(queryset, query)
+        weights = ', '.join(str(weight) for weight in self.WEIGHTS)
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = "tasks_task"."id"',
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    def index_task(self, task_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [task_id])
+            cursor.execute(f'{FTS_INSERT_SQL} WHERE t.id = %s', [task_id])
+
+    def remove_task(self, task_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [task_id])
+
+    def index_tasks(self, task_ids):
+        """Reindex many tasks with two statements per INDEX_BATCH_SIZE ids"""
+        task_ids = list(task_ids)
+        with connection.cursor() as cursor:
+            for start in range(0, len(task_ids), INDEX_BATCH_SIZE):
+                chunk = task_ids[start:start + INDEX_BATCH_SIZE]
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', chunk)
+                cursor.execute(f'{FTS_INSERT_SQL} WHERE t.id IN ({placeholders})', chunk)
+
+    def remove_tasks(self, task_ids):
+        task_ids = list(task_ids)
+        with connection.cursor() as cursor:
+            for start in range(0, len(task_ids), INDEX_BATCH_SIZE):
+                chunk = task_ids[start:start + INDEX_BATCH_SIZE]
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', chunk)
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(FTS_INSERT_SQL)
+            return cursor.rowcount
+
+
+VENDOR_BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteFTSSearchBackend,
+}
+
+
+def get_search_backend():
+    """Return the configured backend, or icontains if its index is not available"""
+    path = getattr(settings, 'SEARCH_BACKEND', None)
+    if path:
+        backend_class = import_string(path)
+    else:
+        backend_class = VENDOR_BACKENDS.get(connection.vendor, IContainsSearchBackend)
+    backend = backend_class()
+    if not backend.is_available():
+        return IContainsSearchBackend()
+    return backend
@@ -0,0 +1,230 @@
+"""
+Seeded synthetic data for benchmarks and query-plan checks
+
+Everything is written with bulk_create in fixed-size batches, so seeding
+millions of rows runs in constant memory, and a given seed always produces
+the same rows. Seeded users share SEED_EMAIL_DOMAIN and every seeded row
+hangs off one of them, so clear() removes the lot. Seeded tasks come with
+a plausible event history (tasks.events) for the analytics to work on.
+bulk_create sends no signals, so seed() rebuilds the search index and
+bumps the dashboard cache versions itself once it is done; clear() deletes
+with indexing suspended and does the same.
+"""
+import random
+from array import array
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import User
+from attendance.models import AttendanceRecord
+from core.search import get_search_backend, indexing_suspended
+from core.versioned_cache import ALL_DASHBOARDS, bump
+from notifications.models import Notification
+from tasks.events import STATUS_CODES
+from tasks.models import Task, TaskComment, TaskEvent
+
+SEED_EMAIL_DOMAIN = 'synthetic.seed'
+MANAGER_EMAIL = f'manager@{SEED_EMAIL_DOMAIN}'
+
+# Project Managers that seeded tasks' assigned_by is spread across, as
+# assigned_to is across users, so the assigned_by index stays selective
+MANAGERS = 5
+
+BATCH_SIZE = 5000
+
+# The values the views and templates work with (Task.STATUS / Task.PRIORITY
+# list different ones)
+STATUSES = ['PENDING', 'IN_PROGRESS', 'COMPLETED', 'BLOCKED']
+PRIORITIES = ['LOW', 'MEDIUM', 'HIGH']
+
+
+def manager_email(index):
+    """MANAGER_EMAIL for the first seeded manager, manager<index>@... for the others"""
+    return MANAGER_EMAIL if index == 0 else f'manager{index}@{SEED_EMAIL_DOMAIN}'
+
+
+def seeded_users():
+    return User.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}')
+
+
+def batches(total, batch_size):
+    """(start, size) pairs covering range(total)"""
+    for start in range(0, total, batch_size):
+        yield start, min(batch_size, total - start)
+
+
+def seed(users=200, tasks=0, comments=0, notifications=0, attendance_days=0,
+         batch_size=BATCH_SIZE, random_seed=42, progress=None):
+    """
+    Add synthetic rows on top of whatever is already seeded: users up to
+    users in total, then the given numbers of tasks, comments and
+    notifications, and attendance for every seeded user over the last
+    attendance_days days. progress(label, done, total) is called after
+    each batch. Returns {label: rows inserted}.
+    """
+    rng = random.Random(random_seed)
+    teams = [value for value, _ in User.TEAMS if value != 'PROJECT_MANAGER']
+    comment_types = [value for value, _ in TaskComment.COMMENT_TYPES]
+    today = timezone.localdate()
+    # Seeded accounts can't log in with a password; benchmarks use force_login
+    unusable_password = make_password(None)
+    report = progress or (lambda label, done, total: None)
+    inserted = {}
+
+    present = set(seeded_users().filter(team='PROJECT_MANAGER').values_list('email', flat=True))
+    for i in range(MANAGERS):
+        if manager_email(i) not in present:
+            User.objects.create_user(email=manager_email(i), name=f'Seed Manager {i}', team='PROJECT_MANAGER')
+
+    existing = seeded_users().exclude(team='PROJECT_MANAGER').count()
+    inserted['users'] = max(users - existing, 0)
+    for start, size in batches(inserted['users'], batch_size):
+        User.objects.bulk_create([
+            User(
+                email=f'user{existing + start + i}@{SEED_EMAIL_DOMAIN}',
+                name=f'Seed User {existing + start + i}',
+                team=rng.choice(teams),
+                password=unusable_password,
+            )
+            for i in range(size)
+        ])
+        report('users', start + size, inserted['users'])
+
+    user_ids = list(seeded_users().order_by('pk').values_list('pk', flat=True))
+    manager_ids = list(seeded_users().filter(team='PROJECT_MANAGER').order_by('pk').values_list('pk', flat=True))
+
+    now = timezone.now()
+    task_events = 0
+    for start, size in batches(tasks, batch_size):
+        with transaction.atomic():
+            created = Task.objects.bulk_create([
+                Task(
+                    title=f'Seed task {start + i}',
+                    description=f'Synthetic task {start + i} for load testing',
+                    assigned_to_id=rng.choice(user_ids),
+                    assigned_by_id=rng.choice(manager_ids),
+                    team=rng.choice(teams),
+                    status=rng.choice(STATUSES),
+                    priority=rng.choice(PRIORITIES),
+                    due_date=today + timedelta(days=rng.randint(-60, 60)),
+                )
+                for i in range(size)
+            ])
+            # Backends that don't return ids from bulk_create (MySQL) leave pk unset
+            history = [event for task in created if task.pk for event in status_history(task, rng, now)]
+            TaskEvent.objects.bulk_create(history, batch_size=batch_size)
+            task_events += len(history)
+        report('tasks', start + size, tasks)
+    inserted['tasks'] = tasks
+    inserted['task events'] = task_events
+
+    if comments:
+        seeded_tasks = Task.objects.filter(assigned_to__email__endswith=f'@{SEED_EMAIL_DOMAIN}')
+        # A compact array: a million ids is 8 MB rather than a list of ints
+        task_ids = array('q', seeded_tasks.values_list('pk', flat=True).iterator(chunk_size=batch_size))
+        if not task_ids:
+            comments = 0
+        for start, size in batches(comments, batch_size):
+            with transaction.atomic():
+                TaskComment.objects.bulk_create([
+                    TaskComment(
+                        task_id=rng.choice(task_ids),
+                        author_id=rng.choice(user_ids),
+                        comment_type=rng.choice(comment_types),
+                        message=f'Seed comment {start + i}',
+                    )
+                    for i in range(size)
+                ])
+            report('comments', start + size, comments)
+    inserted['comments'] = comments
+
+    for start, size in batches(notifications, batch_size):
+        with transaction.atomic():
+            Notification.objects.bulk_create([
+                Notification(
+                    recipient_id=rng.choice(user_ids),
+                    message=f'Seed notification {start + i}',
+                    is_read=rng.random() < 0.8,
+                )
+                for i in range(size)
+            ])
+        report('notifications', start + size, notifications)
+    inserted['notifications'] = notifications
+
+    inserted['attendance'] = 0
+    for offset in range(attendance_days):
+        day = today - timedelta(days=offset)
+        for start, size in batches(len(user_ids), batch_size):
+            AttendanceRecord.objects.bulk_create(
+                [
+                    AttendanceRecord(member_id=user_id, date=day, status=rng.choice(['Present', 'Absent', 'Late']))
+                    for user_id in user_ids[start:start + size]
+                ],
+                ignore_conflicts=True,
+            )
+        inserted['attendance'] += len(user_ids)
+        report('attendance', offset + 1, attendance_days)
+
+    finish()
+    return inserted
+
+
+def status_history(task, rng, now):
+    """
+    Creation and status events leading to task's (seeded) status: created
+    PENDING up to 60 days ago, then IN_PROGRESS, then COMPLETED or BLOCKED
+    """
+    at = now - timedelta(days=rng.uniform(1, 60))
+    events = [TaskEvent(task_id=task.pk, field=TaskEvent.CREATED, new_value=STATUS_CODES['PENDING'], created_at=at)]
+    path = {'IN_PROGRESS': ['IN_PROGRESS'], 'COMPLETED': ['IN_PROGRESS', 'COMPLETED'], 'BLOCKED': ['IN_PROGRESS', 'BLOCKED']}
+    previous = 'PENDING'
+    for status in path.get(task.status, []):
+        at = min(at + timedelta(hours=rng.uniform(1, 240)), now)
+        events.append(TaskEvent(
+            task_id=task.pk, field=TaskEvent.STATUS, created_at=at,
+            old_value=STATUS_CODES[previous], new_value=STATUS_CODES[status],
+        ))
+        previous = status
+    return events
+
+
+def clear():
+    """
+    Delete every seeded user and their rows. Returns {label: rows deleted}.
+    The search index is left alone while rows go and rebuilt once at the end.
+    """
+    users = seeded_users()
+    with indexing_suspended():
+        deleted = {
+            'comments': delete_in_batches(TaskComment.objects.filter(author__in=users)),
+            'notifications': delete_in_batches(Notification.objects.filter(recipient__in=users)),
+            'attendance': delete_in_batches(AttendanceRecord.objects.filter(member__in=users)),
+            'tasks': delete_in_batches(Task.objects.filter(assigned_to__in=users)),
+            'users': delete_in_batches(users),
+        }
+    finish()
+    return deleted
+
+
+def delete_in_batches(queryset, batch_size=BATCH_SIZE):
+    """Delete queryset a batch of primary keys at a time, keeping each transaction short"""
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            queryset.model.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
+
+
+def finish():
+    """Bring derived data back in step after bulk writes"""
+    get_search_backend().rebuild()
+    bump('tasks', 'users', 'attendance', ALL_DASHBOARDS)
+    if connection.vendor in ('postgresql', 'sqlite'):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
@@ -0,0 +1,75 @@
+"""
+Task statistics computed with conditional aggregation
+"""
+from django.db.models import Count, Q
+from django.utils import timezone
+
+# Status values counted by the dashboards, keyed by the name used in templates
+DASHBOARD_STATUSES = {
+    'pending': 'PENDING',
+    'in_progress': 'IN_PROGRESS',
+    'completed': 'COMPLETED',
+}
+
+# Statuses that still count as overdue once the due date has passed
+OPEN_STATUSES = ['PENDING', 'IN_PROGRESS']
+
+
+class TaskStats:
+    """
+    Global, per-team and per-status task totals in a single query
+    """
+
+    @staticmethod
+    def aggregates(statuses=None, open_statuses=None, today=None):
+        """Build the Count(filter=Q(...)) expressions for one aggregation pass"""
+        statuses = DASHBOARD_STATUSES if statuses is None else statuses
+        open_statuses = OPEN_STATUSES if open_statuses is None else open_statuses
+        today = today or timezone.now().date()
+
+        expressions = {'total': Count('id')}
+        for key, status in statuses.items():
+            expressions[key] = Count('id', filter=Q(status=status))
+        expressions['overdue'] = Count(
+            'id', filter=Q(status__in=open_statuses, due_date__lt=today)
+        )
+        return expressions
+
+    @classmethod
+    def summary(cls, queryset=None, **kwargs):
+        """
+        Totals for a queryset of tasks, e.g. {'total': 12, 'pending': 4, ..., 'overdue': 1}
+        """
+        if queryset is None:
+            from tasks.models import Task
+            queryset = Task.objects.all()
+        return queryset.order_by().aggregate(**cls.aggregates(**kwargs))
+
+    @classmethod
+    def by_team(cls, queryset=None, **kwargs):
+        """
+        Global totals plus totals per assignee team, computed from one
+        GROUP BY assigned_to__team query.
+        Returns (totals, {team_code: totals})
+        """
+        if queryset is None:
+            from tasks.models import Task
+            queryset = Task.objects.all()
+
+        expressions = cls.aggregates(**kwargs)
+        rows = queryset.order_by().values('assigned_to__team').annotate(**expressions)
+
+        totals = dict.fromkeys(expressions, 0)
+        teams = {}
+        for row in rows:
+            team = row.pop('assigned_to__team')
+            teams[team] = row
+            for key, value in row.items():
+                totals[key] += value
+        return totals, teams
+
+    @staticmethod
+    def completion_rate(stats):
+        """Percentage of completed tasks, rounded to one decimal"""
+        total = stats.get('total', 0)
+        return round((stats.get('completed', 0) / total * 100) if total > 0 else 0, 1)
@@ -1,8 +1,11 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
+from django.db import transaction
 from django.db.models import Q
 from django.shortcuts import render
 from django.core.paginator import Paginator
+from core.pagination import cursor_paginate
+from core.search import get_search_backend
 
 class PermissionMixin(LoginRequiredMixin):
     """
@@ -131,8 +134,15 @@ class PaginationMixin:
         return self.paginate_by
     
     @staticmethod
-    def paginate_queryset(queryset, request, items_per_page=20):
-        """Static method to paginate a queryset"""
+    def paginate_queryset(queryset, request, items_per_page=20, mode='offset', count=None):
+        """
+        Static method to paginate a queryset.
+        mode='offset' uses Django's Paginator with ?page=N (COUNT + OFFSET).
+        mode='cursor' uses keyset pagination on (created_at, id) with
+        opaque ?cursor= tokens; count is None, 'exact' or 'approximate'.
+        """
+        if mode == 'cursor':
+            return cursor_paginate(queryset, request.GET.get('cursor'), items_per_page, count=count)
         paginator = Paginator(queryset, items_per_page)
         page_number = request.GET.get('page')
         return paginator.get_page(page_number)
@@ -148,10 +158,7 @@ class SearchMixin:
         search_query = self.request.GET.get('search', '')
         
         if search_query and self.search_fields:
-            q_objects = Q()
-            for field in self.search_fields:
-                q_objects |= Q(**{f"{field}__icontains": search_query})
-            queryset = queryset.filter(q_objects)
+            queryset = get_search_backend().search(queryset, search_query, self.search_fields)
         
         return queryset
 
@@ -167,70 +174,73 @@ class ContextMixin:
 class NotificationMixin:
     """
     Mixin for handling notifications
+
+    Every helper goes through notifications.services, so each call is a
+    single bulk insert written once the current transaction commits.
     """
-    def create_notification(self, user, message, notification_type='info'):
+    def create_notification(self, user, message):
         """
-        Create a notification for a user
+        Create a notification for a user (or a queryset of users)
         """
-        try:
-            from notifications.models import Notification
-            Notification.objects.create(
-                user=user,
-                message=message,
-                notification_type=notification_type
-            )
-        except ImportError:
-            # If notifications app is not available, just pass
-            pass
+        from notifications.services import notify
+        notify(user, message, on_commit=True)
     
     @staticmethod
     def notify_task_completion(task):
         """Notify about task completion"""
-        try:
-            from notifications.models import Notification
-            Notification.objects.create(
-                user=task.assigned_by,
-                message=f'Task "{task.title}" has been completed by {task.assigned_to.name}',
-                notification_type='success'
-            )
-        except ImportError:
-            pass
+        from notifications.services import notify
+        if not task.assigned_by_id:
+            return
+        notify(
+            task.assigned_by,
+            'Task "{title}" has been completed by {name}',
+            on_commit=True, title=task.title, name=task.assigned_to.name,
+        )
     
     @staticmethod
     def notify_status_change(task, old_status, new_status, user):
         """Notify about status change"""
-        try:
-            from notifications.models import Notification
-            # Notify the task creator if different from the user changing status
-            if task.assigned_by != user:
-                Notification.objects.create(
-                    user=task.assigned_by,
-                    message=f'Task "{task.title}" status changed from {old_status} to {new_status} by {user.name}',
-                    notification_type='info'
-                )
-        except ImportError:
-            pass
+        from notifications.services import notify
+        # Notify the task creator if different from the user changing status
+        if task.assigned_by_id and task.assigned_by_id != user.pk:
+            notify(
+                task.assigned_by,
+                'Task "{title}" status changed from {old} to {new} by {name}',
+                on_commit=True, title=task.title, old=old_status, new=new_status, name=user.name,
+            )
     
     @staticmethod
     def notify_comment(task, comment, user):
         """Notify about new comment"""
-        try:
-            from notifications.models import Notification
-            # Notify the task creator and assignee if different from commenter
-            recipients = []
-            if task.assigned_by != user:
-                recipients.append(task.assigned_by)
-            if task.assigned_to != user and task.assigned_to != task.assigned_by:
-                recipients.append(task.assigned_to)
-            
-            for recipient in recipients:
-                Notification.objects.create(
-                    user=recipient,
-                    message=f'New comment on task "{task.title}" by {user.name}',
-                    notification_type='info'
-                )
-        except ImportError:
-            pass
+        from notifications.services import notify
+        # Notify the task creator and assignee if different from commenter
+        recipients = {task.assigned_by_id, task.assigned_to_id} - {user.pk, None}
+        if recipients:
+            notify(
+                recipients,
+                'New comment on task "{title}" by {name}',
+                on_commit=True, title=task.title, name=user.name,
+            )
+
+    @staticmethod
+    def notify_attendance_reminder(recipients, reminder_date):
+        """Remind a queryset of users to check in; returns the number notified"""
+        from notifications.services import notify
+        return notify(
+            recipients,
+            'Reminder: please make sure your attendance is marked for {date}',
+            date=reminder_date.isoformat(),
+        )
+
+    @staticmethod
+    def notify_attendance_session_created(recipients, session_name, session_date):
+        """Tell a queryset of managers about a new attendance session; returns the number notified"""
+        from notifications.services import notify
+        return notify(
+            recipients,
+            'Attendance session "{name}" has been created for {date}',
+            name=session_name, date=session_date.isoformat(),
+        )
 
 def get_context_with_filters(request, **kwargs):
     """
@@ -257,28 +267,28 @@ def handle_task_creation(request, post_data):
     Helper function to handle task creation
     """
     try:
+        from tasks import events
         from tasks.models import Task
         from accounts.models import User
         
-        # Create task from POST data
-        task = Task.objects.create(
-            title=post_data.get('title', ''),
-            description=post_data.get('description', ''),
-            status=post_data.get('status', 'PENDING'),
-            priority=post_data.get('priority', 'MEDIUM'),
-            team=post_data.get('team', 'TECH'),
-            assigned_by=request.user,
-            due_date=post_data.get('due_date') if post_data.get('due_date') else None
-        )
-        
-        # Assign task to user if specified
+        # Resolve the assignee first so the task is written once
+        assigned_to = None
         assigned_to_id = post_data.get('assigned_to')
         if assigned_to_id:
-            try:
-                task.assigned_to = User.objects.get(id=assigned_to_id)
-                task.save()
-            except User.DoesNotExist:
-                pass
+            assigned_to = User.objects.filter(id=assigned_to_id).first()
+        
+        with transaction.atomic():
+            task = Task.objects.create(
+                title=post_data.get('title', ''),
+                description=post_data.get('description', ''),
+                status=post_data.get('status', 'PENDING'),
+                priority=post_data.get('priority', 'MEDIUM'),
+                team=post_data.get('team', 'TECH'),
+                assigned_to=assigned_to,
+                assigned_by=request.user,
+                due_date=post_data.get('due_date') if post_data.get('due_date') else None
+            )
+            events.record_created(task, request.user)
         
         return task
     except Exception as e:
@@ -0,0 +1,105 @@
+"""
+Versioned cache entries for derived data such as dashboards
+
+Every scope of source data ('tasks', 'users', 'attendance', or a per-user
+scope like 'notifications:42') has a random version token in the cache.
+Entries embed the tokens of the scopes they were built from, so bumping a
+scope makes every dependent entry unreachable at once; it then simply
+expires. A token that gets evicted is replaced by a fresh random one,
+which can only cause a miss, never a stale hit.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_PREFIX = 'version:'
+METRICS_PREFIX = 'cache-metrics:'
+
+# Bumped by invalidate_dashboards to drop every dashboard entry at once
+ALL_DASHBOARDS = 'dashboards'
+
+CONTEXT_TIMEOUT = 300
+
+
+def user_scope(scope, user_id):
+    return f'{scope}:{user_id}'
+
+
+def new_token():
+    return uuid.uuid4().hex[:12]
+
+
+def versions(*scopes):
+    """Current tokens for scopes, joined into one key fragment"""
+    keys = [VERSION_PREFIX + scope for scope in scopes]
+    tokens = cache.get_many(keys)
+    for key in keys:
+        if key not in tokens:
+            token = new_token()
+            # Another process may have just set it; use theirs if so
+            tokens[key] = token if cache.add(key, token, None) else (cache.get(key) or token)
+    return '-'.join(tokens[key] for key in keys)
+
+
+def bump(*scopes):
+    """
+    Invalidate everything built from scopes. Bumped now and again on commit,
+    so an entry rebuilt from pre-commit data in between doesn't survive.
+    """
+    if not scopes:
+        return
+
+    def write():
+        cache.set_many({VERSION_PREFIX + scope: new_token() for scope in scopes}, None)
+
+    write()
+    transaction.on_commit(write)
+
+
+def record(name, outcome):
+    """Count a 'hits' or 'misses' outcome for name"""
+    key = f'{METRICS_PREFIX}{name}:{outcome}'
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def metrics(*names):
+    """{name: {'hits': n, 'misses': n, 'hit_rate': pct}}"""
+    keys = [f'{METRICS_PREFIX}{name}:{outcome}' for name in names for outcome in ('hits', 'misses')]
+    counts = cache.get_many(keys)
+    result = {}
+    for name in names:
+        hits = counts.get(f'{METRICS_PREFIX}{name}:hits', 0)
+        misses = counts.get(f'{METRICS_PREFIX}{name}:misses', 0)
+        total = hits + misses
+        result[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total * 100, 1) if total else 0.0,
+        }
+    return result
+
+
+def reset_metrics(*names):
+    cache.delete_many([f'{METRICS_PREFIX}{name}:{outcome}' for name in names for outcome in ('hits', 'misses')])
+
+
+def cached(name, scopes, build, *key_parts, timeout=CONTEXT_TIMEOUT):
+    """
+    Return build() cached under name/key_parts and the current versions of
+    scopes, recording a hit or miss for name. The value must be picklable
+    (evaluate querysets to lists first).
+    """
+    key = ':'.join(['cached', name, *map(str, key_parts), versions(*scopes)])
+    value = cache.get(key)
+    if value is None:
+        record(name, 'misses')
+        value = build()
+        cache.set(key, value, timeout)
+    else:
+        record(name, 'hits')
+    return value
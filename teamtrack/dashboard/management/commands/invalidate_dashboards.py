@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core.versioned_cache import ALL_DASHBOARDS, bump, metrics, reset_metrics
+from dashboard.views import DASHBOARDS
+
+
+class Command(BaseCommand):
+    help = 'Invalidate cached dashboards (without clearing the rest of the cache) and show hit/miss metrics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scope', action='append', default=[],
+            help='Only bump this data scope (tasks, users, attendance, notifications:<user id>); repeatable',
+        )
+        parser.add_argument('--stats', action='store_true', help='Show hit/miss metrics without invalidating')
+        parser.add_argument('--reset-stats', action='store_true', help='Zero the hit/miss counters')
+
+    def handle(self, *args, **options):
+        if options['stats'] or options['reset_stats']:
+            for name, counts in metrics(*DASHBOARDS).items():
+                self.stdout.write(
+                    f"📊 {name}: {counts['hits']} hits, {counts['misses']} misses ({counts['hit_rate']}% hit rate)"
+                )
+            if options['reset_stats']:
+                reset_metrics(*DASHBOARDS)
+                self.stdout.write('✅ Metrics reset')
+            return
+
+        scopes = options['scope'] or [ALL_DASHBOARDS]
+        bump(*scopes)
+        self.stdout.write(self.style.SUCCESS(f"✅ Invalidated dashboard cache scopes: {', '.join(scopes)}"))
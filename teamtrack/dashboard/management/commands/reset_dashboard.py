@@ -1,17 +1,16 @@
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
-from django.core.cache import cache
 from tasks.models import Task
 from accounts.models import User
 
 class Command(BaseCommand):
-    help = 'Clear cache and reset dashboard data'
+    help = 'Invalidate cached dashboards and show dashboard data'
 
     def handle(self, *args, **options):
-        self.stdout.write('🧹 Clearing cache and resetting dashboard...')
+        self.stdout.write('🧹 Invalidating dashboard cache and resetting dashboard...')
         
-        # Clear all cache
-        cache.clear()
-        self.stdout.write('✅ Cache cleared')
+        # Drop cached dashboards only; sessions and other entries stay
+        call_command('invalidate_dashboards', stdout=self.stdout)
         
         # Check current task count
         task_count = Task.objects.count()
@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from attendance.models import AttendanceRecord
+from core.versioned_cache import bump, user_scope
+from notifications.models import Notification
+from tasks.models import Task, TaskComment
+
+# Bulk writes (bulk_create, QuerySet.update) send no signals; those code
+# paths call core.versioned_cache.bump themselves.
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=TaskComment)
+@receiver(post_delete, sender=TaskComment)
+def task_changed(sender, **kwargs):
+    bump('tasks')
+
+
+@receiver(post_save, sender=AttendanceRecord)
+@receiver(post_delete, sender=AttendanceRecord)
+def attendance_changed(sender, **kwargs):
+    bump('attendance')
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def notification_changed(sender, instance, **kwargs):
+    bump(user_scope('notifications', instance.recipient_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, update_fields=None, **kwargs):
+    # Logging in only touches last_login, which no dashboard shows
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump('users')
@@ -1,3 +1,302 @@
+import csv
+import io
+import json
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from attendance.models import AttendanceRecord
+from core.stats import TaskStats
+from core.versioned_cache import metrics
+from dashboard.views import DASHBOARDS
+from tasks.models import Task, TaskComment
+
+
+def make_user(email, team, **extra):
+    return User.objects.create_user(email=email, password='pass1234', name=email.split('@')[0], team=team, **extra)
+
+
+def make_task(assigned_to, status='PENDING', **extra):
+    return Task.objects.create(
+        title=f'{assigned_to.name} {status}',
+        assigned_to=assigned_to,
+        assigned_by=extra.pop('assigned_by', assigned_to),
+        team=assigned_to.team,
+        status=status,
+        **extra
+    )
+
+
+class TaskStatsTests(TestCase):
+    def setUp(self):
+        yesterday = timezone.now().date() - timedelta(days=1)
+        self.tech = make_user('tech@example.com', 'TECH')
+        self.design = make_user('design@example.com', 'DESIGN')
+        make_task(self.tech, 'PENDING', due_date=yesterday)
+        make_task(self.tech, 'IN_PROGRESS')
+        make_task(self.tech, 'COMPLETED', due_date=yesterday)
+        make_task(self.design, 'COMPLETED')
+
+    def test_summary_is_one_query(self):
+        with self.assertNumQueries(1):
+            stats = TaskStats.summary(Task.objects.filter(assigned_to=self.tech))
+        self.assertEqual(stats, {'total': 3, 'pending': 1, 'in_progress': 1, 'completed': 1, 'overdue': 1})
+
+    def test_by_team_is_one_query(self):
+        with self.assertNumQueries(1):
+            totals, teams = TaskStats.by_team()
+        self.assertEqual(totals['total'], 4)
+        self.assertEqual(totals['completed'], 2)
+        self.assertEqual(teams['TECH']['total'], 3)
+        self.assertEqual(teams['DESIGN']['completed'], 1)
+        self.assertEqual(TaskStats.completion_rate(totals), 50.0)
+
+    def test_task_manager_stats_is_one_query(self):
+        from task_manager import TaskManager
+
+        with self.assertNumQueries(1):
+            success, stats = TaskManager.get_task_stats()
+        self.assertTrue(success)
+        self.assertEqual(stats['total_tasks'], 4)
+        self.assertEqual(stats['pending_tasks'], 1)
+        self.assertEqual(stats['in_progress_tasks'], 1)
+        self.assertEqual(stats['completed_tasks'], 2)
+        self.assertEqual(stats['overdue_tasks'], 1)
+
+
+class DashboardQueryCountTests(TestCase):
+    """The number of queries per dashboard must not grow with teams or tasks"""
+
+    def setUp(self):
+        self.manager = make_user('pm@example.com', 'PROJECT_MANAGER')
+        self.member = make_user('member@example.com', 'TECH')
+        make_task(self.member, 'PENDING', assigned_by=self.manager)
+
+    def grow_dataset(self):
+        for team_code, _ in User.TEAMS:
+            user = make_user(f'{team_code}@example.com', team_code)
+            for status in ('PENDING', 'IN_PROGRESS', 'COMPLETED'):
+                make_task(user, status, assigned_by=self.manager)
+                make_task(self.member, status, assigned_by=self.manager)
+
+    def count_queries(self, url):
+        # Measure the cold path; cached unread counts would otherwise differ between requests
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, user, url):
+        self.client.force_login(user)
+        before = self.count_queries(url)
+        self.grow_dataset()
+        self.assertEqual(self.count_queries(url), before)
+
+    def test_admin_dashboard(self):
+        self.assertConstantQueries(self.manager, reverse('dashboard:admin'))
+
+    def test_manager_dashboard(self):
+        self.assertConstantQueries(self.manager, reverse('dashboard:manager'))
+
+    def test_member_dashboard(self):
+        self.assertConstantQueries(self.member, reverse('dashboard:member'))
+
+
+class MemberFeedTests(TestCase):
+    def setUp(self):
+        self.member = make_user('member@example.com', 'TECH')
+        self.client.force_login(self.member)
+        self.tasks = [make_task(self.member) for _ in range(25)]
+        # Ties on created_at must still page deterministically by id
+        Task.objects.filter(pk__in=[t.pk for t in self.tasks[5:15]]).update(created_at=self.tasks[5].created_at)
+
+    def test_feed_pages_cover_all_tasks_once(self):
+        from core.pagination import cursor_paginate
+        from dashboard.views import team_feed_queryset
+
+        seen = []
+        cursor = None
+        while True:
+            page = cursor_paginate(team_feed_queryset(), cursor, per_page=10)
+            seen.extend(task.pk for task in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(sorted(seen), sorted(t.pk for t in self.tasks))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_feed_endpoint_is_bounded(self):
+        # User and one page of tasks; the session is served from the cache
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('dashboard:member_feed'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'data-feed-url')
+        self.assertEqual(len(response.context['feed_page']), 10)
+
+    def test_member_dashboard_renders_first_page_only(self):
+        response = self.client.get(reverse('dashboard:member'))
+        self.assertEqual(len(response.context['feed_page']), 10)
+        self.assertNotIn('all_team_tasks', response.context)
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.manager = make_user('pm@example.com', 'PROJECT_MANAGER')
+        self.member = make_user('member@example.com', 'TECH')
+        make_task(self.member, 'PENDING', assigned_by=self.manager)
+
+    def get(self, user, name):
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse(f'dashboard:{name}'))
+        self.assertEqual(response.status_code, 200)
+        return response, len(context.captured_queries)
+
+    def test_second_request_is_served_from_cache(self):
+        for user, name in ((self.manager, 'admin'), (self.manager, 'manager'), (self.member, 'member')):
+            _, cold = self.get(user, name)
+            response, warm = self.get(user, name)
+            self.assertLess(warm, cold, name)
+        self.assertEqual(
+            {name: (counts['hits'], counts['misses']) for name, counts in metrics(*DASHBOARDS).items()},
+            {'admin': (1, 1), 'manager': (1, 1), 'member': (1, 1)},
+        )
+
+    def test_admin_fragment_skips_task_list_query(self):
+        self.get(self.manager, 'admin')
+        self.client.force_login(self.manager)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse('dashboard:admin'))
+        self.assertFalse(any('"tasks_task"' in query['sql'] for query in context.captured_queries))
+
+    def test_signals_invalidate(self):
+        response, _ = self.get(self.member, 'member')
+        self.assertEqual(response.context['total_tasks'], 1)
+
+        make_task(self.member, 'COMPLETED', assigned_by=self.manager)
+        response, _ = self.get(self.member, 'member')
+        self.assertEqual(response.context['total_tasks'], 2)
+        self.assertEqual(response.context['completed_tasks'], 1)
+
+    def test_bulk_paths_invalidate(self):
+        from notifications.services import notify
+
+        response, _ = self.get(self.member, 'member')
+        self.assertEqual(response.context['recent_notifications'], [])
+
+        notify(self.member, 'Bulk inserted')
+        response, _ = self.get(self.member, 'member')
+        self.assertEqual([n.message for n in response.context['recent_notifications']], ['Bulk inserted'])
+
+        self.client.force_login(self.manager)
+        self.client.post(reverse('attendance:mark'), {'date': '2025-10-01', 'present_users[]': [self.member.pk]})
+        response, _ = self.get(self.member, 'member')
+        self.assertEqual(response.context['attendance_stats']['present_days'], 1)
+
+    def test_login_does_not_invalidate(self):
+        self.get(self.manager, 'admin')
+        self.client.logout()
+        self.client.login(email='pm@example.com', password='pass1234')
+        self.client.get(reverse('dashboard:admin'))
+        self.assertEqual(metrics('admin')['admin']['hits'], 1)
+
+    def test_invalidate_command(self):
+        self.get(self.member, 'member')
+        out = io.StringIO()
+        call_command('invalidate_dashboards', stdout=out)
+        self.get(self.member, 'member')
+        self.assertEqual(metrics('member')['member']['misses'], 2)
+
+        call_command('invalidate_dashboards', '--stats', stdout=out)
+        self.assertIn('member: 0 hits, 2 misses', out.getvalue())
+
+
+class SessionCacheProfileTests(TestCase):
+    def test_shared_profiles_hit_across_workers(self):
+        out = io.StringIO()
+        call_command('benchmark_sessions', '--profiles', 'locmem,file,db', '--workers', '4',
+                     '--sessions', '20', '--lookups', '200', '--json', stdout=out)
+        results = {row['profile']: row for row in json.loads(out.getvalue())}
+
+        # A per-process cache misses whenever a request lands on another worker
+        self.assertLess(results['locmem']['hit_rate'], 100)
+        self.assertEqual(results['file']['hit_rate'], 100)
+        self.assertEqual(results['db']['hit_rate'], 100)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.manager = make_user('pm@example.com', 'PROJECT_MANAGER')
+        self.tech = make_user('tech@example.com', 'TECH')
+        self.design = make_user('design@example.com', 'DESIGN')
+        self.task = make_task(self.tech, assigned_by=self.manager)
+        Task.objects.filter(pk=self.task.pk).update(title='Ship "v2", then rest')
+        make_task(self.design, assigned_by=self.manager)
+        TaskComment.objects.create(task=self.task, author=self.tech, message='Line one\nline two')
+        AttendanceRecord.objects.create(member=self.tech, date=date(2025, 1, 6), status='Present')
+        AttendanceRecord.objects.create(member=self.design, date=date(2025, 1, 7), status='Late')
+        self.client.force_login(self.manager)
+
+    def download(self, kind, fmt='csv', **params):
+        response = self.client.get(reverse('dashboard:export', args=[kind, fmt]), params)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_task_csv_has_names_and_honours_team(self):
+        response, body = self.download('tasks', team='TECH')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="tasks-', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(body.decode('utf-8-sig'))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['Title'], 'Ship "v2", then rest')
+        self.assertEqual((rows[0]['Assigned to'], rows[0]['Assigned by']), ('tech', 'pm'))
+
+        _, body = self.download('comments')
+        rows = list(csv.DictReader(io.StringIO(body.decode('utf-8-sig'))))
+        self.assertEqual(rows[0]['Message'], 'Line one\nline two')
+
+    def test_csv_cells_never_start_a_formula(self):
+        Task.objects.filter(pk=self.task.pk).update(title='=HYPERLINK("http://evil.example","x")', description='-2+3')
+        _, body = self.download('tasks', team='TECH')
+        [row] = csv.DictReader(io.StringIO(body.decode('utf-8-sig')))
+        self.assertEqual(row['Title'], '\'=HYPERLINK("http://evil.example","x")')
+        self.assertEqual(row['Description'], "'-2+3")
+        self.assertEqual(row['ID'], str(self.task.pk))
+
+    def test_attendance_xlsx_date_range(self):
+        response, body = self.download('attendance', 'xlsx', date_from='2025-01-07', date_to='2025-01-31')
+        self.assertIn('spreadsheetml', response['Content-Type'])
+        sheet = zipfile.ZipFile(io.BytesIO(body)).read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 2)
+        self.assertIn('design@example.com', sheet)
+        self.assertNotIn('tech@example.com', sheet)
+
+    def test_rejects_members_and_bad_input(self):
+        self.assertEqual(self.client.get(reverse('dashboard:export', args=['tasks', 'pdf'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('dashboard:export', args=['users', 'csv'])).status_code, 404)
+        response = self.client.get(reverse('dashboard:export', args=['tasks', 'csv']), {'date_from': '2025-02-30'})
+        self.assertEqual(response.status_code, 400)
+        self.client.force_login(self.tech)
+        self.assertEqual(self.client.get(reverse('dashboard:export', args=['tasks', 'csv'])).status_code, 403)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('export_data', 'attendance', '--team', 'TECH', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
 
-# Create your tests here.
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'tasks.xlsx'
+            call_command('export_data', 'tasks', '--format', 'xlsx', '-o', str(path), stderr=io.StringIO())
+            self.assertEqual(zipfile.ZipFile(path).read('xl/worksheets/sheet1.xml').decode().count('<row>'), 3)
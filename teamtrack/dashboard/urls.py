@@ -6,4 +6,6 @@ urlpatterns = [
     path("admin/", views.admin_dashboard, name="admin"),
     path("manager/", views.manager_dashboard, name="manager"),
     path("member/", views.member_dashboard, name="member"),
+    path("member/feed/", views.member_feed, name="member_feed"),
+    path("export/<slug:kind>.<slug:fmt>", views.export, name="export"),
 ]
@@ -1,11 +1,35 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.db.models import Count, Q
+from django.http import Http404, HttpResponseBadRequest, HttpResponseForbidden, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from datetime import timedelta
 from accounts.models import User
 from tasks.models import Task
 from notifications.models import Notification
+from core import exports
+from core.stats import TaskStats
+from core.utils import PermissionMixin
+from core.pagination import cursor_paginate
+from core.versioned_cache import ALL_DASHBOARDS, cached, user_scope, versions
+
+FEED_PAGE_SIZE = 10
+
+DASHBOARDS = ('admin', 'manager', 'member')
+
+# Source data each dashboard's cached context is built from (see dashboard.signals)
+ADMIN_SCOPES = (ALL_DASHBOARDS, 'tasks', 'users')
+MANAGER_SCOPES = (ALL_DASHBOARDS, 'tasks', 'users')
+
+
+def member_scopes(user):
+    return (ALL_DASHBOARDS, 'tasks', 'users', 'attendance', user_scope('notifications', user.pk))
+
+
+def team_feed_queryset():
+    """Tasks from all teams with the users the feed template displays"""
+    return Task.objects.select_related('assigned_to', 'assigned_by')
 
 @login_required
 def home_redirect(request):
@@ -14,142 +38,175 @@ def home_redirect(request):
     else:
         return redirect("dashboard:member")
 
-@login_required
-def admin_dashboard(request):
-    # Task analytics - ALL tasks in the system
-    all_tasks = Task.objects.all()
-    total_tasks = all_tasks.count()
-    completed_tasks = all_tasks.filter(status="COMPLETED").count()
-    pending_tasks = all_tasks.filter(status="PENDING").count()
-    in_progress_tasks = all_tasks.filter(status="IN_PROGRESS").count()
-    overdue_tasks = all_tasks.filter(
-        status__in=["PENDING", "IN_PROGRESS"], 
-        due_date__lt=timezone.now().date()
-    ).count()
+def admin_context():
+    # Task analytics - ALL tasks in the system, global and per team in one query
+    task_totals, tasks_by_team = TaskStats.by_team(Task.objects.all())
+    
+    # User counts per team (also gives the global user totals)
+    users_by_team = {
+        row['team']: row
+        for row in User.objects.order_by().values('team').annotate(
+            users=Count('id'),
+            active=Count('id', filter=Q(is_active=True)),
+        )
+    }
     
     # Team-based task distribution
     team_stats = {}
     for team_code, team_name in User.TEAMS:
-        team_users = User.objects.filter(team=team_code)
-        team_tasks = Task.objects.filter(assigned_to__in=team_users)
-        team_pending = team_tasks.filter(status="PENDING").count()
+        team_tasks = tasks_by_team.get(team_code, {})
         team_stats[team_name] = {
-            'total': team_tasks.count(),
-            'pending': team_pending,
-            'completed': team_tasks.filter(status="COMPLETED").count(),
-            'in_progress': team_tasks.filter(status="IN_PROGRESS").count(),
-            'users': team_users.count()
+            'total': team_tasks.get('total', 0),
+            'pending': team_tasks.get('pending', 0),
+            'completed': team_tasks.get('completed', 0),
+            'in_progress': team_tasks.get('in_progress', 0),
+            'users': users_by_team.get(team_code, {}).get('users', 0)
         }
     
-    # User analytics
-    total_users = User.objects.count()
-    active_users = User.objects.filter(is_active=True).count()
-    team_members = User.objects.filter(is_active=True).exclude(team='PROJECT_MANAGER')
-    
-    # Recent activity - ALL tasks
-    recent_tasks = all_tasks.order_by('-created_at')[:10]
-    
-    # All tasks for admin view
-    all_tasks_list = all_tasks.order_by('-created_at')
-    
-    data = {
-        "all_tasks": all_tasks_list,
-        "total_tasks": total_tasks,
-        "completed_tasks": completed_tasks,
-        "pending_tasks": pending_tasks,
-        "in_progress_tasks": in_progress_tasks,
-        "overdue_tasks": overdue_tasks,
-        "total_users": total_users,
-        "active_users": active_users,
-        "team_members": team_members,
-        "recent_tasks": recent_tasks,
-        "completion_rate": round((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 1),
+    return {
+        "total_tasks": task_totals['total'],
+        "completed_tasks": task_totals['completed'],
+        "pending_tasks": task_totals['pending'],
+        "in_progress_tasks": task_totals['in_progress'],
+        "overdue_tasks": task_totals['overdue'],
+        # User analytics
+        "total_users": sum(row['users'] for row in users_by_team.values()),
+        "active_users": sum(row['active'] for row in users_by_team.values()),
+        "team_member_count": sum(
+            row['active'] for team, row in users_by_team.items() if team != 'PROJECT_MANAGER'
+        ),
+        # Recent activity - ALL tasks
+        "recent_tasks": list(Task.objects.select_related('assigned_to').order_by('-created_at')[:10]),
+        "completion_rate": TaskStats.completion_rate(task_totals),
         "team_stats": team_stats,
     }
-    return render(request,"dashboard/admin.html", data)
 
 @login_required
-def manager_dashboard(request):
+def admin_dashboard(request):
+    today = timezone.localdate()
+    data = cached('admin', ADMIN_SCOPES, admin_context, today)
+    data.update({
+        # Only evaluated when the template's all-tasks fragment is re-rendered
+        "all_tasks": Task.objects.select_related('assigned_to').order_by('-created_at'),
+        "team_members": User.objects.filter(is_active=True).exclude(team='PROJECT_MANAGER'),
+        "dashboard_version": versions(*ADMIN_SCOPES),
+    })
+    return render(request,"dashboard/admin.html", data)
+
+def manager_context(user):
     # Tasks assigned by this manager
-    assigned_tasks = Task.objects.filter(assigned_by=request.user)
-    total_assigned = assigned_tasks.count()
-    completed_assigned = assigned_tasks.filter(status="COMPLETED").count()
-    pending_assigned = assigned_tasks.filter(status="PENDING").count()
+    assigned_tasks = Task.objects.filter(assigned_by=user).select_related('assigned_to')
+    assigned_stats = TaskStats.summary(assigned_tasks)
     
-    # Team members
-    team_members = User.objects.filter(
-        tasks__assigned_by=request.user
-    ).distinct()
-    
-    # Recent tasks
-    recent_tasks = assigned_tasks.order_by('-created_at')[:5]
-    
-    data = {
-        "assigned_tasks": assigned_tasks,
-        "total_assigned": total_assigned,
-        "completed_assigned": completed_assigned,
-        "pending_assigned": pending_assigned,
-        "team_members": team_members,
-        "recent_tasks": recent_tasks,
-        "completion_rate": round((completed_assigned / total_assigned * 100) if total_assigned > 0 else 0, 1),
+    return {
+        "total_assigned": assigned_stats['total'],
+        "completed_assigned": assigned_stats['completed'],
+        "pending_assigned": assigned_stats['pending'],
+        # Recent tasks
+        "recent_tasks": list(assigned_tasks.order_by('-created_at')[:5]),
+        "completion_rate": TaskStats.completion_rate(assigned_stats),
     }
-    return render(request,"dashboard/manager.html", data)
 
 @login_required
-def member_dashboard(request):
+def manager_dashboard(request):
+    data = cached(
+        'manager', MANAGER_SCOPES, lambda: manager_context(request.user),
+        request.user.pk, timezone.localdate(),
+    )
+    data.update({
+        "assigned_tasks": Task.objects.filter(assigned_by=request.user).select_related('assigned_to'),
+        # Team members
+        "team_members": User.objects.filter(tasks__assigned_by=request.user).distinct(),
+    })
+    return render(request,"dashboard/manager.html", data)
+
+def member_context(user):
     # User's tasks
-    user_tasks = Task.objects.filter(assigned_to=request.user)
-    total_tasks = user_tasks.count()
-    completed_tasks = user_tasks.filter(status="COMPLETED").count()
-    pending_tasks = user_tasks.filter(status="PENDING").count()
-    in_progress_tasks = user_tasks.filter(status="IN_PROGRESS").count()
-    overdue_tasks = user_tasks.filter(
-        status__in=["PENDING", "IN_PROGRESS"], 
-        due_date__lt=timezone.now().date()
-    ).count()
+    user_tasks = Task.objects.filter(assigned_to=user)
+    task_stats = TaskStats.summary(user_tasks)
     
-    # All tasks from all teams (for dashboard visibility)
-    all_team_tasks = Task.objects.all().order_by('-created_at')
+    # First page of the all-teams task feed; later pages come from member_feed
+    feed_page = cursor_paginate(team_feed_queryset(), per_page=FEED_PAGE_SIZE)
     
-    # Team tasks (all pending tasks for the user's team)
-    team_users = User.objects.filter(team=request.user.team)
-    team_tasks = Task.objects.filter(
-        assigned_to__in=team_users,
-        status="PENDING"
-    ).order_by('-created_at')
+    # Pending tasks across all teams for the sidebar
+    pending_feed_tasks = Task.objects.filter(status="PENDING").select_related('assigned_to').order_by('-created_at')[:FEED_PAGE_SIZE]
     
     # Recent notifications
     recent_notifications = Notification.objects.filter(
-        recipient=request.user
+        recipient=user
     ).order_by('-created_at')[:5]
     
-    # Recent tasks
-    recent_tasks = user_tasks.order_by('-created_at')[:5]
-    
     # User's attendance records
     from attendance.models import AttendanceRecord
-    user_attendance_all = AttendanceRecord.objects.filter(member=request.user).order_by('-date')
-    user_attendance = user_attendance_all[:10]
-    attendance_stats = {
-        'total_records': user_attendance_all.count(),
-        'present_days': user_attendance_all.filter(status='Present').count(),
-        'absent_days': user_attendance_all.filter(status='Absent').count(),
-    }
+    user_attendance_all = AttendanceRecord.objects.filter(member=user).order_by('-date')
+    attendance_stats = user_attendance_all.aggregate(
+        total_records=Count('id'),
+        present_days=Count('id', filter=Q(status='Present')),
+        absent_days=Count('id', filter=Q(status='Absent')),
+    )
     
-    data = {
-        "tasks": user_tasks,
-        "total_tasks": total_tasks,
-        "completed_tasks": completed_tasks,
-        "pending_tasks": pending_tasks,
-        "in_progress_tasks": in_progress_tasks,
-        "overdue_tasks": overdue_tasks,
-        "recent_notifications": recent_notifications,
-        "recent_tasks": recent_tasks,
-        "completion_rate": round((completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 1),
-        "team_tasks": team_tasks,
-        "all_team_tasks": all_team_tasks,
-        "team_name": request.user.get_team_display(),
-        "user_attendance": user_attendance,
+    return {
+        "total_tasks": task_stats['total'],
+        "completed_tasks": task_stats['completed'],
+        "pending_tasks": task_stats['pending'],
+        "in_progress_tasks": task_stats['in_progress'],
+        "overdue_tasks": task_stats['overdue'],
+        "recent_notifications": list(recent_notifications),
+        "recent_tasks": list(user_tasks.order_by('-created_at')[:5]),
+        "completion_rate": TaskStats.completion_rate(task_stats),
+        "feed_page": feed_page,
+        "pending_feed_tasks": list(pending_feed_tasks),
+        "team_name": user.get_team_display(),
+        "user_attendance": list(user_attendance_all[:10]),
         "attendance_stats": attendance_stats,
     }
+
+@login_required
+def member_dashboard(request):
+    user = request.user
+    data = cached(
+        'member', member_scopes(user), lambda: member_context(user),
+        user.pk, timezone.localdate(),
+    )
+    data.update({
+        "tasks": Task.objects.filter(assigned_to=user),
+        # Team tasks (all pending tasks for the user's team)
+        "team_tasks": Task.objects.filter(
+            assigned_to__team=user.team,
+            status="PENDING"
+        ).select_related('assigned_to').order_by('-created_at'),
+    })
     return render(request,"dashboard/member.html", data)
+
+@login_required
+def member_feed(request):
+    """Next page of the all-teams task feed as an HTML fragment"""
+    feed_page = cursor_paginate(
+        team_feed_queryset(), request.GET.get('cursor'), FEED_PAGE_SIZE
+    )
+    return render(request, "dashboard/task_feed.html", {"feed_page": feed_page})
+
+@login_required
+def export(request, kind, fmt):
+    """
+    Stream tasks, comments or attendance as CSV or XLSX. Optional filters:
+    ?date_from= and ?date_to= (YYYY-MM-DD, inclusive) and ?team=
+    """
+    if not PermissionMixin.is_project_manager(request.user):
+        return HttpResponseForbidden('Only Project Managers can export data.')
+    if kind not in exports.DATASETS or fmt not in exports.FORMATS:
+        raise Http404('Unknown export')
+
+    filters = {'team': request.GET.get('team') or None}
+    for name in ('date_from', 'date_to'):
+        value = request.GET.get(name, '')
+        try:
+            filters[name] = parse_date(value) if value else None
+        except ValueError:
+            filters[name] = None
+        if value and filters[name] is None:
+            return HttpResponseBadRequest(f'{name} must be a date in YYYY-MM-DD format')
+
+    response = StreamingHttpResponse(exports.export(kind, fmt, **filters), content_type=exports.FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{kind}-{timezone.localdate():%Y%m%d}.{fmt}"'
+    return response
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .services import unread_count
+
+
+def unread_notifications(request):
+    """
+    unread_notification_count for the navbar badge (evaluated only when a
+    template uses it, then served from cache when warm) and whether pages
+    should open the live notification stream.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {
+        'unread_notification_count': SimpleLazyObject(lambda: unread_count(user)),
+        'notification_stream': getattr(settings, 'NOTIFICATION_STREAM', False),
+    }
@@ -0,0 +1,89 @@
+import json
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.versioned_cache import bump, user_scope
+from notifications.models import Notification
+
+
+class Command(BaseCommand):
+    help = 'Delete (optionally archiving first) read notifications older than --days, in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90,
+                            help='Keep read notifications newer than this many days (default 90)')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows deleted per transaction; keeps each lock short (default 1000)')
+        parser.add_argument('--archive', metavar='PATH',
+                            help='Append each row to this JSON Lines file before deleting it')
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Seconds to pause between batches to let other writers in')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many rows would be removed')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['batch_size'] < 1:
+            raise CommandError('--days must be >= 0 and --batch-size >= 1')
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        expired = Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f'🔍 {expired.count()} read notifications older than {cutoff:%Y-%m-%d} would be removed')
+            return
+
+        table = connection.ops.quote_name(Notification._meta.db_table)
+        pk_column = connection.ops.quote_name(Notification._meta.pk.column)
+        archive = open(options['archive'], 'a', encoding='utf-8') if options['archive'] else None
+        processed = batches = 0
+        last_pk = 0
+        started = time.monotonic()
+        try:
+            while True:
+                # Walk the primary key so each batch starts where the last one ended
+                batch = list(
+                    expired.filter(pk__gt=last_pk).order_by('pk')
+                    .values('pk', 'recipient_id', 'message', 'created_at')[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                last_pk = batch[-1]['pk']
+                ids = [row['pk'] for row in batch]
+
+                with transaction.atomic():
+                    if archive:
+                        for row in batch:
+                            row['created_at'] = row['created_at'].isoformat()
+                            archive.write(json.dumps(row) + '\n')
+                        archive.flush()
+                    # One plain DELETE per batch: delete() would load every row to send
+                    # the dashboard post_delete signal, which bumps a scope per row. Only
+                    # read rows go, so unread counts stand; the recipients' scopes are
+                    # bumped once. Notification has no cascades for delete() to follow.
+                    with connection.cursor() as cursor:
+                        cursor.execute(
+                            f'DELETE FROM {table} WHERE {pk_column} IN ({", ".join(["%s"] * len(ids))})',
+                            ids,
+                        )
+                    bump(*{user_scope('notifications', row['recipient_id']) for row in batch})
+
+                processed += len(ids)
+                batches += 1
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'  batch {batches}: {len(ids)} rows (up to id {last_pk})')
+                if options['sleep']:
+                    time.sleep(options['sleep'])
+        finally:
+            if archive:
+                archive.close()
+
+        elapsed = time.monotonic() - started
+        rate = processed / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {"Archived and deleted" if archive else "Deleted"} {processed} notifications '
+            f'in {batches} batches, {elapsed:.2f}s ({rate:.0f} rows/s)'
+        ))
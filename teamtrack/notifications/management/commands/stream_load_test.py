@@ -0,0 +1,169 @@
+import asyncio
+import time
+
+import psutil
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from accounts.models import User
+from notifications.models import Notification
+from notifications.pubsub import get_broker
+from notifications.services import notify
+
+LOAD_TEST_MESSAGE = 'Stream load test notification'
+
+
+class Command(BaseCommand):
+    help = (
+        'Hold many idle notification streams open against the ASGI app in this '
+        'process, sample CPU while they idle, then time a fan-out to all of them'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=2000,
+                            help='Streams to open (default 2000)')
+        parser.add_argument('--users', type=int, default=50,
+                            help='Active users the streams are spread across (default 50)')
+        parser.add_argument('--duration', type=float, default=20,
+                            help='Seconds to hold the streams idle while sampling CPU (default 20)')
+        parser.add_argument('--max-cpu', type=float,
+                            help='Fail if average CPU while idle exceeds this percentage')
+        parser.add_argument('--no-publish', action='store_true',
+                            help='Skip the fan-out: no notifications are written')
+
+    def handle(self, *args, **options):
+        users = list(User.objects.filter(is_active=True).order_by('pk')[:options['users']])
+        if not users:
+            raise CommandError('No active users; create some first (e.g. explain_queries --seed)')
+
+        session_store = import_string(f'{settings.SESSION_ENGINE}.SessionStore')
+        sessions = []
+        for user in users:
+            session = session_store()
+            session[SESSION_KEY] = str(user.pk)
+            session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+            session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+            session.create()
+            sessions.append((user, session))
+
+        try:
+            # The stream view is off unless NOTIFICATION_STREAM is set; this
+            # command serves it from its own in-process ASGI app regardless
+            with override_settings(NOTIFICATION_STREAM=True):
+                result = asyncio.run(self.run(sessions, options))
+        finally:
+            for _, session in sessions:
+                session.delete()
+            Notification.objects.filter(message=LOAD_TEST_MESSAGE).delete()
+
+        self.report(result, options)
+
+    async def run(self, sessions, options):
+        application = get_asgi_application()
+        path = reverse('notifications:stream')
+        process = psutil.Process()
+        received = {}
+        statuses = {}
+        disconnect = asyncio.Event()
+
+        async def connect(index):
+            user, session = sessions[index % len(sessions)]
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+                'root_path': '', 'query_string': b'',
+                'headers': [
+                    (b'host', b'localhost'),
+                    (b'cookie', f'{settings.SESSION_COOKIE_NAME}={session.session_key}'.encode()),
+                ],
+                'client': ('127.0.0.1', 10000 + index), 'server': ('localhost', 80),
+            }
+            sent_request = False
+
+            async def receive():
+                nonlocal sent_request
+                if not sent_request:
+                    sent_request = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses[index] = message['status']
+                if message['type'] == 'http.response.body' and b'event: notification' in message.get('body', b''):
+                    received[index] = time.perf_counter()
+
+            await application(scope, receive, send)
+
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(connect(i)) for i in range(options['connections'])]
+        broker = get_broker()
+        while broker.connection_count() < options['connections']:
+            if any(task.done() for task in tasks):
+                index, failed = next((i, task) for i, task in enumerate(tasks) if task.done())
+                status = statuses.get(index)
+                if failed.exception():
+                    reason = failed.exception()
+                elif status in (401, 403):
+                    reason = f'HTTP {status}, check authentication'
+                else:
+                    reason = f'HTTP {status}'
+                raise CommandError(f'A stream closed early: {reason}')
+            await asyncio.sleep(0.05)
+        opened = time.perf_counter() - start
+
+        # Idle phase: nothing is published, keepalives are the only traffic
+        process.cpu_percent(None)
+        samples = []
+        deadline = time.monotonic() + options['duration']
+        while time.monotonic() < deadline:
+            await asyncio.sleep(1)
+            samples.append(process.cpu_percent(None))
+
+        fanout = None
+        if not options['no_publish']:
+            users = [user for user, _ in sessions]
+            published = time.perf_counter()
+            await sync_to_async(notify)(users, LOAD_TEST_MESSAGE)
+            while len(received) < options['connections'] and time.perf_counter() - published < 30:
+                await asyncio.sleep(0.01)
+            fanout = (len(received), max(received.values(), default=published) - published)
+
+        connections = broker.connection_count()
+        disconnect.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        return {
+            'connections': connections,
+            'opened': opened,
+            'samples': samples,
+            'rss': process.memory_info().rss,
+            'fanout': fanout,
+        }
+
+    def report(self, result, options):
+        samples = result['samples'] or [0.0]
+        average = sum(samples) / len(samples)
+        self.stdout.write(f"🔌 {result['connections']} streams open in {result['opened']:.2f}s")
+        self.stdout.write(
+            f'🖥️  CPU while idle over {len(samples)}s: avg {average:.1f}%, '
+            f'min {min(samples):.1f}%, max {max(samples):.1f}%'
+        )
+        self.stdout.write(f"💾 RSS {result['rss'] / 2**20:.0f} MiB "
+                          f"({result['rss'] / max(result['connections'], 1) / 1024:.1f} KiB per stream incl. baseline)")
+        if result['fanout']:
+            delivered, seconds = result['fanout']
+            self.stdout.write(f'📣 Fan-out delivered to {delivered} streams in {seconds * 1000:.0f}ms')
+
+        if options['max_cpu'] is not None and average > options['max_cpu']:
+            raise CommandError(f"Average idle CPU {average:.1f}% exceeds --max-cpu {options['max_cpu']}%")
+        self.stdout.write(self.style.SUCCESS('✅ Load test finished'))
@@ -0,0 +1,138 @@
+"""
+Publish/subscribe for live notification delivery
+
+notifications.services publishes every new Notification once it commits;
+the SSE stream view subscribes per connected recipient. The broker is
+chosen by settings.NOTIFICATION_BROKER (a dotted path). InProcessBroker
+only reaches connections served by the same process, so deployments that
+run several ASGI workers should switch to RedisBroker.
+"""
+import asyncio
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per connection before a slow client starts losing them;
+# the browser recovers missed rows via Last-Event-ID on reconnect
+QUEUE_SIZE = 100
+
+
+def serialize(notification):
+    return {
+        'id': notification.pk,
+        'message': notification.message,
+        'is_read': notification.is_read,
+        'created_at': notification.created_at.isoformat() if notification.created_at else None,
+    }
+
+
+class InProcessBroker:
+    """
+    Per-user sets of asyncio queues. publish() may be called from any thread;
+    delivery is handed to each subscriber's event loop.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    async def subscribe(self, user_id):
+        queue = asyncio.Queue(QUEUE_SIZE)
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(entry)
+        return queue
+
+    async def unsubscribe(self, user_id, queue):
+        with self._lock:
+            entries = self._subscribers.get(user_id, set())
+            entries.difference_update({entry for entry in entries if entry[1] is queue})
+            if not entries:
+                self._subscribers.pop(user_id, None)
+
+    def publish(self, user_id, event):
+        with self._lock:
+            entries = list(self._subscribers.get(user_id, ()))
+        for loop, queue in entries:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:
+                pass  # Loop already closed; unsubscribe will follow
+
+    @staticmethod
+    def _deliver(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning('Dropping notification %s for a slow stream', event.get('id'))
+
+    def connection_count(self):
+        with self._lock:
+            return sum(len(entries) for entries in self._subscribers.values())
+
+
+class RedisBroker:
+    """
+    Redis PUBLISH/SUBSCRIBE on one channel per user, for multi-process
+    deployments. Needs the redis package and settings.NOTIFICATION_BROKER_URL.
+    """
+    def __init__(self):
+        self.url = getattr(settings, 'NOTIFICATION_BROKER_URL', 'redis://localhost:6379/0')
+        self._client = None
+        self._readers = {}
+
+    @staticmethod
+    def channel(user_id):
+        return f'notifications:{user_id}'
+
+    def publish(self, user_id, event):
+        import redis
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(self.channel(user_id), json.dumps(event))
+
+    async def subscribe(self, user_id):
+        import redis.asyncio as redis_asyncio
+        queue = asyncio.Queue(QUEUE_SIZE)
+        pubsub = redis_asyncio.Redis.from_url(self.url).pubsub()
+        await pubsub.subscribe(self.channel(user_id))
+
+        async def read():
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    InProcessBroker._deliver(queue, json.loads(message['data']))
+
+        self._readers[id(queue)] = (pubsub, asyncio.create_task(read()))
+        return queue
+
+    async def unsubscribe(self, user_id, queue):
+        pubsub, reader = self._readers.pop(id(queue), (None, None))
+        if reader:
+            reader.cancel()
+            await pubsub.aclose()
+
+
+_broker = None
+
+
+def get_broker():
+    """The process-wide broker from settings.NOTIFICATION_BROKER"""
+    global _broker
+    if _broker is None:
+        path = getattr(settings, 'NOTIFICATION_BROKER', 'notifications.pubsub.InProcessBroker')
+        _broker = import_string(path)()
+    return _broker
+
+
+def publish_notifications(notifications):
+    """Push committed notifications to live streams; delivery is best effort"""
+    broker = get_broker()
+    try:
+        for notification in notifications:
+            broker.publish(notification.recipient_id, serialize(notification))
+    except Exception:
+        logger.exception('Could not publish %d notifications', len(notifications))
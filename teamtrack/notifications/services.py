@@ -0,0 +1,140 @@
+"""
+Notification fan-out
+
+Callers describe who gets which message; the batch resolves recipients and
+writes every Notification with a single bulk_create inside a transaction,
+optionally deferred until the surrounding transaction commits.
+
+Each user's unread count is cached (see unread_count); every write path
+here keeps that entry current once its transaction commits. New rows are
+also published to live streams (see notifications.pubsub) on commit.
+"""
+from django.core.cache import cache
+from django.db import models, transaction
+
+from core.versioned_cache import bump, user_scope
+from .models import Notification
+from .pubsub import publish_notifications
+
+# Rows per INSERT; keeps large fan-outs under backend parameter limits
+BATCH_SIZE = 500
+
+# Upper bound on how long a cached unread count can drift from the table
+UNREAD_COUNT_TIMEOUT = 300
+
+
+def unread_cache_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def unread_count(user):
+    """Unread notifications for user; one indexed COUNT on a cache miss, no query on a hit"""
+    key = unread_cache_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(recipient=user, is_read=False).count()
+        cache.set(key, count, UNREAD_COUNT_TIMEOUT)
+    return count
+
+
+def invalidate_unread_counts(user_ids):
+    """Drop cached counts after the current transaction commits, and the users' cached dashboards"""
+    user_ids = set(user_ids)
+    keys = [unread_cache_key(pk) for pk in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+    bump(*[user_scope('notifications', pk) for pk in user_ids])
+
+
+def _decrement_unread(user_id):
+    key = unread_cache_key(user_id)
+    try:
+        # Atomic on memcached/redis; never let a stale entry go negative
+        if cache.decr(key) < 0:
+            cache.delete(key)
+    except ValueError:
+        pass  # Not cached; the next read counts
+
+
+def mark_read(user, pk):
+    """Mark one of user's notifications read; returns False if it was already read"""
+    updated = Notification.objects.filter(pk=pk, recipient=user, is_read=False).update(is_read=True)
+    if updated:
+        transaction.on_commit(lambda: _decrement_unread(user.pk))
+        bump(user_scope('notifications', user.pk))
+    return bool(updated)
+
+
+def mark_all_read(user):
+    """Mark every unread notification for user read in one UPDATE; returns the row count"""
+    updated = Notification.objects.filter(recipient=user, is_read=False).update(is_read=True)
+    if updated:
+        # Dropped rather than set to 0: a notification created meanwhile still counts
+        invalidate_unread_counts([user.pk])
+    return updated
+
+
+def recipient_ids(recipients):
+    """
+    Ids from a User queryset, an iterable of users/ids, or a single user;
+    None (e.g. a task whose assigner was deleted) is skipped
+    """
+    if recipients is None:
+        return []
+    if isinstance(recipients, models.QuerySet):
+        return list(recipients.values_list('pk', flat=True))
+    if isinstance(recipients, models.Model):
+        return [recipients.pk]
+    ids = (getattr(recipient, 'pk', recipient) for recipient in recipients)
+    return [pk for pk in ids if pk is not None]
+
+
+class NotificationBatch:
+    """
+    Collects (recipients, template) pairs and writes them in one go:
+
+        batch = NotificationBatch()
+        batch.add(absent_users, 'Attendance marked: Absent on {date}', date=day)
+        batch.add(manager, 'Attendance marked for {date}', date=day)
+        batch.send()
+    """
+    def __init__(self):
+        self.pending = []
+
+    def add(self, recipients, template, **context):
+        """Queue template.format(**context) for every recipient"""
+        self.pending.append((recipients, template.format(**context) if context else template))
+        return self
+
+    def build(self):
+        notifications = []
+        for recipients, message in self.pending:
+            notifications.extend(
+                Notification(recipient_id=pk, message=message) for pk in recipient_ids(recipients)
+            )
+        return notifications
+
+    def write(self):
+        notifications = self.build()
+        if notifications:
+            with transaction.atomic():
+                Notification.objects.bulk_create(notifications, batch_size=BATCH_SIZE)
+                invalidate_unread_counts(n.recipient_id for n in notifications)
+                transaction.on_commit(lambda: publish_notifications(notifications))
+        self.pending = []
+        return len(notifications)
+
+    def send(self, on_commit=False):
+        """
+        Write the queued notifications and return how many were created. With
+        on_commit=True the write (and recipient lookup) waits for the current
+        transaction to commit and is dropped if it rolls back; returns None.
+        """
+        if on_commit:
+            transaction.on_commit(self.write)
+            return None
+        return self.write()
+
+
+def notify(recipients, template, on_commit=False, **context):
+    """Send one message to many recipients"""
+    return NotificationBatch().add(recipients, template, **context).send(on_commit=on_commit)
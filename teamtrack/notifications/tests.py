@@ -1,3 +1,337 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import shutil
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from core.utils import NotificationMixin
+from tasks.models import Task, TaskComment
+from .models import Notification
+from .pubsub import get_broker, publish_notifications
+from .views import notification_events
+from .services import NotificationBatch, mark_all_read, notify, recipient_ids, unread_count
+
+
+def add_users(count, team='TECH', start=0):
+    User.objects.bulk_create([
+        User(email=f'user{i}@example.com', name=f'User {i}', team=team)
+        for i in range(start, start + count)
+    ])
+
+
+class NotifyTests(TestCase):
+    def test_one_insert_for_a_queryset(self):
+        add_users(30)
+        # One SELECT for the ids, then savepoint + INSERT + release
+        with self.assertNumQueries(4):
+            created = notify(User.objects.all(), 'Hello {team}', team='TECH')
+        self.assertEqual(created, 30)
+        self.assertEqual(Notification.objects.filter(message='Hello TECH').count(), 30)
+
+    def test_batch_mixes_templates(self):
+        add_users(3)
+        users = list(User.objects.order_by('pk'))
+        batch = NotificationBatch()
+        batch.add(users[:2], 'First')
+        batch.add(users[2], 'Second')
+        self.assertEqual(batch.send(), 3)
+        self.assertEqual(Notification.objects.get(message='Second').recipient, users[2])
+
+    def test_context_values_are_not_reformatted(self):
+        add_users(1)
+        notify(User.objects.all(), 'Task "{title}"', title='{oops}')
+        self.assertEqual(Notification.objects.get().message, 'Task "{oops}"')
+
+    def test_on_commit_waits_for_commit(self):
+        add_users(2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertIsNone(notify(User.objects.all(), 'Deferred', on_commit=True))
+            self.assertFalse(Notification.objects.exists())
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_on_commit_dropped_on_rollback(self):
+        add_users(2)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    notify(User.objects.all(), 'Rolled back', on_commit=True)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertFalse(Notification.objects.exists())
+
+
+class NotificationCallerTests(TestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user(
+            email='pm@example.com', password='pass1234', name='PM', team='PROJECT_MANAGER'
+        )
+        self.member = User.objects.create_user(email='dev@example.com', password='pass1234', name='Dev')
+
+    def test_comment_notifies_everyone_but_the_author(self):
+        task = Task.objects.create(title='Ship it', assigned_to=self.member, assigned_by=self.manager)
+        comment = TaskComment.objects.create(task=task, author=self.member, message='Done')
+        with self.captureOnCommitCallbacks(execute=True):
+            NotificationMixin.notify_comment(task, comment, self.member)
+        self.assertEqual(
+            list(Notification.objects.values_list('recipient', 'message')),
+            [(self.manager.pk, 'New comment on task "Ship it" by Dev')],
+        )
+
+    def test_task_without_assigner(self):
+        # assigned_by is SET_NULL when the assigner is deleted
+        task = Task.objects.create(title='Orphan', assigned_to=self.member, assigned_by=None)
+        comment = TaskComment.objects.create(task=task, author=self.manager, message='Still needed?')
+        self.client.force_login(self.member)
+        with self.captureOnCommitCallbacks(execute=True):
+            NotificationMixin.notify_comment(task, comment, self.manager)
+            NotificationMixin.notify_task_completion(task)
+            response = self.client.post(reverse('tasks:task_status_update', args=[task.pk]), {'status': 'done'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            list(Notification.objects.values_list('recipient', 'message')),
+            [(self.member.pk, 'New comment on task "Orphan" by PM')],
+        )
+        self.assertEqual(recipient_ids([None, self.member, self.manager.pk]), [self.member.pk, self.manager.pk])
+
+    def test_attendance_reminder_command(self):
+        add_users(5)
+        out = io.StringIO()
+        call_command('send_attendance_reminders', '--date', '2025-10-01', stdout=out)
+        self.assertEqual(Notification.objects.count(), 7)
+        self.assertIn('Successfully sent 7 attendance reminders for 2025-10-01', out.getvalue())
+
+    def test_attendance_session_command(self):
+        out = io.StringIO()
+        call_command('create_attendance_session', 'Standup', '--date', '2025-10-01', stdout=out)
+        notification = Notification.objects.get()
+        self.assertEqual(notification.recipient, self.manager)
+        self.assertIn(date(2025, 10, 1).isoformat(), notification.message)
+        self.assertIn('notified 1 managers', out.getvalue())
+
+
+class UnreadCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='dev@example.com', password='pass1234', name='Dev')
+        self.client.force_login(self.user)
+
+    def send(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            notify([self.user] * count, 'Ping')
+
+    def test_cached_count_follows_writes(self):
+        self.send(3)
+        self.assertEqual(unread_count(self.user), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user), 3)
+
+        # New notifications invalidate the cached value
+        self.send(2)
+        self.assertEqual(unread_count(self.user), 5)
+
+        notification = Notification.objects.filter(recipient=self.user).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('notifications:mark_read', args=[notification.pk]))
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user), 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(mark_all_read(self.user), 4)
+        # Recounted once after marking all read, then cached again
+        with self.assertNumQueries(1):
+            self.assertEqual(unread_count(self.user), 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user), 0)
+
+    def test_badge_costs_no_query_when_cached(self):
+        self.send(2)
+        unread_count(self.user)
+        url = reverse('notifications:list')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertContains(
+            response, '<span id="notification-badge" class="badge rounded-pill bg-danger">2</span>', html=True
+        )
+        self.assertFalse(any(
+            'COUNT' in query['sql'] and '"is_read"' in query['sql'] for query in context.captured_queries
+        ))
+
+
+class BulkReadAndRetentionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='dev@example.com', password='pass1234', name='Dev')
+        notify([self.user] * 5, 'Ping')
+
+    def test_mark_all_read_is_one_update(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse('notifications:mark_all_read'))
+        updates = [q['sql'] for q in context.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertRedirects(response, reverse('notifications:list'))
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+
+        # GET does nothing
+        notify(self.user, 'Another')
+        self.client.get(reverse('notifications:mark_all_read'))
+        self.assertTrue(Notification.objects.filter(is_read=False).exists())
+
+    def test_prune_deletes_old_read_rows_in_batches(self):
+        old = timezone.now() - timedelta(days=120)
+        pks = list(Notification.objects.values_list('pk', flat=True))
+        Notification.objects.filter(pk__in=pks[:4]).update(created_at=old)
+        Notification.objects.filter(pk__in=pks[:3]).update(is_read=True)
+
+        archive = Path(tempfile.mkdtemp()) / 'archive.jsonl'
+        self.addCleanup(shutil.rmtree, archive.parent)
+        out = io.StringIO()
+        with CaptureQueriesContext(connection) as context, \
+                patch('notifications.management.commands.prune_notifications.bump') as bump:
+            call_command('prune_notifications', '--days', '90', '--batch-size', '2',
+                         '--archive', str(archive), stdout=out)
+        # One DELETE and one scope bump per batch; no per-row signals
+        deletes = [query['sql'] for query in context.captured_queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 2)
+        self.assertEqual(bump.call_count, 2)
+
+        # Old-but-unread and recent rows are kept
+        self.assertEqual(sorted(Notification.objects.values_list('pk', flat=True)), sorted(pks[3:]))
+        self.assertEqual([json.loads(line)['pk'] for line in archive.read_text().splitlines()], pks[:3])
+        self.assertIn('Archived and deleted 3 notifications in 2 batches', out.getvalue())
+        self.assertIn('rows/s', out.getvalue())
+
+
+class NotificationListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='dev@example.com', password='pass1234', name='Dev')
+        self.client.force_login(self.user)
+
+    def add_notifications(self, count):
+        notify([self.user] * count, 'Ping')
+
+    def test_first_page_cost_is_independent_of_history(self):
+        self.add_notifications(5)
+        # Both requests start cold: no cached session or unread count
+        cache.clear()
+        with CaptureQueriesContext(connection) as short_history:
+            self.client.get(reverse('notifications:list'))
+        self.add_notifications(200)
+        cache.clear()
+        with CaptureQueriesContext(connection) as long_history:
+            response = self.client.get(reverse('notifications:list'))
+        self.assertEqual(len(response.context['notifications']), 20)
+        self.assertEqual(len(short_history.captured_queries), len(long_history.captured_queries))
+
+    def test_feed_walks_every_notification_once(self):
+        self.add_notifications(45)
+        # Identical timestamps are ordered by id
+        Notification.objects.update(created_at=timezone.now())
+        seen = []
+        url = reverse('notifications:feed')
+        while url:
+            data = self.client.get(url).json()
+            seen.extend(item['id'] for item in data['results'])
+            url = data['next_url']
+        self.assertEqual(len(seen), 45)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_unread_filter(self):
+        self.add_notifications(3)
+        read = Notification.objects.first()
+        Notification.objects.filter(pk=read.pk).update(is_read=True)
+
+        response = self.client.get(reverse('notifications:list'), {'unread': '1'})
+        self.assertTrue(response.context['unread_only'])
+        self.assertNotIn(read, list(response.context['notifications']))
+        self.assertEqual(len(response.context['notifications']), 2)
+
+        data = self.client.get(reverse('notifications:feed'), {'unread': '1'}).json()
+        self.assertEqual({item['is_read'] for item in data['results']}, {False})
+
+    def test_only_own_notifications(self):
+        other = User.objects.create_user(email='other@example.com', password='pass1234', name='Other')
+        notify(other, 'Not yours')
+        self.assertEqual(self.client.get(reverse('notifications:feed')).json()['results'], [])
+
+
+@override_settings(NOTIFICATION_STREAM=True)
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='dev@example.com', password='pass1234', name='Dev')
+
+    async def next_chunk(self, stream):
+        chunk = await asyncio.wait_for(stream.__anext__(), 5)
+        return chunk.decode() if isinstance(chunk, bytes) else chunk
+
+    async def test_pushes_committed_notifications(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(reverse('notifications:stream'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await self.next_chunk(stream)).startswith('retry:'))
+
+        # The broker is subscribed by now; publish as a committed write would
+        notification = await Notification.objects.acreate(recipient=self.user, message='Deploy finished')
+        publish_notifications([notification])
+
+        event = await self.next_chunk(stream)
+        self.assertTrue(event.startswith(f'id: {notification.pk}\nevent: notification\n'))
+        self.assertEqual(json.loads(event.split('data: ', 1)[1])['message'], 'Deploy finished')
+        await stream.aclose()
+
+    @override_settings(NOTIFICATION_STREAM=False)
+    async def test_disabled_without_asgi_setting(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(reverse('notifications:stream'))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_closing_the_stream_unsubscribes(self):
+        before = get_broker().connection_count()
+        events = notification_events(self.user.pk, None)
+        await events.__anext__()
+        self.assertEqual(get_broker().connection_count(), before + 1)
+        await events.aclose()
+        self.assertEqual(get_broker().connection_count(), before)
+
+    async def test_replays_after_last_event_id(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        first = await Notification.objects.acreate(recipient=self.user, message='Seen')
+        missed = await Notification.objects.acreate(recipient=self.user, message='Missed')
+        response = await self.async_client.get(reverse('notifications:stream'), headers={'Last-Event-ID': str(first.pk)})
+        stream = aiter(response.streaming_content)
+        await self.next_chunk(stream)
+        self.assertIn(f'id: {missed.pk}\n', await self.next_chunk(stream))
+        await stream.aclose()
+
+    async def test_requires_login(self):
+        response = await self.async_client.get(reverse('notifications:stream'))
+        self.assertEqual(response.status_code, 401)
+
+
+class StreamLoadTestCommandTests(TransactionTestCase):
+    # The command's ASGI app reads the session and user from other threads,
+    # which only see committed rows
+    def test_runs_with_stream_setting_off(self):
+        User.objects.create_user(email='dev@example.com', password='pass1234', name='Dev')
+        out = io.StringIO()
+        with override_settings(NOTIFICATION_STREAM=False):
+            call_command('stream_load_test', '--connections', '2', '--users', '1', '--duration', '0', stdout=out)
+        self.assertIn('2 streams open', out.getvalue())
+        self.assertIn('Fan-out delivered to 2 streams', out.getvalue())
+        self.assertFalse(Notification.objects.exists())
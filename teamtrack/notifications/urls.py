@@ -5,5 +5,8 @@ app_name = "notifications"
 
 urlpatterns = [
     path("", views.notification_list, name="list"),
+    path("feed/", views.notification_feed, name="feed"),
+    path("stream/", views.notification_stream, name="stream"),
     path("<int:pk>/read/", views.mark_as_read, name="mark_read"),
+    path("read-all/", views.mark_all_as_read, name="mark_all_read"),
 ]
@@ -1,15 +1,143 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
+from django.contrib import messages
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import urlencode
+from core.pagination import cursor_paginate
 from .models import Notification
+from .pubsub import get_broker, serialize
+from .services import mark_all_read, mark_read
+
+NOTIFICATIONS_PER_PAGE = 20
+
+# Server-sent events: comment lines keep proxies from timing out idle
+# streams, and each stream ends after STREAM_LIFETIME so a connection the
+# server never noticed closing is reclaimed; EventSource reconnects with
+# Last-Event-ID and replays what it missed.
+STREAM_KEEPALIVE = 25
+STREAM_LIFETIME = 300
+STREAM_RETRY_MS = 3000
+STREAM_REPLAY_LIMIT = 50
+
+
+def notification_page(request):
+    """
+    One keyset page of the user's notifications, newest first. ?unread=1
+    limits it to unread ones; both are served by the recipient indexes.
+    """
+    unread_only = request.GET.get('unread') == '1'
+    notifications = Notification.objects.filter(recipient=request.user)
+    if unread_only:
+        notifications = notifications.filter(is_read=False)
+    page = cursor_paginate(notifications, request.GET.get('cursor'), NOTIFICATIONS_PER_PAGE)
+    return page, unread_only
 
 @login_required
 def notification_list(request):
-    notifications = Notification.objects.filter(recipient=request.user).order_by('-created_at')
-    return render(request, 'notifications/notification_list.html', {'notifications': notifications})
+    page, unread_only = notification_page(request)
+    return render(request, 'notifications/notification_list.html', {
+        'notifications': page,
+        'unread_only': unread_only,
+    })
+
+@login_required
+def notification_feed(request):
+    """JSON page of notifications for infinite scroll"""
+    page, unread_only = notification_page(request)
+    next_url = None
+    if page.has_next:
+        params = {'cursor': page.next_cursor, **({'unread': '1'} if unread_only else {})}
+        next_url = f"{reverse('notifications:feed')}?{urlencode(params)}"
+    return JsonResponse({
+        'results': [
+            {
+                'id': notification.pk,
+                'message': notification.message,
+                'is_read': notification.is_read,
+                'created_at': notification.created_at.isoformat(),
+                'mark_read_url': reverse('notifications:mark_read', args=[notification.pk]),
+            }
+            for notification in page
+        ],
+        'next_cursor': page.next_cursor,
+        'next_url': next_url,
+    })
 
 @login_required
 def mark_as_read(request, pk):
-    notification = get_object_or_404(Notification, pk=pk, recipient=request.user)
-    notification.is_read = True
-    notification.save()
+    if not mark_read(request.user, pk):
+        # Already read, or not this user's
+        get_object_or_404(Notification, pk=pk, recipient=request.user)
+    return redirect('notifications:list')
+
+@login_required
+def mark_all_as_read(request):
+    """Mark every unread notification read with a single UPDATE"""
+    if request.method == 'POST':
+        updated = mark_all_read(request.user)
+        messages.success(request, f'Marked {updated} notification{"s" if updated != 1 else ""} as read.')
     return redirect('notifications:list')
+
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event)}\n\n"
+
+
+async def notification_events(user_id, last_event_id):
+    broker = get_broker()
+    # Subscribe before replaying so nothing committed in between is lost
+    queue = await broker.subscribe(user_id)
+    try:
+        yield f'retry: {STREAM_RETRY_MS}\n\n'
+
+        replayed = last_event_id or 0
+        if last_event_id:
+            missed = await sync_to_async(list)(
+                Notification.objects.filter(recipient_id=user_id, pk__gt=last_event_id)
+                .order_by('pk')[:STREAM_REPLAY_LIMIT]
+            )
+            for notification in missed:
+                replayed = notification.pk
+                yield format_event(serialize(notification))
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + STREAM_LIFETIME
+        while loop.time() < deadline:
+            try:
+                event = await asyncio.wait_for(queue.get(), STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if event['id'] is None or event['id'] > replayed:
+                yield format_event(event)
+    finally:
+        await broker.unsubscribe(user_id, queue)
+
+
+async def notification_stream(request):
+    """
+    Push new notifications as server-sent events. Needs the ASGI app
+    (teamtrack.asgi): under WSGI the generator is drained synchronously, so
+    each request would hold a worker for STREAM_LIFETIME and then answer
+    all at once. Off (404) unless settings.NOTIFICATION_STREAM is set.
+    """
+    if not settings.NOTIFICATION_STREAM:
+        raise Http404('Notification streaming is disabled')
+    user = await sync_to_async(lambda: request.user if request.user.is_authenticated else None)()
+    if user is None:
+        return HttpResponse(status=401)
+
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    response = StreamingHttpResponse(
+        notification_events(user.pk, int(last_event_id) if last_event_id.isdigit() else None),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
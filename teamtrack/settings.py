@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import sys
 import dj_database_url
 from dotenv import load_dotenv
 
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # For static files in production
+    "core.middleware.QueryInstrumentationMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -61,7 +63,8 @@ ROOT_URLCONF = "teamtrack.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates that reports render time to core.middleware
+        "BACKEND": "core.middleware.InstrumentedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],  # global templates folder
         "APP_DIRS": True,
         "OPTIONS": {
@@ -70,6 +73,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "notifications.context_processors.unread_notifications",
             ],
         },
     },
@@ -122,6 +126,24 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Attachment offload to the front-end server: unset streams from Django,
+# "x-accel-redirect" hands off to an nginx internal location at
+# MEDIA_OFFLOAD_PREFIX, "x-sendfile" to Apache/lighttpd mod_xsendfile.
+MEDIA_OFFLOAD = os.getenv("MEDIA_OFFLOAD") or None
+MEDIA_OFFLOAD_PREFIX = os.getenv("MEDIA_OFFLOAD_PREFIX", "/protected-media/")
+
+# Comment image thumbnails are written under MEDIA_ROOT/thumbnails/ by a
+# background thread after upload; set False to generate them inline.
+THUMBNAIL_ASYNC = os.getenv("THUMBNAIL_ASYNC", "True") == "True"
+
+# Live notifications over server-sent events. Enable only when served by an
+# ASGI server (teamtrack.asgi), where an open stream doesn't hold a worker.
+# The in-process broker reaches streams in the same process; use
+# "notifications.pubsub.RedisBroker" with several workers.
+NOTIFICATION_STREAM = os.getenv("NOTIFICATION_STREAM", "False") == "True"
+NOTIFICATION_BROKER = os.getenv("NOTIFICATION_BROKER", "notifications.pubsub.InProcessBroker")
+NOTIFICATION_BROKER_URL = os.getenv("NOTIFICATION_BROKER_URL", "redis://localhost:6379/0")
+
 # ---------------------------------------------------------
 # CUSTOM USER MODEL
 # ---------------------------------------------------------
@@ -150,29 +172,114 @@ REST_FRAMEWORK = {
     ],
 }
 
+# ---------------------------------------------------------
+# SEARCH
+# ---------------------------------------------------------
+# Task search backend (dotted path). Unset picks by database vendor:
+# core.search.PostgresSearchBackend, core.search.SQLiteFTSSearchBackend,
+# or core.search.IContainsSearchBackend as the fallback.
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND") or None
+
 # ---------------------------------------------------------
 # CACHING
 # ---------------------------------------------------------
-CACHES = {
-    "default": {
+# CACHE_PROFILE picks the backend. "locmem" is per process, so every
+# gunicorn worker has its own cold copy and cache invalidation (dashboards,
+# unread counts) never reaches the other workers. "file" and "db" are
+# shared between the workers on one host ("db" uses the default database,
+# e.g. SQLite; run createcachetable once). "redis" and "memcached" are
+# shared across hosts and need the redis / pymemcache packages.
+# CACHE_LOCATION overrides the profile's location.
+CACHE_PROFILE = os.getenv("CACHE_PROFILE", "locmem")
+CACHE_LOCATION = os.getenv("CACHE_LOCATION")
+CACHE_PROFILES = {
+    "locmem": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "unique-snowflake",
-        "TIMEOUT": 300,  # 5 minutes
+        "LOCATION": CACHE_LOCATION or "unique-snowflake",
         "OPTIONS": {
             "MAX_ENTRIES": 1000,
             "CULL_FREQUENCY": 3,
         }
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": CACHE_LOCATION or str(BASE_DIR / "cache"),
+        "OPTIONS": {
+            # Culling lists the directory, so keep it rare
+            "MAX_ENTRIES": 20000,
+        }
+    },
+    "db": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": CACHE_LOCATION or "teamtrack_cache",
+        "OPTIONS": {
+            "MAX_ENTRIES": 20000,
+        }
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": CACHE_LOCATION or "redis://127.0.0.1:6379/1",
+    },
+    "memcached": {
+        "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+        "LOCATION": CACHE_LOCATION or "127.0.0.1:11211",
+    },
+}
+CACHES = {
+    "default": {
+        **CACHE_PROFILES[CACHE_PROFILE],
+        "TIMEOUT": 300,  # 5 minutes
     }
 }
+# The task API's ETags come from cache version tokens, which never expire.
+# With a per-process cache a worker that didn't see a write would keep
+# answering 304 for the old data, so they are only sent from a shared cache.
+API_ETAGS = os.getenv("API_ETAGS", str(CACHE_PROFILE != "locmem")) == "True"
 
-# ---------------------------------------------------------
-# PERFORMANCE OPTIMIZATIONS
-# ---------------------------------------------------------
-# Session optimization
+# Sessions are read from the cache profile above and written through to the
+# database, so a cold or evicted cache only costs a query
 SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
 SESSION_CACHE_ALIAS = "default"
 SESSION_COOKIE_AGE = 86400  # 24 hours
 
+# ---------------------------------------------------------
+# QUERY INSTRUMENTATION (core.middleware)
+# ---------------------------------------------------------
+TESTING = sys.argv[1:2] == ["test"]
+# Server-Timing header with query count, DB, render and total time
+SERVER_TIMING = os.getenv("SERVER_TIMING", str(DEBUG)) == "True"
+# Over-budget views raise in tests and only log elsewhere: by the time the
+# budget is checked the view has already committed its writes
+QUERY_BUDGET_STRICT = TESTING
+QUERY_BUDGET_DEFAULT = 20
+# Maximum queries per URL name, with a cold session and cache. These don't
+# grow with the data; a view that needs more has grown an N+1.
+QUERY_BUDGETS = {
+    "dashboard:admin": 10,
+    "dashboard:manager": 8,
+    "dashboard:member": 12,
+    "dashboard:member_feed": 5,
+    "tasks:task_list": 8,
+    "tasks:task_detail": 6,
+    "tasks:task_comments": 6,
+    "tasks:task_create": 8,
+    "tasks:task_update": 9,
+    "notifications:list": 6,
+    "notifications:feed": 5,
+    "attendance:list": 10,
+    "accounts:profile": 8,
+    # Bulk upserts and notifications split into batches that grow with
+    # headcount (or operation count) on SQLite (999 parameters per statement)
+    "attendance:mark": None,
+    "api:task-bulk": None,
+    "api:task-import": None,
+}
+# Log a stack trace when one SELECT runs this often in a request
+QUERY_DUPLICATE_THRESHOLD = 3
+
+# ---------------------------------------------------------
+# PERFORMANCE OPTIMIZATIONS
+# ---------------------------------------------------------
 # Security optimizations
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -195,5 +302,9 @@ LOGGING = {
             "level": "INFO",
             "propagate": True,
         },
+        "core.middleware": {
+            "handlers": ["file"],
+            "level": "WARNING",
+        },
     },
 }
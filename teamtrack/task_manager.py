@@ -3,6 +3,7 @@ Task management utilities for recovery and maintenance
 """
 from django.utils import timezone
 from tasks.models import Task
+from core.stats import DASHBOARD_STATUSES, TaskStats
 import logging
 
 logger = logging.getLogger(__name__)
@@ -45,12 +46,17 @@ class TaskManager:
         Get statistics about tasks
         """
         try:
+            totals = TaskStats.summary(
+                Task.objects.all(),
+                statuses={**DASHBOARD_STATUSES, 'cancelled': 'CANCELLED'},
+            )
             stats = {
-                'total_tasks': Task.objects.count(),
-                'pending_tasks': Task.objects.filter(status='pending').count(),
-                'in_progress_tasks': Task.objects.filter(status='in_progress').count(),
-                'completed_tasks': Task.objects.filter(status='completed').count(),
-                'cancelled_tasks': Task.objects.filter(status='cancelled').count(),
+                'total_tasks': totals['total'],
+                'pending_tasks': totals['pending'],
+                'in_progress_tasks': totals['in_progress'],
+                'completed_tasks': totals['completed'],
+                'cancelled_tasks': totals['cancelled'],
+                'overdue_tasks': totals['overdue'],
             }
             return True, stats
         except Exception as e:
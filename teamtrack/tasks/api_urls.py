@@ -0,0 +1,10 @@
+from rest_framework.routers import DefaultRouter
+
+from .api_views import TaskViewSet
+
+app_name = "api"
+
+router = DefaultRouter()
+router.register("tasks", TaskViewSet, basename="task")
+
+urlpatterns = router.urls
@@ -0,0 +1,202 @@
+"""
+REST API for tasks (mounted at /api/v1/)
+
+Tasks are read one by one or in lists; writes go through the bulk endpoint
+(see tasks.bulk). Lists use keyset (cursor) pagination on (created_at, id),
+so polling the first page stays cheap at any table size. With a shared
+cache (settings.API_ETAGS), responses carry a weak ETag built from the
+'tasks' and 'users' cache versions (see core.versioned_cache), so a
+conditional GET for unchanged data is answered with 304 before any task is
+loaded.
+"""
+import hashlib
+import io
+from datetime import date
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+
+from core.utils import PermissionMixin
+from core.versioned_cache import cached, versions
+from . import events, imports
+from .bulk import apply_operations
+from .models import Task
+from .serializers import BULK_OPERATIONS, BulkTaskSerializer, TaskEventSerializer, TaskSerializer, requested_fields
+
+# Any write to these scopes changes every ETag the API hands out
+ETAG_SCOPES = ('tasks', 'users')
+
+RELATED_FIELDS = ('assigned_to', 'assigned_by')
+
+# Matched exactly against the stored value; each takes a comma-separated list
+LIST_FILTERS = ('status', 'priority', 'team')
+
+# ?param -> due_date lookup
+DATE_FILTERS = {
+    'due_date': 'due_date',
+    'due_before': 'due_date__lte',
+    'due_after': 'due_date__gte',
+}
+
+
+class TaskCursorPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    # Served by the task_created_idx index
+    ordering = ('-created_at', '-id')
+
+
+class ConditionalGetMixin:
+    """
+    Weak ETags from cache versions, and 304 for a matching If-None-Match.
+    Off unless settings.API_ETAGS: a per-process cache's version tokens
+    would validate stale data indefinitely on workers that missed the write.
+    """
+
+    def etag(self, request):
+        parts = [
+            versions(*ETAG_SCOPES),
+            str(request.user.pk),
+            self.action,
+            request.accepted_renderer.format,
+            request.get_full_path(),
+        ]
+        return 'W/"%s"' % hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+    def conditional(self, request, respond):
+        if not settings.API_ETAGS:
+            response = respond()
+            response['Cache-Control'] = 'private, no-cache'
+            return response
+        etag = self.etag(request)
+        sent = {tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))}
+        if etag.removeprefix('W/') in sent or '*' in sent:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = respond()
+        response['ETag'] = etag
+        # Clients may keep the body but must revalidate before reusing it
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class TaskViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Tasks visible to the user: all of them for Project Managers, otherwise
+    the ones assigned to them. Filters: status, priority, team (each a
+    comma-separated list), due_date, due_before, due_after (YYYY-MM-DD).
+    ?fields=id,title,... trims each object to those fields.
+
+    POST bulk/ (Project Managers only) takes {"operations": [...]}, each
+    {"op": "create" | "update" | "reassign" | "delete", ...}, and applies all
+    of them or, if any is invalid, none. POST import/ (also Project Managers
+    only) takes a multipart CSV "file"; see tasks.imports.
+
+    GET <id>/timeline/ pages through the task's change events, newest first;
+    GET analytics/ reports cycle time and time in status from those events
+    for the tasks the filters select.
+    """
+    serializer_class = TaskSerializer
+    pagination_class = TaskCursorPagination
+
+    def get_queryset(self):
+        user = self.request.user
+        if PermissionMixin.is_project_manager(user):
+            queryset = Task.objects.all()
+        else:
+            queryset = Task.objects.filter(assigned_to=user)
+
+        # Join only the users that will be serialized
+        fields = requested_fields(self.request)
+        related = [name for name in RELATED_FIELDS if fields is None or name in fields]
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset
+
+    def filter_queryset(self, queryset):
+        """Apply the query-string filters; a malformed date is a 400"""
+        params = self.request.query_params
+        errors = {}
+        for param in LIST_FILTERS:
+            values = [value.strip() for value in params.get(param, '').split(',') if value.strip()]
+            if values:
+                queryset = queryset.filter(**{f'{param}__in': values})
+        for param, lookup in DATE_FILTERS.items():
+            if not params.get(param):
+                continue
+            try:
+                value = date.fromisoformat(params[param])
+            except ValueError:
+                errors[param] = 'Expected a date in YYYY-MM-DD format'
+            else:
+                queryset = queryset.filter(**{lookup: value})
+        if errors:
+            raise ValidationError(errors)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(request, lambda: super(TaskViewSet, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(request, lambda: super(TaskViewSet, self).retrieve(request, *args, **kwargs))
+
+    @action(detail=True)
+    def timeline(self, request, pk=None):
+        def respond():
+            queryset = self.get_object().events.select_related('actor')
+            page = self.paginate_queryset(queryset)
+            return self.get_paginated_response(TaskEventSerializer(page, many=True).data)
+        return self.conditional(request, respond)
+
+    @action(detail=False)
+    def analytics(self, request):
+        def build():
+            tasks = self.filter_queryset(self.get_queryset())
+            return {
+                'cycle_time': events.cycle_time_summary(tasks),
+                'time_in_status': events.time_in_status(tasks),
+            }
+
+        # Walks every matching event, so it is kept until a task changes;
+        # the open statuses' time-so-far is as of the cached computation
+        visible_to = 'all' if PermissionMixin.is_project_manager(request.user) else request.user.pk
+        return self.conditional(request, lambda: Response(
+            cached('task_analytics', ETAG_SCOPES, build, visible_to, request.GET.urlencode())
+        ))
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        if not PermissionMixin.is_project_manager(request.user):
+            raise PermissionDenied('Only Project Managers can change tasks in bulk.')
+        # Validation loads (and on PostgreSQL locks) the tasks the writes depend on
+        with transaction.atomic():
+            serializer = BulkTaskSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            results = apply_operations(request.user, serializer.validated_data['operations'])
+        counts = {op: sum(result['op'] == op for result in results) for op in BULK_OPERATIONS}
+        return Response({'results': results, 'counts': counts})
+
+    @action(detail=False, methods=['post'], url_path='import', url_name='import', parser_classes=[MultiPartParser])
+    def import_csv(self, request):
+        """?strict=true imports nothing if any row is invalid; ?dry_run=true only validates"""
+        if not PermissionMixin.is_project_manager(request.user):
+            raise PermissionDenied('Only Project Managers can import tasks.')
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'Upload a CSV file.'})
+        flags = {name: request.query_params.get(name, '').lower() in ('1', 'true', 'yes') for name in ('strict', 'dry_run')}
+        try:
+            lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            report = imports.import_tasks(lines, assigned_by=request.user, **flags)
+        except UnicodeDecodeError:
+            raise ValidationError({'file': 'The file must be UTF-8 encoded CSV.'})
+        ok = not report.rolled_back and not (report.rows == 0 and report.failed)
+        return Response(report.as_dict(), status=status.HTTP_200_OK if ok else status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,112 @@
+"""
+Bulk task operations (POST /api/v1/tasks/bulk/)
+
+Operations arrive validated by serializers.BulkTaskSerializer. They are
+applied together: one bulk_create for the new tasks, one bulk_update for
+changed and reassigned ones, and one DELETE, followed by a single
+NotificationBatch written once the transaction commits, with every
+TaskEvent for the request in one more bulk_create. None of those send
+per-row model signals (the cascading delete runs with indexing suspended),
+so the search index and the 'tasks' cache version are updated here.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.search import get_search_backend, indexing_suspended
+from core.versioned_cache import bump
+from notifications.services import NotificationBatch
+from . import events
+from .models import Task, TaskEvent
+from .serializers import TASK_FIELDS
+
+# Rows per INSERT/UPDATE statement
+BATCH_SIZE = 500
+
+
+def apply_operations(user, operations):
+    """
+    Apply validated operations on behalf of user and return one
+    {'op', 'id'} per operation, in order
+    """
+    now = timezone.now()
+    created, updated, deleted = [], [], []
+    update_fields = {'updated_at'}
+    results = []
+    # Assignee -> tasks newly given to them; Tasks moved to COMPLETED
+    assignments = defaultdict(list)
+    completed = []
+    history = []
+
+    for operation in operations:
+        op = operation['op']
+        values = {name: operation[name] for name in TASK_FIELDS if name in operation}
+        if op == 'delete':
+            task = operation['task']
+            deleted.append(task.pk)
+        elif op == 'create':
+            task = Task(assigned_by=user, **values)
+            created.append(task)
+            assignments[task.assigned_to].append(task)
+        else:
+            task = operation['task']
+            previous_assignee, previous_status = task.assigned_to_id, task.status
+            before = events.snapshot(task)
+            for name, value in values.items():
+                setattr(task, name, value)
+            # bulk_update skips auto_now
+            task.updated_at = now
+            update_fields.update(values)
+            updated.append(task)
+            history.extend(events.changes(task, before, user, now))
+            if task.assigned_to_id != previous_assignee:
+                assignments[task.assigned_to].append(task)
+            if task.status == 'COMPLETED' and previous_status != 'COMPLETED':
+                completed.append(task)
+        results.append((op, task))
+
+    with transaction.atomic(), indexing_suspended():
+        Task.objects.bulk_create(created, batch_size=BATCH_SIZE)
+        # Backends that don't return ids from bulk_create (MySQL) leave pk unset
+        history.extend(events.created(task, user, now) for task in created if task.pk)
+        TaskEvent.objects.bulk_create(history, batch_size=BATCH_SIZE)
+        if updated:
+            Task.objects.bulk_update(updated, sorted(update_fields), batch_size=BATCH_SIZE)
+        if deleted:
+            Task.objects.filter(pk__in=deleted).delete()
+
+        search = get_search_backend()
+        search.index_tasks([task.pk for task in created + updated if task.pk])
+        search.remove_tasks(deleted)
+        bump('tasks')
+        notifications(user, assignments, completed).send(on_commit=True)
+
+    return [{'op': op, 'id': task.pk} for op, task in results]
+
+
+def add_assignment_notices(batch, user, assignments):
+    """
+    Queue one message per assignee however many tasks they were given;
+    assignments maps assignee id -> (task count, title of one of the tasks)
+    """
+    for assignee_id, (count, title) in assignments.items():
+        if assignee_id == user.pk:
+            continue
+        if count == 1:
+            batch.add([assignee_id], 'Task "{title}" has been assigned to you by {name}', title=title, name=user.name)
+        else:
+            batch.add([assignee_id], '{count} tasks have been assigned to you by {name}', count=count, name=user.name)
+    return batch
+
+
+def notifications(user, assignments, completed):
+    """Assignment notices, and one message per completed task"""
+    batch = add_assignment_notices(NotificationBatch(), user, {
+        assignee.pk: (len(tasks), tasks[0].title) for assignee, tasks in assignments.items()
+    })
+    for task in completed:
+        if task.assigned_by_id:
+            batch.add([task.assigned_by_id], 'Task "{title}" has been completed by {name}',
+                      title=task.title, name=task.assigned_to.name)
+    return batch
@@ -0,0 +1,36 @@
+"""
+Accepted spellings of task status, priority and team
+
+core.constants lists lowercase codes (and the create/status forms post
+them), but tasks are mostly stored, filtered and counted (core.stats) with
+uppercase ones. These tables map any of them, or a label, to the uppercase
+value, which is what imports store and what the event log (tasks.events)
+encodes.
+"""
+from core.constants import TASK_PRIORITY, TASK_STATUS, TEAMS
+
+
+def choice_lookup(choices, stored, aliases=None):
+    """
+    Map each lowercased value and label in choices, and each stored code,
+    to its stored code; aliases renames choice values with no uppercase twin
+    """
+    aliases = aliases or {}
+    lookup = {}
+    for value, label in choices:
+        code = aliases.get(value, value.upper())
+        lookup[value.lower()] = lookup[label.lower()] = code
+    for code in stored:
+        lookup[code.lower()] = lookup[code.lower().replace('_', ' ')] = code
+    return lookup
+
+
+STATUSES = choice_lookup(
+    TASK_STATUS, ('PENDING', 'IN_PROGRESS', 'REVIEW', 'COMPLETED', 'BLOCKED'),
+    aliases={'todo': 'PENDING', 'done': 'COMPLETED'},
+)
+PRIORITIES = choice_lookup(TASK_PRIORITY, ('LOW', 'MEDIUM', 'HIGH'))
+TASK_TEAMS = choice_lookup(
+    TEAMS, ('TECH', 'DESIGN', 'PRODUCT_MANAGEMENT', 'MARKETING', 'PROJECT_MANAGER'),
+    aliases={'development': 'TECH', 'management': 'PRODUCT_MANAGEMENT'},
+)
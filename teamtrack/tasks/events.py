@@ -0,0 +1,187 @@
+"""
+Task event log: recording, decoding and analytics
+
+Writers take a snapshot() of the tracked fields before changing a task,
+then record() the differences as TaskEvent rows in the same transaction.
+Bulk paths build the rows with changes()/created() and write them with one
+bulk_create. Status and priority are normalized through tasks.choices
+before encoding, so 'done' and 'COMPLETED' share a code; values without a
+code are stored as OTHER.
+
+The analytics read only this table, walking it in (task, created_at) order
+on the index, so they never load tasks or comments.
+"""
+import statistics
+from collections import defaultdict
+from datetime import date
+
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+from .choices import PRIORITIES, STATUSES
+from .models import TaskEvent
+
+# Stored in TaskEvent.old_value/new_value; never renumber
+OTHER = 0
+STATUS_CODES = {'PENDING': 1, 'IN_PROGRESS': 2, 'REVIEW': 3, 'COMPLETED': 4, 'BLOCKED': 5}
+PRIORITY_CODES = {'LOW': 1, 'MEDIUM': 2, 'HIGH': 3, 'URGENT': 4}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+PRIORITY_NAMES = {code: name for name, code in PRIORITY_CODES.items()}
+
+# Task attribute -> TaskEvent.field
+TRACKED = {
+    'status': TaskEvent.STATUS,
+    'assigned_to_id': TaskEvent.ASSIGNEE,
+    'priority': TaskEvent.PRIORITY,
+    'due_date': TaskEvent.DUE_DATE,
+}
+
+# TaskEvent.field -> name used in the API
+FIELD_NAMES = {
+    TaskEvent.CREATED: 'created',
+    TaskEvent.STATUS: 'status',
+    TaskEvent.ASSIGNEE: 'assigned_to',
+    TaskEvent.PRIORITY: 'priority',
+    TaskEvent.DUE_DATE: 'due_date',
+}
+
+# Events that put a task into the status in new_value
+STATUS_FIELDS = (TaskEvent.CREATED, TaskEvent.STATUS)
+
+CHUNK_SIZE = 2000
+
+
+def encode(field, value):
+    if value is None or value == '':
+        return None
+    if field in STATUS_FIELDS:
+        return STATUS_CODES.get(STATUSES.get(str(value).lower()), OTHER)
+    if field == TaskEvent.PRIORITY:
+        return PRIORITY_CODES.get(PRIORITIES.get(str(value).lower()), OTHER)
+    if field == TaskEvent.DUE_DATE:
+        # The update form assigns the posted string
+        return (date.fromisoformat(value) if isinstance(value, str) else value).toordinal()
+    return int(value)
+
+
+def decode(field, value):
+    """Readable value: status/priority name, ISO date, or the assignee's user id"""
+    if value is None:
+        return None
+    if field in STATUS_FIELDS:
+        return STATUS_NAMES.get(value, 'OTHER')
+    if field == TaskEvent.PRIORITY:
+        return PRIORITY_NAMES.get(value, 'OTHER')
+    if field == TaskEvent.DUE_DATE:
+        return date.fromordinal(value).isoformat()
+    return value
+
+
+def snapshot(task):
+    """Encoded tracked values of task, to compare against after a change"""
+    return {name: encode(field, getattr(task, name)) for name, field in TRACKED.items()}
+
+
+def changes(task, before, actor=None, at=None):
+    """Unsaved TaskEvents for each tracked field that differs from the snapshot"""
+    at = at or timezone.now()
+    after = snapshot(task)
+    return [
+        TaskEvent(task_id=task.pk, actor=actor, field=TRACKED[name], old_value=before[name],
+                  new_value=after[name], created_at=at)
+        for name in TRACKED
+        if before[name] != after[name]
+    ]
+
+
+def created(task, actor=None, at=None):
+    """Unsaved creation event; new_value is the initial status"""
+    return TaskEvent(task_id=task.pk, actor=actor, field=TaskEvent.CREATED,
+                     new_value=encode(TaskEvent.CREATED, task.status), created_at=at or timezone.now())
+
+
+def record(task, before, actor=None):
+    """Write the events for task's changes since before; call inside the change's transaction"""
+    return TaskEvent.objects.bulk_create(changes(task, before, actor))
+
+
+def record_created(task, actor=None):
+    return created(task, actor).save()
+
+
+def status_events(tasks=None):
+    """(task_id, created_at, status code) for every status-setting event, in task then time order"""
+    events = TaskEvent.objects.filter(field__in=STATUS_FIELDS)
+    if tasks is not None:
+        events = events.filter(task__in=tasks.values('pk'))
+    return (
+        events.order_by('task_id', 'created_at', 'id')
+        .values_list('task_id', 'created_at', 'new_value')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def time_in_status(tasks=None, now=None):
+    """
+    {status: {'tasks': n, 'total_hours': h, 'mean_hours': h}} over the tasks
+    in the queryset (default all). A task's current status counts until now.
+    """
+    now = now or timezone.now()
+    seconds = defaultdict(float)
+    members = defaultdict(set)
+
+    previous = None
+    for task_id, at, code in status_events(tasks):
+        if previous and previous[0] == task_id:
+            seconds[previous[2]] += (at - previous[1]).total_seconds()
+        elif previous:
+            seconds[previous[2]] += (now - previous[1]).total_seconds()
+        members[code].add(task_id)
+        previous = (task_id, at, code)
+    if previous:
+        seconds[previous[2]] += (now - previous[1]).total_seconds()
+
+    return {
+        STATUS_NAMES.get(code, 'OTHER'): {
+            'tasks': len(members[code]),
+            'total_hours': round(seconds[code] / 3600, 2),
+            'mean_hours': round(seconds[code] / 3600 / len(members[code]), 2),
+        }
+        for code in sorted(members)
+    }
+
+
+def cycle_times(tasks=None):
+    """
+    Hours from when each completed task was first set IN_PROGRESS (or
+    created, if it never was) to when it was last set COMPLETED, by task id.
+    One grouped query over the event table.
+    """
+    events = TaskEvent.objects.filter(field__in=STATUS_FIELDS)
+    if tasks is not None:
+        events = events.filter(task__in=tasks.values('pk'))
+    rows = events.order_by().values('task_id').annotate(
+        opened=Min('created_at', filter=Q(field=TaskEvent.CREATED)),
+        started=Min('created_at', filter=Q(new_value=STATUS_CODES['IN_PROGRESS'])),
+        finished=Max('created_at', filter=Q(new_value=STATUS_CODES['COMPLETED'])),
+    ).filter(finished__isnull=False)
+
+    hours = {}
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        start = row['started'] or row['opened']
+        if start and start <= row['finished']:
+            hours[row['task_id']] = (row['finished'] - start).total_seconds() / 3600
+    return hours
+
+
+def cycle_time_summary(tasks=None):
+    hours = list(cycle_times(tasks).values())
+    if not hours:
+        return {'tasks': 0, 'mean_hours': None, 'median_hours': None, 'p90_hours': None}
+    ordered = sorted(hours)
+    return {
+        'tasks': len(hours),
+        'mean_hours': round(statistics.fmean(hours), 2),
+        'median_hours': round(statistics.median(hours), 2),
+        'p90_hours': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))], 2),
+    }
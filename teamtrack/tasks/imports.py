@@ -0,0 +1,228 @@
+"""
+CSV task import (import_tasks command and POST /api/v1/tasks/import/)
+
+The file is read row by row with csv.DictReader. Assignee emails are
+resolved through one {email: id} map loaded up front, and valid rows are
+inserted with one bulk_create per batch_size rows, so neither queries nor
+memory grow per row. Each batch commits on its own, so a large file never
+holds one long write transaction (on SQLite, a lock on the whole database).
+Invalid rows are skipped and reported by line number. strict=True and dry
+runs are all-or-nothing instead: one transaction, and with strict=True any
+invalid row rolls the whole import back. Like the
+bulk API (tasks.bulk), the search index, the 'tasks' cache version and the
+assignees' notifications are brought up to date here, since bulk_create
+sends no signals, and each task's creation event (tasks.events) is
+inserted with its batch.
+
+Columns (header case and spacing don't matter, and a tasks export from
+core.exports reads back as is): title and assigned_to (an email)
+are required; description, status, priority, team, due_date (YYYY-MM-DD)
+and assigned_by (an email) are optional.
+"""
+import csv
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from accounts.models import User
+from core.exports import unquote_csv_cell
+from core.search import get_search_backend
+from core.versioned_cache import bump
+from notifications.services import NotificationBatch
+from .bulk import add_assignment_notices
+from . import events
+from .choices import PRIORITIES, STATUSES, TASK_TEAMS
+from .models import Task, TaskEvent
+
+# Rows per bulk_create
+BATCH_SIZE = 1000
+
+# Errors kept for the report; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+TITLE_MAX_LENGTH = Task._meta.get_field('title').max_length
+
+HEADER_ALIASES = {
+    'assignee': 'assigned_to',
+    'assignee_email': 'assigned_to',
+    'assigned_to_email': 'assigned_to',
+    'assigned_by_email': 'assigned_by',
+    'assigner_email': 'assigned_by',
+}
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    created: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    dry_run: bool = False
+    rolled_back: bool = False
+    # (line number, {column: message})
+    errors: list = field(default_factory=list)
+
+    @property
+    def rows_per_second(self):
+        return round(self.rows / self.seconds) if self.seconds else 0
+
+    def add_error(self, line, problems):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, problems))
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'failed': self.failed,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': self.rows_per_second,
+            'dry_run': self.dry_run,
+            'rolled_back': self.rolled_back,
+            'errors': [{'line': line, 'errors': problems} for line, problems in self.errors],
+        }
+
+
+class Rollback(Exception):
+    """Raised inside the import transaction to undo it"""
+
+
+def normalize_headers(names):
+    """
+    Canonical column names. An email column (e.g. the export's "Assignee
+    email") wins over a plain one of the same meaning, which then holds names
+    and is ignored.
+    """
+    keys = [(name or '').strip().lower().replace(' ', '_').replace('-', '_') for name in names]
+    aliased = {HEADER_ALIASES[key] for key in keys if key in HEADER_ALIASES}
+    return [
+        HEADER_ALIASES.get(key, f'{key}_name' if key in aliased else key)
+        for key in keys
+    ]
+
+
+def user_ids_by_email():
+    """Every active user's id keyed by lowercased email, in one query"""
+    return dict(User.objects.filter(is_active=True).values_list(Lower('email'), 'pk'))
+
+
+def parse_row(row, users):
+    """(Task field values, {}) for a valid row, or (None, {column: message})"""
+    values, problems = {}, {}
+
+    title = unquote_csv_cell((row.get('title') or '').strip())
+    if not title:
+        problems['title'] = 'Required.'
+    elif len(title) > TITLE_MAX_LENGTH:
+        problems['title'] = f'Longer than {TITLE_MAX_LENGTH} characters.'
+    values['title'] = title
+    values['description'] = unquote_csv_cell((row.get('description') or '').strip())
+
+    for column, lookup, default in (
+        ('status', STATUSES, 'PENDING'),
+        ('priority', PRIORITIES, 'MEDIUM'),
+        ('team', TASK_TEAMS, None),
+    ):
+        raw = (row.get(column) or '').strip()
+        if not raw:
+            values[column] = default
+        elif raw.lower() in lookup:
+            values[column] = lookup[raw.lower()]
+        else:
+            problems[column] = f'Unknown {column} "{raw}".'
+
+    raw = (row.get('due_date') or '').strip()
+    values['due_date'] = None
+    if raw:
+        try:
+            values['due_date'] = date.fromisoformat(raw)
+        except ValueError:
+            problems['due_date'] = f'"{raw}" is not a YYYY-MM-DD date.'
+
+    for column in ('assigned_to', 'assigned_by'):
+        email = (row.get(column) or '').strip().lower()
+        if email:
+            values[f'{column}_id'] = users.get(email)
+            if values[f'{column}_id'] is None:
+                problems[column] = f'No active user with email {email}.'
+        elif column == 'assigned_to':
+            problems[column] = 'Required.'
+
+    return (None, problems) if problems else (values, {})
+
+
+def import_tasks(lines, assigned_by=None, batch_size=BATCH_SIZE, strict=False, dry_run=False):
+    """
+    Import tasks from an iterable of CSV text lines (an open file, or a
+    TextIOWrapper around an upload) and return an ImportReport.
+    assigned_by is the user recorded (and named in notifications) for rows
+    without an assigned_by column. A dry run validates and inserts as usual,
+    then rolls back; created is what would have been created. Otherwise
+    batches commit one by one unless strict=True.
+    """
+    report = ImportReport(dry_run=dry_run)
+    started = time.monotonic()
+    reader = csv.DictReader(lines)
+    reader.fieldnames = normalize_headers(reader.fieldnames or [])
+    missing = {'title', 'assigned_to'} - set(reader.fieldnames)
+    if missing:
+        report.add_error(1, {column: 'Missing column.' for column in sorted(missing)})
+        report.seconds = time.monotonic() - started
+        return report
+
+    users = user_ids_by_email()
+    search = get_search_backend()
+    # Assignee id -> (task count, a title); for one message per assignee
+    assignments = {}
+    pending = []
+    all_or_nothing = strict or dry_run
+
+    def flush():
+        with transaction.atomic():
+            created = Task.objects.bulk_create(pending)
+            TaskEvent.objects.bulk_create(events.created(task, assigned_by) for task in created if task.pk)
+            search.index_tasks([task.pk for task in created if task.pk])
+            if not all_or_nothing:
+                bump('tasks')
+        report.created += len(created)
+        pending.clear()
+
+    try:
+        with transaction.atomic() if all_or_nothing else nullcontext():
+            for row in reader:
+                report.rows += 1
+                values, problems = parse_row(row, users)
+                if problems:
+                    report.add_error(reader.line_num, problems)
+                    continue
+                if 'assigned_by_id' not in values:
+                    values['assigned_by'] = assigned_by
+                if values['team'] is None:
+                    # Like the create form, fall back to the default team
+                    values.pop('team')
+                task = Task(**values)
+                pending.append(task)
+                count, _ = assignments.get(task.assigned_to_id, (0, None))
+                assignments[task.assigned_to_id] = (count + 1, task.title)
+                if len(pending) >= batch_size:
+                    flush()
+            if pending:
+                flush()
+
+            if dry_run or (strict and report.failed):
+                raise Rollback
+            if all_or_nothing:
+                bump('tasks')
+            if assigned_by and report.created:
+                add_assignment_notices(NotificationBatch(), assigned_by, assignments).send(on_commit=True)
+    except Rollback:
+        if not dry_run:
+            report.rolled_back = True
+            report.created = 0
+
+    report.seconds = time.monotonic() - started
+    return report
@@ -2,7 +2,7 @@ from django.core.management.base import BaseCommand
 from django.db.models import Count, Q
 from tasks.models import Task
 from accounts.models import User
-from django.core.cache import cache
+from core.versioned_cache import ALL_DASHBOARDS, bump
 
 class Command(BaseCommand):
     help = 'Comprehensive team and task data analysis'
@@ -11,9 +11,9 @@ class Command(BaseCommand):
         self.stdout.write('🔍 Comprehensive Team & Task Analysis')
         self.stdout.write('=' * 60)
         
-        # Clear cache first
-        cache.clear()
-        self.stdout.write('✅ Cache cleared')
+        # Make dashboards reflect the data analysed below
+        bump(ALL_DASHBOARDS)
+        self.stdout.write('✅ Dashboard cache invalidated')
         
         # Check all users
         self.stdout.write(f'\n👥 USER ANALYSIS:')
@@ -0,0 +1,160 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from core import seeding
+from tasks.models import Task
+
+# Tables that grow without bound; a sequential scan on any of them fails the run
+LARGE_TABLES = {
+    'tasks_task',
+    'tasks_taskcomment',
+    'notifications_notification',
+    'attendance_attendancerecord',
+}
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the queries issued by the hot views and fail on sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Insert this many synthetic tasks and notifications first (e.g. 1000000)',
+        )
+        parser.add_argument(
+            '--seed-users',
+            type=int,
+            default=200,
+            help='Number of synthetic users to spread seeded rows across',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='bulk_create batch size used while seeding',
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the plan of every query, not only the failing ones',
+        )
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'], options['seed_users'], options['batch_size'])
+
+        manager = User.objects.filter(team='PROJECT_MANAGER', is_active=True).first()
+        member = User.objects.filter(is_active=True).exclude(team='PROJECT_MANAGER').first()
+        if not manager or not member:
+            raise CommandError('Need at least one active Project Manager and one team member (try --seed)')
+
+        task = Task.objects.filter(assigned_to=member).order_by('-created_at').first()
+        checks = self.view_checks(manager, member, task)
+
+        failures = []
+        explained = 0
+        for label, user, url, allowed_tables in checks:
+            for sql in self.capture_selects(user, url):
+                explained += 1
+                plan, scanned = self.explain(sql)
+                offending = (scanned & LARGE_TABLES) - allowed_tables
+                if options['verbose_plans'] or offending:
+                    self.stdout.write(f'\n🔎 {label}: {sql[:200]}')
+                    self.stdout.write(plan)
+                if offending:
+                    failures.append((label, sorted(offending), sql))
+
+        self.stdout.write(f'\n📊 Explained {explained} queries across {len(checks)} views')
+        if failures:
+            for label, tables, sql in failures:
+                self.stdout.write(self.style.ERROR(f'❌ {label}: sequential scan on {", ".join(tables)}'))
+            raise CommandError(f'{len(failures)} queries use sequential scans on large tables')
+        self.stdout.write(self.style.SUCCESS('✅ No sequential scans on large tables'))
+
+    def view_checks(self, manager, member, task):
+        """(label, user, url, tables allowed to be scanned in full)"""
+        checks = [
+            # The admin dashboard aggregates and lists every task by design
+            ('dashboard:admin', manager, reverse('dashboard:admin'), {'tasks_task'}),
+            ('dashboard:manager', manager, reverse('dashboard:manager'), set()),
+            ('dashboard:member', member, reverse('dashboard:member'), set()),
+            ('dashboard:member_feed', member, reverse('dashboard:member_feed'), set()),
+            ('tasks:task_list (manager)', manager, reverse('tasks:task_list'), set()),
+            ('tasks:task_list (member)', member, reverse('tasks:task_list'), set()),
+            ('tasks:task_list (status)', member, reverse('tasks:task_list') + '?status=PENDING', set()),
+            ('notifications:list', member, reverse('notifications:list'), set()),
+            ('attendance:list', member, reverse('attendance:list'), set()),
+        ]
+        if task:
+            checks.append(('tasks:task_detail', member, reverse('tasks:task_detail', args=[task.pk]), set()))
+        return checks
+
+    def capture_selects(self, user, url):
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].lstrip().upper().startswith('SELECT')
+        ]
+
+    def explain(self, sql):
+        """Return (plan text, set of tables read with a full sequential scan)"""
+        vendor = connection.vendor
+        scanned = set()
+        with connection.cursor() as cursor:
+            if vendor == 'postgresql':
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                nodes = [plan[0]['Plan']]
+                while nodes:
+                    node = nodes.pop()
+                    if node.get('Node Type') == 'Seq Scan':
+                        scanned.add(node.get('Relation Name'))
+                    nodes.extend(node.get('Plans', []))
+                return json.dumps(plan, indent=2), scanned
+            if vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                lines = []
+                for row in cursor.fetchall():
+                    detail = row[-1]
+                    lines.append(f'  {detail}')
+                    words = detail.split()
+                    if words[:1] == ['SCAN'] and 'USING' not in words:
+                        scanned.add(words[1])
+                return '\n'.join(lines), scanned
+            if vendor == 'mysql':
+                cursor.execute(f'EXPLAIN {sql}')
+                columns = [col[0] for col in cursor.description]
+                lines = []
+                for row in cursor.fetchall():
+                    row = dict(zip(columns, row))
+                    lines.append(f"  {row.get('table')}: type={row.get('type')} key={row.get('key')}")
+                    if row.get('type') == 'ALL':
+                        scanned.add(row.get('table'))
+                return '\n'.join(lines), scanned
+        raise CommandError(f'EXPLAIN is not supported for the {vendor} backend')
+
+    def seed(self, rows, user_count, batch_size):
+        """Bulk insert synthetic tasks, notifications and attendance (see core.seeding)"""
+        self.stdout.write(f'🌱 Seeding {rows} tasks and notifications across {user_count} users...')
+        seeding.seed(
+            users=user_count,
+            tasks=rows,
+            notifications=rows,
+            attendance_days=max(1, min(rows // max(user_count, 1), 3650)),
+            batch_size=batch_size,
+            progress=lambda label, done, total: self.stdout.write(f'  ... {label} {done}/{total}'),
+        )
+        self.stdout.write(self.style.SUCCESS('✅ Seeding complete'))
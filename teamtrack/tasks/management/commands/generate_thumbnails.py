@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from tasks import thumbnails
+from tasks.models import TaskComment
+
+
+class Command(BaseCommand):
+    help = 'Hash comment attachments and generate any missing thumbnails (backfill)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Comments fetched per database round trip')
+
+    def handle(self, *args, **options):
+        comments = TaskComment.objects.exclude(attachment='').exclude(attachment__isnull=True).only(
+            'pk', 'attachment', 'attachment_hash'
+        )
+        hashed = generated = failed = 0
+
+        for comment in comments.iterator(chunk_size=options['batch_size']):
+            if not comment.is_image:
+                continue
+            try:
+                if not comment.attachment_hash:
+                    comment.attachment_hash = thumbnails.file_hash(comment.attachment)
+                    # update() skips the save signals, which would schedule the same work
+                    TaskComment.objects.filter(pk=comment.pk).update(attachment_hash=comment.attachment_hash)
+                    hashed += 1
+                generated += thumbnails.generate_thumbnails(comment)
+            except thumbnails.decode_errors() as e:
+                failed += 1
+                self.stderr.write(f'⚠️  {comment.attachment.name}: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Hashed {hashed} attachments, wrote {generated} thumbnails ({failed} failed)'
+        ))
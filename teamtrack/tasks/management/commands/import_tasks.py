@@ -0,0 +1,64 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from tasks import imports
+
+
+class Command(BaseCommand):
+    help = (
+        'Import tasks from a CSV file (columns: title, assigned_to email, and optionally description, '
+        'status, priority, team, due_date, assigned_by email), inserting and committing a batch at a time'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to read')
+        parser.add_argument('--as', dest='assigned_by', metavar='EMAIL',
+                            help='Project Manager recorded as the assigner (and named in notifications)')
+        parser.add_argument('--batch-size', type=int, default=imports.BATCH_SIZE,
+                            help=f'Rows per bulk insert and commit (default {imports.BATCH_SIZE})')
+        parser.add_argument('--strict', action='store_true',
+                            help='Import nothing if any row is invalid (runs as one transaction)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Validate and time the import, then roll it back')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be >= 1')
+        assigned_by = None
+        if options['assigned_by']:
+            assigned_by = User.objects.filter(email__iexact=options['assigned_by'], is_active=True).first()
+            if not assigned_by:
+                raise CommandError(f"No active user with email {options['assigned_by']}")
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+                report = imports.import_tasks(
+                    lines, assigned_by=assigned_by, batch_size=options['batch_size'],
+                    strict=options['strict'], dry_run=options['dry_run'],
+                )
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+
+        if options['json']:
+            self.stdout.write(json.dumps(report.as_dict(), indent=2))
+            return
+
+        for line, problems in report.errors:
+            details = '; '.join(f'{column}: {message}' for column, message in problems.items())
+            self.stdout.write(self.style.WARNING(f'  line {line}: {details}'))
+        if report.failed > len(report.errors):
+            self.stdout.write(f'  ... and {report.failed - len(report.errors)} more')
+
+        summary = (
+            f'{report.created} of {report.rows} rows in {report.seconds:.1f}s '
+            f'({report.rows_per_second} rows/s), {report.failed} invalid'
+        )
+        if report.rolled_back:
+            self.stdout.write(self.style.ERROR(f'❌ Rolled back: {summary}'))
+        elif report.dry_run:
+            self.stdout.write(self.style.SUCCESS(f'🧪 Dry run, would import {summary}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'📥 Imported {summary}'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the task full-text search index (after bulk inserts or updates)'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        self.stdout.write(f'🔍 Search backend: {backend.__class__.__name__}')
+        indexed = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'✅ Indexed {indexed} tasks'))
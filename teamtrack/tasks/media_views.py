@@ -1,43 +1,157 @@
-from django.http import HttpResponse, Http404
+from django.http import FileResponse, HttpResponse, Http404
 from django.conf import settings
-import os
-from django.views.decorators.cache import never_cache
-from django.utils.decorators import method_decorator
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from django.views import View
+from urllib.parse import quote
+import mimetypes
+import os
+import re
+
+from . import thumbnails
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """File-like view of bytes [start, start + length) of an open file"""
+
+    def __init__(self, f, start, length):
+        self.file = f
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        # Lets wsgi.file_wrapper use os.sendfile from the current offset
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) inclusive for a single 'bytes=' range, None to serve
+    the whole file, or False if the range cannot be satisfied
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Malformed or multi-range requests get the full body
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
 
-@method_decorator(never_cache, name='dispatch')
 class MediaFileView(View):
     """Serve media files with proper headers"""
-    
+
     def get(self, request, file_path):
-        # Construct the full file path
-        full_path = os.path.join(settings.MEDIA_ROOT, file_path)
-        
-        # Check if file exists
-        if not os.path.exists(full_path):
+        # Construct the full file path, refusing anything outside MEDIA_ROOT
+        try:
+            full_path = safe_join(settings.MEDIA_ROOT, file_path)
+        except SuspiciousFileOperation:
             raise Http404("File not found")
-        
-        # Read the file
+
+        # Check if file exists; thumbnails are generated on first request
+        if not os.path.isfile(full_path) and not thumbnails.ensure_thumbnail(file_path):
+            raise Http404("File not found")
+        stat = os.stat(full_path)
+
+        size = stat.st_size
+        etag = quote_etag(f'{int(stat.st_mtime):x}-{size:x}')
+
+        # If-None-Match / If-Modified-Since -> 304
+        response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+        if response is None:
+            response = self.file_response(request, full_path, file_path, size, etag, stat.st_mtime)
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Accept-Ranges'] = 'bytes'
+        response['Cache-Control'] = self.cache_control(file_path)
+        return response
+
+    def cache_control(self, file_path):
+        if thumbnails.THUMBNAIL_RE.match(file_path):
+            # Named by content hash, so the bytes behind a URL never change
+            return 'public, max-age=31536000, immutable'
+        return 'public, max-age=3600'  # Cache for 1 hour
+
+    def file_response(self, request, full_path, file_path, size, etag, mtime):
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        disposition = f'inline; filename="{os.path.basename(file_path)}"'
+
+        # Let nginx / Apache send the bytes (they handle Range themselves)
+        offload = getattr(settings, 'MEDIA_OFFLOAD', None)
+        if offload:
+            response = HttpResponse(content_type=content_type)
+            if offload == 'x-accel-redirect':
+                prefix = getattr(settings, 'MEDIA_OFFLOAD_PREFIX', '/protected-media/')
+                response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(file_path)
+            else:
+                response['X-Sendfile'] = full_path
+            response['Content-Disposition'] = disposition
+            return response
+
+        byte_range = None
+        range_header = request.META.get('HTTP_RANGE')
+        if range_header and self.if_range_matches(request, etag, mtime):
+            byte_range = parse_range(range_header, size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
         try:
-            with open(full_path, 'rb') as f:
-                file_data = f.read()
+            f = open(full_path, 'rb')
         except IOError:
             raise Http404("File not accessible")
-        
-        # Determine content type
-        content_type = 'application/octet-stream'
-        if file_path.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')):
-            content_type = 'image/png' if file_path.lower().endswith('.png') else 'image/jpeg'
-        elif file_path.lower().endswith('.pdf'):
-            content_type = 'application/pdf'
-        elif file_path.lower().endswith(('.doc', '.docx')):
-            content_type = 'application/msword'
-        elif file_path.lower().endswith('.txt'):
-            content_type = 'text/plain'
-        
-        # Create response with proper headers
-        response = HttpResponse(file_data, content_type=content_type)
-        response['Content-Disposition'] = f'inline; filename="{os.path.basename(file_path)}"'
-        response['Cache-Control'] = 'public, max-age=3600'  # Cache for 1 hour
-        
+
+        if byte_range is None:
+            # Streamed in blocks, or via os.sendfile when the server provides wsgi.file_wrapper
+            response = FileResponse(f, content_type=content_type)
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            response = FileResponse(RangeFile(f, start, length), status=206, content_type=content_type)
+            response['Content-Length'] = str(length)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Disposition'] = disposition
         return response
+
+    @staticmethod
+    def if_range_matches(request, etag, mtime):
+        """A Range is only honoured if If-Range (when sent) still matches the file"""
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if not if_range:
+            return True
+        if if_range.startswith('W/'):
+            # Weak validators never satisfy If-Range
+            return False
+        if if_range.startswith('"'):
+            return if_range == etag
+        return if_range == http_date(mtime)
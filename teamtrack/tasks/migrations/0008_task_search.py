@@ -0,0 +1,58 @@
+from django.db import migrations
+
+FTS_TABLE = "tasks_task_fts"
+
+
+def create_search_index(apps, schema_editor):
+    """GIN expression indexes on PostgreSQL, an FTS5 table on SQLite"""
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        from django.contrib.postgres.indexes import GinIndex
+        from django.contrib.postgres.search import SearchVector
+
+        # Must match core.search.PostgresSearchBackend.task_vector/comment_vector
+        Task = apps.get_model("tasks", "Task")
+        TaskComment = apps.get_model("tasks", "TaskComment")
+        schema_editor.add_index(
+            Task,
+            GinIndex(
+                SearchVector("title", weight="A", config="english")
+                + SearchVector("description", weight="B", config="english"),
+                name="task_search_idx",
+            ),
+        )
+        schema_editor.add_index(
+            TaskComment,
+            GinIndex(SearchVector("message", config="english"), name="taskcomment_search_idx"),
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            "USING fts5(title, description, comments, tokenize='porter unicode61')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description, comments) "
+            "SELECT t.id, t.title, t.description, "
+            "COALESCE((SELECT group_concat(c.message, ' ') FROM tasks_taskcomment c WHERE c.task_id = t.id), '') "
+            "FROM tasks_task t"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS task_search_idx")
+        schema_editor.execute("DROP INDEX IF EXISTS taskcomment_search_idx")
+    elif vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0007_task_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0008_task_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskcomment",
+            name="attachment_hash",
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+    ]
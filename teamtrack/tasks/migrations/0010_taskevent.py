@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0009_taskcomment_attachment_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.PositiveSmallIntegerField(choices=[(1, 'Created'), (2, 'Status'), (3, 'Assignee'), (4, 'Priority'), (5, 'Due date')])),
+                ('old_value', models.IntegerField(blank=True, null=True)),
+                ('new_value', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('task', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='events', to='tasks.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['task', 'created_at'], name='taskevent_task_created_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
+from django.utils import timezone
 from accounts.models import User
 from core.constants import TEAMS, TASK_STATUS, TASK_PRIORITY, TASK_COMMENT_TYPES, TASK_ATTACHMENT_PATH
+from . import thumbnails
 
 class Task(models.Model):
     STATUS = TASK_STATUS
@@ -18,6 +20,14 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['assigned_to', 'status'], name='task_assignee_status_idx'),
+            models.Index(fields=['team', 'status'], name='task_team_status_idx'),
+            models.Index(fields=['status', 'due_date'], name='task_status_due_idx'),
+            models.Index(fields=['-created_at', '-id'], name='task_created_idx'),
+        ]
+    
     def __str__(self): return self.title
 
 class TaskComment(models.Model):
@@ -28,6 +38,8 @@ class TaskComment(models.Model):
     comment_type = models.CharField(max_length=20, choices=COMMENT_TYPES, default="GENERAL")
     message = models.TextField()
     attachment = models.FileField(upload_to=TASK_ATTACHMENT_PATH, blank=True, null=True, help_text="Attach screenshots or files")
+    # SHA-256 of the attachment; names its thumbnails (see tasks.thumbnails)
+    attachment_hash = models.CharField(max_length=64, blank=True, db_index=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -45,3 +57,63 @@ class TaskComment(models.Model):
         if self.attachment:
             return self.attachment.name.split('/')[-1]
         return None
+
+    @property
+    def is_image(self):
+        return self.has_attachment and thumbnails.is_image_name(self.attachment.name)
+
+    @property
+    def thumbnail_name(self):
+        """Small thumbnail path under MEDIA_ROOT, or None if there isn't one"""
+        if self.is_image and self.attachment_hash:
+            return thumbnails.thumbnail_name(self.attachment_hash, 'small')
+        return None
+
+    @property
+    def preview_name(self):
+        """Large preview path under MEDIA_ROOT, or None if there isn't one"""
+        if self.is_image and self.attachment_hash:
+            return thumbnails.thumbnail_name(self.attachment_hash, 'large')
+        return None
+
+
+class TaskEvent(models.Model):
+    """
+    Append-only, field-level history of a task, written in the same
+    transaction as the change (see tasks.events). Values are small integers:
+    status and priority codes from tasks.events, the user id for the
+    assignee, and date.toordinal() for the due date.
+    """
+    CREATED = 1
+    STATUS = 2
+    ASSIGNEE = 3
+    PRIORITY = 4
+    DUE_DATE = 5
+    FIELDS = [
+        (CREATED, 'Created'),
+        (STATUS, 'Status'),
+        (ASSIGNEE, 'Assignee'),
+        (PRIORITY, 'Priority'),
+        (DUE_DATE, 'Due date'),
+    ]
+
+    # The (task, created_at) index below serves lookups by task
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="events", db_index=False)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+", db_index=False)
+    field = models.PositiveSmallIntegerField(choices=FIELDS)
+    old_value = models.IntegerField(null=True, blank=True)
+    new_value = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'created_at'], name='taskevent_task_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Task {self.task_id} {self.get_field_display()}: {self.old_value} -> {self.new_value}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Task events are append-only")
+        super().save(*args, **kwargs)
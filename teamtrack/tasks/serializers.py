@@ -0,0 +1,177 @@
+from rest_framework import serializers
+
+from accounts.models import User
+from . import events
+from .choices import PRIORITIES, STATUSES, TASK_TEAMS
+from .models import Task, TaskEvent
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'name', 'email', 'team']
+
+
+class SparseFieldsMixin:
+    """
+    Limit output to the comma-separated ?fields= of the request in context.
+    Unknown names are ignored; an empty selection keeps every field.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        requested = requested_fields(request) if request else None
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
+def requested_fields(request):
+    """Set of names from ?fields=, or None when all fields are wanted"""
+    value = request.query_params.get('fields', '')
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    return names or None
+
+
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # Nested read-only users; the viewset joins them with select_related
+    assigned_to = UserSummarySerializer(read_only=True)
+    assigned_by = UserSummarySerializer(read_only=True)
+    url = serializers.HyperlinkedIdentityField(view_name='api:task-detail')
+
+    class Meta:
+        model = Task
+        fields = [
+            'id', 'url', 'title', 'description', 'status', 'priority', 'team', 'due_date',
+            'assigned_to', 'assigned_by', 'created_at', 'updated_at',
+        ]
+
+
+class TaskEventSerializer(serializers.ModelSerializer):
+    """A decoded event; assignee values are user ids"""
+    field = serializers.SerializerMethodField()
+    old = serializers.SerializerMethodField()
+    new = serializers.SerializerMethodField()
+    actor = UserSummarySerializer(read_only=True)
+
+    class Meta:
+        model = TaskEvent
+        fields = ['id', 'field', 'old', 'new', 'actor', 'created_at']
+
+    def get_field(self, event):
+        return events.FIELD_NAMES[event.field]
+
+    def get_old(self, event):
+        return events.decode(event.field, event.old_value)
+
+    def get_new(self, event):
+        return events.decode(event.field, event.new_value)
+
+
+# Writable task fields; the bulk API takes assigned_to as a user id
+TASK_FIELDS = ('title', 'description', 'status', 'priority', 'team', 'due_date', 'assigned_to')
+
+# op -> (required fields, allowed fields)
+BULK_OPERATIONS = {
+    'create': ({'title', 'assigned_to'}, set(TASK_FIELDS)),
+    'update': (set(), set(TASK_FIELDS)),
+    'reassign': ({'assigned_to'}, {'assigned_to'}),
+    'delete': (set(), set()),
+}
+
+# Upper bound on operations per bulk request
+BULK_MAX_OPERATIONS = 1000
+
+
+class BulkOperationSerializer(serializers.Serializer):
+    """One operation; every op but create names an existing task by id"""
+    op = serializers.ChoiceField(choices=list(BULK_OPERATIONS))
+    id = serializers.IntegerField(required=False, min_value=1)
+    title = serializers.CharField(required=False, max_length=200)
+    description = serializers.CharField(required=False, allow_blank=True)
+    status = serializers.CharField(required=False, max_length=20)
+    priority = serializers.CharField(required=False, max_length=20)
+    team = serializers.CharField(required=False, max_length=20)
+    due_date = serializers.DateField(required=False, allow_null=True)
+    assigned_to = serializers.IntegerField(required=False, min_value=1)
+
+    # bulk_create/bulk_update skip model validation, so choices are checked
+    # here, accepting the spellings a CSV import does (tasks.choices)
+    @staticmethod
+    def choice(lookup, name, value):
+        code = lookup.get(value.strip().lower())
+        if code is None:
+            raise serializers.ValidationError(f'Unknown {name} "{value}".')
+        return code
+
+    def validate_status(self, value):
+        return self.choice(STATUSES, 'status', value)
+
+    def validate_priority(self, value):
+        return self.choice(PRIORITIES, 'priority', value)
+
+    def validate_team(self, value):
+        return self.choice(TASK_TEAMS, 'team', value)
+
+    def validate(self, attrs):
+        required, allowed = BULK_OPERATIONS[attrs['op']]
+        given = set(attrs) & set(TASK_FIELDS)
+        errors = {}
+        for name in sorted(required - given):
+            errors[name] = 'This field is required.'
+        for name in sorted(given - allowed):
+            errors[name] = f"Not allowed for {attrs['op']}."
+        if attrs['op'] == 'create':
+            if 'id' in attrs:
+                errors['id'] = 'Not allowed for create.'
+        elif 'id' not in attrs:
+            errors['id'] = 'This field is required.'
+        elif attrs['op'] == 'update' and not given:
+            errors['non_field_errors'] = 'Nothing to update.'
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+
+class BulkTaskSerializer(serializers.Serializer):
+    """
+    A list of operations, checked together: every task and assignee is
+    loaded with one query each, so a bad id anywhere fails the whole request
+    before anything is written. Valid operations carry the loaded objects
+    ('task', and the User in 'assigned_to').
+    """
+    operations = serializers.ListField(
+        child=BulkOperationSerializer(), allow_empty=False, max_length=BULK_MAX_OPERATIONS,
+    )
+
+    def validate_operations(self, operations):
+        task_ids = [operation['id'] for operation in operations if 'id' in operation]
+        user_ids = {operation['assigned_to'] for operation in operations if 'assigned_to' in operation}
+        # Locked for the rest of the caller's transaction where the backend supports it
+        tasks = Task.objects.select_for_update(of=('self',)).select_related('assigned_to').in_bulk(task_ids)
+        users = User.objects.filter(is_active=True).in_bulk(user_ids)
+
+        errors = {}
+        seen = {}
+        for index, operation in enumerate(operations):
+            problems = {}
+            task_id = operation.get('id')
+            if task_id is not None:
+                if task_id not in tasks:
+                    problems['id'] = f'Task {task_id} does not exist.'
+                elif task_id in seen:
+                    problems['id'] = f'Task {task_id} is already changed by operation {seen[task_id]}.'
+                else:
+                    seen[task_id] = index
+                    operation['task'] = tasks[task_id]
+            user_id = operation.get('assigned_to')
+            if user_id is not None:
+                if user_id not in users:
+                    problems['assigned_to'] = f'No active user with id {user_id}.'
+                else:
+                    operation['assigned_to'] = users[user_id]
+            if problems:
+                errors[index] = problems
+        if errors:
+            raise serializers.ValidationError(errors)
+        return operations
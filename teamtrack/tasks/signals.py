@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.search import get_search_backend, is_indexing_suspended
+from . import thumbnails
+from .models import Task, TaskComment
+
+
+@receiver(post_save, sender=Task)
+def index_task(sender, instance, **kwargs):
+    """Keep the search index in step with task title/description"""
+    if not is_indexing_suspended():
+        get_search_backend().index_task(instance.pk)
+
+
+@receiver(post_delete, sender=Task)
+def unindex_task(sender, instance, **kwargs):
+    if not is_indexing_suspended():
+        get_search_backend().remove_task(instance.pk)
+
+
+@receiver(post_save, sender=TaskComment)
+@receiver(post_delete, sender=TaskComment)
+def index_task_comments(sender, instance, **kwargs):
+    """Comment text is indexed with its task"""
+    if not is_indexing_suspended():
+        get_search_backend().index_task(instance.task_id)
+
+
+@receiver(pre_save, sender=TaskComment)
+def hash_attachment(sender, instance, **kwargs):
+    """Hash new uploads while the file is still at hand; older files are hashed by generate_thumbnails"""
+    if not instance.attachment:
+        instance.attachment_hash = ''
+    elif not instance.attachment._committed:
+        instance.attachment_hash = thumbnails.file_hash(instance.attachment)
+
+
+@receiver(post_save, sender=TaskComment)
+def generate_attachment_thumbnails(sender, instance, **kwargs):
+    """Thumbnails are built once the upload is committed, off the request thread"""
+    if instance.is_image and instance.attachment_hash:
+        transaction.on_commit(lambda: thumbnails.schedule_thumbnails(instance))
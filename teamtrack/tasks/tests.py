@@ -1,3 +1,908 @@
-from django.test import TestCase
+import io
+import json
+import shutil
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import skipIf
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from attendance.models import AttendanceRecord
+from core import exports, seeding
+from core.management.commands.benchmark_views import MARK_DATE
+from core.middleware import QueryBudgetExceeded, RequestQueries
+from core.pagination import cursor_paginate, decode_cursor
+from core.search import IContainsSearchBackend, SQLiteFTSSearchBackend, get_search_backend
+from notifications.models import Notification
+from PIL import Image
+
+from . import events, imports, thumbnails
+from .models import Task, TaskComment, TaskEvent
+
+
+def make_user(email, team='TECH'):
+    return User.objects.create_user(email=email, password='pass1234', name=email.split('@')[0], team=team)
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.user = make_user('member@example.com')
+        self.tasks = [
+            Task.objects.create(title=f'Task {i}', assigned_to=self.user, assigned_by=self.user)
+            for i in range(7)
+        ]
+        # Identical timestamps are broken by id
+        Task.objects.update(created_at=self.tasks[0].created_at)
+        self.newest_first = [t.pk for t in reversed(self.tasks)]
+
+    def test_forward_and_backward(self):
+        queryset = Task.objects.all()
+        first = cursor_paginate(queryset, per_page=3)
+        self.assertEqual([t.pk for t in first], self.newest_first[:3])
+        self.assertFalse(first.has_previous)
+
+        second = cursor_paginate(queryset, first.next_cursor, per_page=3)
+        self.assertEqual([t.pk for t in second], self.newest_first[3:6])
+
+        last = cursor_paginate(queryset, second.next_cursor, per_page=3)
+        self.assertEqual([t.pk for t in last], self.newest_first[6:])
+        self.assertFalse(last.has_next)
+
+        back = cursor_paginate(queryset, last.previous_cursor, per_page=3)
+        self.assertEqual([t.pk for t in back], self.newest_first[3:6])
+        self.assertTrue(back.has_previous)
+        self.assertTrue(back.has_next)
+
+    def test_invalid_cursor_returns_first_page(self):
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        page = cursor_paginate(Task.objects.all(), 'not-a-cursor', per_page=3)
+        self.assertEqual([t.pk for t in page], self.newest_first[:3])
+
+    def test_count_is_optional(self):
+        self.assertIsNone(cursor_paginate(Task.objects.all(), per_page=3).count)
+        self.assertEqual(cursor_paginate(Task.objects.all(), per_page=3, count='exact').count, 7)
+
+    @skipIf(connection.vendor == 'postgresql', 'PostgreSQL returns a planner estimate')
+    def test_approximate_count_never_counts_without_an_estimate(self):
+        with CaptureQueriesContext(connection) as context:
+            page = cursor_paginate(Task.objects.all(), per_page=3, count='approximate')
+        self.assertIsNone(page.count)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in context.captured_queries))
+
+
+class TaskListPaginationTests(TestCase):
+    def setUp(self):
+        self.user = make_user('member@example.com')
+        for i in range(25):
+            Task.objects.create(title=f'Task {i}', assigned_to=self.user, assigned_by=self.user)
+        self.client.force_login(self.user)
+
+    def test_cursor_mode_is_default(self):
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertEqual(response.context['pagination_mode'], 'cursor')
+        page = response.context['page_obj']
+        self.assertEqual(len(page), 20)
+
+        response = self.client.get(reverse('tasks:task_list'), {'cursor': page.next_cursor})
+        self.assertEqual(len(response.context['page_obj']), 5)
+
+    def test_offset_mode_for_page_links(self):
+        response = self.client.get(reverse('tasks:task_list'), {'page': 2})
+        self.assertEqual(response.context['pagination_mode'], 'offset')
+        self.assertEqual(response.context['page_obj'].number, 2)
+
+
+class TaskSearchTests(TestCase):
+    def setUp(self):
+        self.user = make_user('member@example.com')
+        self.login_task = Task.objects.create(
+            title='Fix login redirect', description='Users bounce back to the form',
+            assigned_to=self.user, assigned_by=self.user,
+        )
+        self.report_task = Task.objects.create(
+            title='Weekly report', description='Mention the login outage in passing',
+            assigned_to=self.user, assigned_by=self.user,
+        )
+        self.other_task = Task.objects.create(
+            title='Design review', assigned_to=self.user, assigned_by=self.user,
+        )
+        TaskComment.objects.create(task=self.other_task, author=self.user, message='Waiting on the mockups')
+
+    def search(self, query):
+        return list(get_search_backend().search(Task.objects.all(), query).order_by('-search_rank'))
+
+    def test_sqlite_uses_fts_backend(self):
+        self.assertIsInstance(get_search_backend(), SQLiteFTSSearchBackend)
+
+    def test_ranked_title_match_first(self):
+        self.assertEqual(self.search('login'), [self.login_task, self.report_task])
+
+    def test_prefix_and_comment_match(self):
+        self.assertEqual(self.search('mock'), [self.other_task])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.login_task.title = 'Fix signup redirect'
+        self.login_task.description = ''
+        self.login_task.save()
+        self.assertEqual(self.search('login'), [self.report_task])
+
+        self.report_task.delete()
+        self.assertEqual(self.search('login'), [])
+
+    def test_user_input_is_not_fts_syntax(self):
+        self.assertEqual(self.search('login" OR "design'), [])
+
+    @override_settings(SEARCH_BACKEND='core.search.IContainsSearchBackend')
+    def test_icontains_fallback(self):
+        self.assertIsInstance(get_search_backend(), IContainsSearchBackend)
+        self.assertEqual(set(self.search('login')), {self.login_task, self.report_task})
+
+    def test_task_list_search(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('tasks:task_list'), {'search': 'login'})
+        self.assertEqual(list(response.context['page_obj']), [self.login_task, self.report_task])
+
+
+class MediaFileViewTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        Path(self.media_root, 'task_attachments').mkdir()
+        self.body = bytes(range(256)) * 40
+        Path(self.media_root, 'task_attachments', 'clip.png').write_bytes(self.body)
+        self.url = reverse('tasks:media_file', args=['task_attachments/clip.png'])
+
+    def test_streams_full_file_with_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content), self.body)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+
+    def test_conditional_get(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.body)}')
+        self.assertEqual(b''.join(response.streaming_content), self.body[100:200])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), self.body[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.body)}-')
+        self.assertEqual(response.status_code, 416)
+
+        # A stale If-Range falls back to the full body
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(MEDIA_OFFLOAD='x-accel-redirect', MEDIA_OFFLOAD_PREFIX='/protected-media/')
+    def test_offload(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/task_attachments/clip.png')
+        self.assertEqual(response.content, b'')
+
+    def test_rejects_paths_outside_media_root(self):
+        response = self.client.get(reverse('tasks:media_file', args=['../settings.py']))
+        self.assertEqual(response.status_code, 404)
+
+
+def png_bytes(size=(800, 600)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'teal').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(THUMBNAIL_ASYNC=False)
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.user = make_user('member@example.com')
+        self.task = Task.objects.create(title='Screenshot', assigned_to=self.user, assigned_by=self.user)
+        self.image = png_bytes()
+
+    def add_comment(self, name='shot.png', content=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return TaskComment.objects.create(
+                task=self.task, author=self.user, message='See attached',
+                attachment=SimpleUploadedFile(name, self.image if content is None else content),
+            )
+
+    def test_upload_generates_hashed_thumbnails(self):
+        comment = self.add_comment()
+        self.assertEqual(len(comment.attachment_hash), 64)
+        self.assertIn(comment.attachment_hash, comment.thumbnail_name)
+
+        for size, bounds in thumbnails.THUMBNAIL_SIZES.items():
+            path = Path(self.media_root, thumbnails.thumbnail_name(comment.attachment_hash, size))
+            with Image.open(path) as thumbnail:
+                self.assertLessEqual(thumbnail.width, bounds[0])
+                self.assertLessEqual(thumbnail.height, bounds[1])
+
+    def test_non_images_have_no_thumbnail(self):
+        comment = self.add_comment('notes.txt', b'plain text')
+        self.assertTrue(comment.attachment_hash)
+        self.assertIsNone(comment.thumbnail_name)
+        self.assertFalse(Path(self.media_root, thumbnails.THUMBNAIL_DIR).exists())
+
+    def test_served_immutable_and_generated_lazily(self):
+        comment = self.add_comment()
+        shutil.rmtree(Path(self.media_root, thumbnails.THUMBNAIL_DIR))
+
+        response = self.client.get(reverse('tasks:media_file', args=[comment.thumbnail_name]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        with Image.open(io.BytesIO(b''.join(response.streaming_content))) as thumbnail:
+            self.assertEqual(thumbnail.size, (320, 240))
+
+        unknown = thumbnails.thumbnail_name('0' * 64, 'small')
+        self.assertEqual(self.client.get(reverse('tasks:media_file', args=[unknown])).status_code, 404)
+
+    def test_decompression_bomb_gets_no_thumbnail(self):
+        comment = self.add_comment()
+        shutil.rmtree(Path(self.media_root, thumbnails.THUMBNAIL_DIR))
+
+        # Pillow refuses images over twice MAX_IMAGE_PIXELS
+        with patch.object(Image, 'MAX_IMAGE_PIXELS', 100), self.assertLogs('tasks.thumbnails', 'ERROR'):
+            response = self.client.get(reverse('tasks:media_file', args=[comment.thumbnail_name]))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Path(self.media_root, comment.thumbnail_name).exists())
+
+    def test_backfill_command(self):
+        comment = self.add_comment()
+        TaskComment.objects.filter(pk=comment.pk).update(attachment_hash='')
+        shutil.rmtree(Path(self.media_root, thumbnails.THUMBNAIL_DIR))
+
+        call_command('generate_thumbnails', stdout=io.StringIO())
+        comment.refresh_from_db()
+        self.assertTrue(Path(self.media_root, comment.thumbnail_name).exists())
+        self.assertTrue(Path(self.media_root, comment.preview_name).exists())
+
+
+class TaskDetailTests(TestCase):
+    def setUp(self):
+        self.manager = make_user('pm@example.com', team='PROJECT_MANAGER')
+        self.member = make_user('dev@example.com')
+        self.task = Task.objects.create(
+            title='Ship it', assigned_to=self.member, assigned_by=self.manager, team='TECH'
+        )
+        self.url = reverse('tasks:task_detail', args=[self.task.pk])
+        self.client.force_login(self.member)
+
+    def add_comments(self, count):
+        TaskComment.objects.bulk_create(
+            TaskComment(task=self.task, author=[self.member, self.manager][i % 2], message=f'Update {i}')
+            for i in range(count)
+        )
+
+    def test_query_count_is_independent_of_comment_count(self):
+        self.add_comments(3)
+        self.client.get(self.url)  # warm the session and unread-count caches
+        # User, task with both assignees, one page of comments with authors
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+        self.add_comments(200)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context['comments']), 20)
+        self.assertContains(response, 'Older comments')
+
+    def test_comment_pages(self):
+        self.add_comments(25)
+        first = self.client.get(self.url).context['comments']
+        second = self.client.get(self.url, {'cursor': first.next_cursor}).context['comments']
+        self.assertEqual(len(second), 5)
+        self.assertFalse(second.has_next)
+        ids = [c.pk for c in first] + [c.pk for c in second]
+        self.assertEqual(sorted(ids), sorted(TaskComment.objects.values_list('pk', flat=True)))
+
+    def test_comments_since_cursor(self):
+        self.add_comments(3)
+        response = self.client.get(self.url)
+        cursor = response.context['newer_cursor']
+
+        data = self.client.get(reverse('tasks:task_comments', args=[self.task.pk]), {'cursor': cursor}).json()
+        self.assertEqual(data['results'], [])
+        self.assertEqual(data['newer_cursor'], cursor)
+
+        self.add_comments(2)
+        data = self.client.get(reverse('tasks:task_comments', args=[self.task.pk]), {'cursor': cursor}).json()
+        self.assertEqual([c['message'] for c in data['results']], ['Update 1', 'Update 0'])
+        self.assertIn(f'data-comment-id="{data["results"][0]["id"]}"', data['results'][0]['html'])
+        self.assertNotEqual(data['newer_cursor'], cursor)
+
+    def test_older_comments_json(self):
+        self.add_comments(25)
+        first = self.client.get(self.url).context['comments']
+        data = self.client.get(
+            reverse('tasks:task_comments', args=[self.task.pk]), {'cursor': first.next_cursor}
+        ).json()
+        self.assertEqual(len(data['results']), 5)
+        self.assertIsNone(data['next_cursor'])
+
+    def test_ajax_comment_returns_fragment(self):
+        response = self.client.post(
+            reverse('tasks:task_add_comment', args=[self.task.pk]),
+            {'comment_type': 'PROGRESS', 'message': 'Halfway there'},
+            headers={'X-Requested-With': 'XMLHttpRequest'},
+        )
+        self.assertEqual(response.status_code, 201)
+        comment = TaskComment.objects.get()
+        self.assertContains(response, f'data-comment-id="{comment.pk}"', status_code=201)
+        self.assertNotContains(response, '<html', status_code=201)
+
+        response = self.client.post(
+            reverse('tasks:task_add_comment', args=[self.task.pk]), {'message': ' '},
+            headers={'X-Requested-With': 'XMLHttpRequest'},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_comments_json_checks_permission(self):
+        self.client.force_login(make_user('other@example.com'))
+        response = self.client.get(reverse('tasks:task_comments', args=[self.task.pk]))
+        self.assertEqual(response.status_code, 403)
+
+
+class QueryInstrumentationTests(TestCase):
+    def setUp(self):
+        self.member = make_user('dev@example.com')
+        self.task = Task.objects.create(title='Ship it', assigned_to=self.member, assigned_by=self.member, team='TECH')
+        self.url = reverse('tasks:task_detail', args=[self.task.pk])
+        self.client.force_login(self.member)
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        header = self.client.get(self.url)['Server-Timing']
+        self.assertRegex(header, r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn('total;dur=', header)
+        # Timed by core.middleware.InstrumentedDjangoTemplates
+        self.assertRegex(header, r'render;dur=(?!0\.0\b)[\d.]+')
+
+    @override_settings(QUERY_BUDGETS={'tasks:task_detail': 1}, QUERY_BUDGET_STRICT=True)
+    def test_budget_exceeded_fails(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'tasks:task_detail ran'):
+            self.client.get(self.url)
+
+    @override_settings(QUERY_BUDGETS={'tasks:task_detail': 1}, QUERY_BUDGET_STRICT=False)
+    def test_budget_exceeded_logs_when_not_strict(self):
+        with self.assertLogs('core.middleware', 'WARNING') as logs:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('over its budget of 1', logs.output[0])
+
+    def test_duplicate_queries_are_flagged_with_stack(self):
+        collector = RequestQueries(duplicate_threshold=3)
+        with connection.execute_wrapper(collector):
+            for comment_id in range(5):
+                list(TaskComment.objects.filter(pk=comment_id))
+        self.assertEqual(collector.count, 5)
+        [(sql, stack)] = collector.duplicates.items()
+        self.assertEqual(collector.statements[sql], 5)
+        self.assertIn('test_duplicate_queries_are_flagged_with_stack', stack)
+
+
+class SeedAndBenchmarkTests(TestCase):
+    def seed(self):
+        return seeding.seed(users=20, tasks=100, comments=50, notifications=100, attendance_days=2, batch_size=30)
+
+    def test_seed_is_reproducible_and_clearable(self):
+        inserted = self.seed()
+        # Every seeded task gets a creation event, and most a status change or two
+        self.assertGreater(inserted.pop('task events'), 100)
+        self.assertEqual(inserted, {
+            'users': 20, 'tasks': 100, 'comments': 50, 'notifications': 100, 'attendance': 50,
+        })
+        self.assertEqual(TaskEvent.objects.filter(field=TaskEvent.CREATED).count(), 100)
+        first = list(Task.objects.order_by('title').values_list('title', 'assigned_to__email', 'status'))
+        self.assertEqual(len(first), 100)
+
+        # Per-row deletes leave the index alone; clear() rebuilds it once
+        with patch('tasks.signals.get_search_backend') as signal_backend:
+            deleted = seeding.clear()
+        signal_backend.assert_not_called()
+        self.assertEqual(deleted['users'], 20 + seeding.MANAGERS)
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(User.objects.exists())
+
+        self.seed()
+        second = list(Task.objects.order_by('title').values_list('title', 'assigned_to__email', 'status'))
+        self.assertEqual(first, second)
+
+    def test_benchmark_views_reports_every_endpoint(self):
+        self.seed()
+        output = Path(tempfile.mkdtemp()) / 'bench.json'
+        self.addCleanup(shutil.rmtree, output.parent)
+        call_command('benchmark_views', '--repeat', '2', '--warmup', '0', '--output', str(output), stdout=io.StringIO())
+
+        report = json.loads(output.read_text())
+        self.assertEqual(report['meta']['rows']['tasks'], 100)
+        for label, row in report['results'].items():
+            self.assertEqual(row['status'], 200, label)
+            if row['query_budget'] is not None:
+                self.assertLessEqual(row['queries'], row['query_budget'], label)
+            self.assertLessEqual(row['p50_ms'], row['p95_ms'])
+        # Write endpoints only run with --allow-writes
+        self.assertNotIn('mark_attendance', report['results'])
+
+        out = io.StringIO()
+        call_command('benchmark_views', '--repeat', '1', '--warmup', '0', '--only', 'task_list',
+                     '--compare', str(output), stdout=out)
+        self.assertIn('queries', out.getvalue())
+
+    def test_benchmark_views_rolls_back_writes(self):
+        self.seed()
+        notifications = Notification.objects.count()
+        output = Path(tempfile.mkdtemp()) / 'bench.json'
+        self.addCleanup(shutil.rmtree, output.parent)
+        with self.captureOnCommitCallbacks() as callbacks:
+            call_command('benchmark_views', '--repeat', '2', '--warmup', '0', '--only', 'mark_attendance',
+                         '--allow-writes', '--output', str(output), stdout=io.StringIO())
+
+        self.assertEqual(json.loads(output.read_text())['results']['mark_attendance']['status'], 200)
+        self.assertFalse(AttendanceRecord.objects.filter(date=MARK_DATE).exists())
+        self.assertEqual(Notification.objects.count(), notifications)
+        # Nothing is left to publish
+        self.assertEqual(callbacks, [])
+
+    def test_benchmark_views_needs_allow_writes_for_post_endpoints(self):
+        self.seed()
+        with self.assertRaisesMessage(CommandError, '--allow-writes'):
+            call_command('benchmark_views', '--only', 'mark_attendance', stdout=io.StringIO())
+
+
+class TaskApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.manager = make_user('pm@example.com', team='PROJECT_MANAGER')
+        self.member = make_user('dev@example.com')
+        self.url = reverse('api:task-list')
+        self.client.force_login(self.manager)
+
+    def add_tasks(self, count, **extra):
+        Task.objects.bulk_create(
+            Task(title=f'Task {i}', assigned_to=self.member, assigned_by=self.manager, team='TECH', **extra)
+            for i in range(count)
+        )
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        self.add_tasks(3)
+        self.client.get(self.url)  # warm the session and cache versions
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url)
+        self.add_tasks(120)
+        with CaptureQueriesContext(connection) as large:
+            data = self.client.get(self.url).json()
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertEqual(len(data['results']), 50)
+        self.assertEqual(data['results'][0]['assigned_to']['email'], 'dev@example.com')
+        self.assertIn('cursor=', data['next'])
+
+        seen = []
+        url = self.url
+        while url:
+            page = self.client.get(url).json()
+            seen.extend(row['id'] for row in page['results'])
+            url = page['next']
+        self.assertEqual(sorted(seen), sorted(Task.objects.values_list('pk', flat=True)))
+
+    def test_filters(self):
+        self.add_tasks(2, status='PENDING', priority='HIGH')
+        self.add_tasks(3, status='COMPLETED', due_date=date(2025, 1, 10))
+        self.add_tasks(1, status='BLOCKED', due_date=date(2025, 3, 1))
+
+        def ids(**params):
+            return len(self.client.get(self.url, params).json()['results'])
+
+        self.assertEqual(ids(status='PENDING,BLOCKED'), 3)
+        self.assertEqual(ids(priority='HIGH'), 2)
+        self.assertEqual(ids(team='DESIGN'), 0)
+        self.assertEqual(ids(due_date='2025-01-10'), 3)
+        self.assertEqual(ids(due_after='2025-02-01'), 1)
+        self.assertEqual(ids(due_before='2025-02-01', status='COMPLETED'), 3)
+
+        response = self.client.get(self.url, {'due_after': 'soon', 'due_before': '2025-02-30'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'due_after', 'due_before'})
+
+    def test_sparse_fields(self):
+        self.add_tasks(1)
+        with CaptureQueriesContext(connection) as queries:
+            row = self.client.get(self.url, {'fields': 'id,title,status'}).json()['results'][0]
+        self.assertEqual(set(row), {'id', 'title', 'status'})
+        self.assertNotIn('JOIN', queries.captured_queries[-1]['sql'])
+
+    def test_members_see_only_their_tasks(self):
+        self.add_tasks(2)
+        other = make_user('other@example.com')
+        Task.objects.create(title='Not yours', assigned_to=other, assigned_by=self.manager, team='TECH')
+        self.client.force_login(self.member)
+        self.assertEqual(len(self.client.get(self.url).json()['results']), 2)
+        task = Task.objects.get(title='Not yours')
+        self.assertEqual(self.client.get(reverse('api:task-detail', args=[task.pk])).status_code, 404)
+
+    @override_settings(API_ETAGS=True)
+    def test_conditional_get(self):
+        self.add_tasks(2)
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+
+        # Only the session user is loaded; no task query
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        task = Task.objects.first()
+        task.status = 'COMPLETED'
+        task.save()
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        detail = self.client.get(reverse('api:task-detail', args=[task.pk]))
+        self.assertEqual(detail.json()['status'], 'COMPLETED')
+        response = self.client.get(reverse('api:task-detail', args=[task.pk]), headers={'If-None-Match': detail['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(API_ETAGS=False)
+    def test_no_etags_without_a_shared_cache(self):
+        self.add_tasks(1)
+        response = self.client.get(self.url, headers={'If-None-Match': '*'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertIn(self.client.get(self.url).status_code, (401, 403))
+
+
+class BulkTaskApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.manager = make_user('pm@example.com', team='PROJECT_MANAGER')
+        self.member = make_user('dev@example.com')
+        self.other = make_user('other@example.com')
+        self.url = reverse('api:task-bulk')
+        self.client.force_login(self.manager)
+
+    def add_tasks(self, count, assignee=None, **extra):
+        Task.objects.bulk_create(
+            Task(title=f'Task {i}', assigned_to=assignee or self.member, assigned_by=self.manager, team='TECH', **extra)
+            for i in range(count)
+        )
+        get_search_backend().rebuild()
+        return list(Task.objects.order_by('pk').values_list('pk', flat=True))
+
+    def post(self, operations):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, {'operations': operations}, content_type='application/json')
+
+    def test_applies_every_kind_of_operation(self):
+        first, second, third = self.add_tasks(3)
+        response = self.post([
+            {'op': 'create', 'title': 'Imported spec', 'assigned_to': self.member.pk, 'due_date': '2025-05-01'},
+            {'op': 'update', 'id': first, 'status': 'done', 'priority': 'High'},
+            {'op': 'reassign', 'id': second, 'assigned_to': self.other.pk},
+            {'op': 'delete', 'id': third},
+        ])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['counts'], {'create': 1, 'update': 1, 'reassign': 1, 'delete': 1})
+        created = Task.objects.get(pk=data['results'][0]['id'])
+        self.assertEqual((created.title, created.assigned_by, created.due_date), ('Imported spec', self.manager, date(2025, 5, 1)))
+        # Choices are stored as the uppercase codes, whatever the spelling sent
+        self.assertEqual(Task.objects.filter(pk=first).values_list('status', 'priority').get(), ('COMPLETED', 'HIGH'))
+        self.assertEqual(Task.objects.get(pk=second).assigned_to, self.other)
+        self.assertFalse(Task.objects.filter(pk=third).exists())
+
+        # The search index follows the bulk writes
+        backend = get_search_backend()
+        self.assertEqual(list(backend.search(Task.objects.all(), 'imported').values_list('pk', flat=True)), [created.pk])
+
+        messages = dict(Notification.objects.values_list('recipient__email', 'message'))
+        self.assertEqual(messages, {
+            'dev@example.com': 'Task "Imported spec" has been assigned to you by pm',
+            'other@example.com': 'Task "Task 1" has been assigned to you by pm',
+            'pm@example.com': 'Task "Task 0" has been completed by dev',
+        })
+
+    def test_invalid_operation_writes_nothing(self):
+        first, second = self.add_tasks(2)
+        response = self.post([
+            {'op': 'reassign', 'id': first, 'assigned_to': self.other.pk},
+            {'op': 'create', 'title': 'No assignee'},
+            {'op': 'update', 'id': second},
+            {'op': 'archive', 'id': second},
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['operations']
+        self.assertEqual(set(errors), {'1', '2', '3'})
+        self.assertIn('assigned_to', errors['1'])
+
+        # Ids are checked once every operation is well formed
+        response = self.post([
+            {'op': 'reassign', 'id': first, 'assigned_to': self.other.pk},
+            {'op': 'delete', 'id': 999999},
+            {'op': 'delete', 'id': first},
+            {'op': 'reassign', 'id': second, 'assigned_to': 999999},
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['operations']
+        self.assertEqual(set(errors), {'1', '2', '3'})
+        self.assertIn('already changed by operation 0', errors['2']['id'])
+        self.assertEqual(Task.objects.filter(assigned_to=self.member).count(), 2)
+        self.assertFalse(Notification.objects.exists())
+
+        response = self.post([
+            {'op': 'update', 'id': first, 'status': 'bogus'},
+            {'op': 'update', 'id': second, 'priority': 'LOW', 'team': 'ACCOUNTING'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['operations']
+        self.assertEqual(errors['0'], {'status': ['Unknown status "bogus".']})
+        self.assertEqual(errors['1'], {'team': ['Unknown team "ACCOUNTING".']})
+        self.assertEqual(set(Task.objects.values_list('status', flat=True)), {'PENDING'})
+
+    def test_query_count_is_independent_of_size(self):
+        def reassign(count, assignee):
+            ids = self.add_tasks(count, assignee=self.member)[-count:]
+            operations = [{'op': 'reassign', 'id': pk, 'assigned_to': assignee.pk} for pk in ids]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post(operations)
+            self.assertEqual(response.json()['counts']['reassign'], count)
+            return [query['sql'] for query in queries.captured_queries]
+
+        def rows(sql):
+            """Rows written by one multi-row INSERT, or updated by one bulk UPDATE ... WHERE id IN (...)"""
+            if sql.startswith('INSERT'):
+                return sql.count('), (') + 1
+            return sql.rsplit(' IN (', 1)[1].count(',') + 1
+
+        self.client.get(reverse('api:task-list'))  # warm the session
+        small, large = reassign(3, self.other), reassign(200, self.other)
+        self.assertEqual(Task.objects.filter(assigned_to=self.other).count(), 203)
+
+        # The backend's parameter limit (999 on SQLite) may split the bulk
+        # writes into full batches; everything else runs once per request
+        batched = ('INSERT INTO "tasks_taskevent"', 'UPDATE "tasks_task"')
+        for prefix in batched:
+            self.assertEqual(len([sql for sql in small if sql.startswith(prefix)]), 1)
+            statements = [sql for sql in large if sql.startswith(prefix)]
+            self.assertEqual(sum(rows(sql) for sql in statements), 200, prefix)
+            self.assertEqual(len(statements), -(-200 // rows(statements[0])), prefix)
+        self.assertEqual(
+            len([sql for sql in small if not sql.startswith(batched)]),
+            len([sql for sql in large if not sql.startswith(batched)]),
+        )
+        # One message per assignee, not per task
+        self.assertEqual(
+            list(Notification.objects.filter(recipient=self.other).order_by('pk').values_list('message', flat=True)),
+            ['3 tasks have been assigned to you by pm', '200 tasks have been assigned to you by pm'],
+        )
+
+    def test_project_managers_only(self):
+        [task] = self.add_tasks(1)
+        self.client.force_login(self.member)
+        response = self.post([{'op': 'delete', 'id': task}])
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Task.objects.filter(pk=task).exists())
+
+
+class TaskImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.manager = make_user('pm@example.com', team='PROJECT_MANAGER')
+        self.member = make_user('dev@example.com')
+        self.other = make_user('other@example.com')
+        self.client.force_login(self.manager)
+
+    def csv_file(self, rows, header='title,assigned_to,status,priority,team,due_date'):
+        return '\n'.join([header] + rows) + '\n'
+
+    def test_command_batches_and_reports_errors(self):
+        rows = [f'Task {i},DEV@example.com,todo,High,design,2025-06-01' for i in range(25)]
+        rows += [
+            ',dev@example.com,,,,',
+            'Ghost,nobody@example.com,,,,',
+            'Odd,other@example.com,someday,urgent,TECH,2025-13-01',
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as source:
+            source.write(self.csv_file(rows))
+        self.addCleanup(Path(source.name).unlink)
+
+        out = io.StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('import_tasks', source.name, '--as', 'pm@example.com', '--batch-size', '10',
+                         '--json', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual((report['rows'], report['created'], report['failed']), (28, 25, 3))
+        self.assertEqual([error['line'] for error in report['errors']], [27, 28, 29])
+        self.assertEqual(set(report['errors'][2]['errors']), {'status', 'due_date'})
+        self.assertIn('rows_per_second', report)
+
+        task = Task.objects.get(title='Task 0')
+        self.assertEqual(
+            (task.assigned_to, task.assigned_by, task.status, task.priority, task.team, task.due_date),
+            (self.member, self.manager, 'PENDING', 'HIGH', 'DESIGN', date(2025, 6, 1)),
+        )
+        # Users are looked up once, not per row; one INSERT and transaction per batch of 10
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "tasks_task"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(sum(q['sql'].startswith('SAVEPOINT') for q in queries.captured_queries), 3)
+        self.assertEqual(sum('FROM "accounts_user"' in q['sql'] for q in queries.captured_queries), 2)
+
+    def test_strict_and_dry_run_write_nothing(self):
+        content = self.csv_file(['Fine,dev@example.com,,,,', 'Bad,dev@example.com,,,,tomorrow'])
+        for flag in ('--strict', '--dry-run'):
+            with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as source:
+                source.write(content)
+            self.addCleanup(Path(source.name).unlink)
+            call_command('import_tasks', source.name, flag, stdout=io.StringIO())
+        self.assertFalse(Task.objects.exists())
+
+    def test_reads_back_an_export(self):
+        Task.objects.create(title='=1+1', description='-keep the dash', assigned_to=self.member, assigned_by=self.manager)
+        exported = b''.join(exports.export('tasks', 'csv')).decode('utf-8-sig')
+        Task.objects.all().delete()
+
+        report = imports.import_tasks(io.StringIO(exported))
+        self.assertEqual(report.created, 1, report.errors)
+        task = Task.objects.get()
+        self.assertEqual((task.title, task.description, task.assigned_by), ('=1+1', '-keep the dash', self.manager))
+
+    def test_upload_endpoint(self):
+        upload = SimpleUploadedFile('sprint.csv', self.csv_file([
+            'Write spec,dev@example.com,,,,',
+            'Review spec,dev@example.com,in progress,low,,',
+            'Ship it,other@example.com,,,,',
+        ], header='Title,Assignee email,Status,Priority,Team,Due date').encode('utf-8-sig'))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('api:task-import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 3)
+        self.assertEqual(Task.objects.get(title='Review spec').status, 'IN_PROGRESS')
+        self.assertEqual(get_search_backend().search(Task.objects.all(), 'spec').count(), 2)
+        self.assertEqual(
+            dict(Notification.objects.values_list('recipient__email', 'message')),
+            {
+                'dev@example.com': '2 tasks have been assigned to you by pm',
+                'other@example.com': 'Task "Ship it" has been assigned to you by pm',
+            },
+        )
+
+        response = self.client.post(reverse('api:task-import'), {'file': SimpleUploadedFile('x.csv', b'name\nfoo\n')})
+        self.assertEqual(response.status_code, 400)
+        self.client.force_login(self.member)
+        upload.seek(0)
+        self.assertEqual(self.client.post(reverse('api:task-import'), {'file': upload}).status_code, 403)
+
+
+class TaskEventTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.manager = make_user('pm@example.com', team='PROJECT_MANAGER')
+        self.member = make_user('dev@example.com')
+        self.other = make_user('other@example.com')
+        self.client.force_login(self.manager)
+
+    def fields(self, task):
+        return [
+            (events.FIELD_NAMES[event.field], events.decode(event.field, event.old_value),
+             events.decode(event.field, event.new_value), event.actor)
+            for event in task.events.order_by('pk')
+        ]
+
+    def test_views_record_field_diffs(self):
+        self.client.post(reverse('tasks:task_create'), {
+            'title': 'Audit me', 'assigned_to': self.member.pk, 'priority': 'MEDIUM',
+        })
+        task = Task.objects.get(title='Audit me')
+        self.client.post(reverse('tasks:task_update', args=[task.pk]), {
+            'title': 'Audit me please', 'status': 'IN_PROGRESS', 'priority': 'HIGH', 'team': 'TECH',
+            'due_date': '2025-03-01', 'assigned_to': self.other.pk,
+        })
+        self.client.force_login(self.other)
+        self.client.post(reverse('tasks:task_status_update', args=[task.pk]), {'status': 'done'})
+
+        self.assertEqual(self.fields(task), [
+            ('created', None, 'PENDING', self.manager),
+            ('status', 'PENDING', 'IN_PROGRESS', self.manager),
+            ('assigned_to', self.member.pk, self.other.pk, self.manager),
+            ('priority', 'MEDIUM', 'HIGH', self.manager),
+            ('due_date', None, '2025-03-01', self.manager),
+            ('status', 'IN_PROGRESS', 'COMPLETED', self.other),
+        ])
+        event = task.events.first()
+        with self.assertRaises(ValueError):
+            event.save()
+
+    def test_bulk_and_import_paths_record_events(self):
+        task = Task.objects.create(title='Old', assigned_to=self.member, assigned_by=self.manager)
+        self.client.post(reverse('api:task-bulk'), {'operations': [
+            {'op': 'create', 'title': 'New', 'assigned_to': self.member.pk},
+            {'op': 'reassign', 'id': task.pk, 'assigned_to': self.other.pk},
+        ]}, content_type='application/json')
+        self.assertEqual(self.fields(Task.objects.get(title='New')), [('created', None, 'PENDING', self.manager)])
+        self.assertEqual(self.fields(task), [('assigned_to', self.member.pk, self.other.pk, self.manager)])
+
+        imports.import_tasks(['title,assigned_to,status', 'Imported,dev@example.com,review'], assigned_by=self.manager)
+        self.assertEqual(self.fields(Task.objects.get(title='Imported')), [('created', None, 'REVIEW', self.manager)])
+
+    def test_timeline_endpoint(self):
+        task = Task.objects.create(title='Track', assigned_to=self.member, assigned_by=self.manager)
+        events.record_created(task, self.manager)
+        before = events.snapshot(task)
+        task.status = 'BLOCKED'
+        task.save()
+        events.record(task, before, self.member)
+
+        url = reverse('api:task-timeline', args=[task.pk])
+        data = self.client.get(url).json()
+        self.assertEqual([(row['field'], row['old'], row['new']) for row in data['results']], [
+            ('status', 'PENDING', 'BLOCKED'),
+            ('created', None, 'PENDING'),
+        ])
+        self.assertEqual(data['results'][0]['actor']['email'], 'dev@example.com')
+
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_analytics_from_events(self):
+        start = timezone.now() - timedelta(days=10)
+        fast, slow, open_task = (
+            Task.objects.create(title=title, assigned_to=self.member, assigned_by=self.manager, team=team)
+            for title, team in (('Fast', 'TECH'), ('Slow', 'TECH'), ('Open', 'DESIGN'))
+        )
+        code = events.STATUS_CODES
+
+        def status(task, hours, new, field=TaskEvent.STATUS):
+            TaskEvent.objects.create(task=task, field=field, new_value=code[new], created_at=start + timedelta(hours=hours))
+
+        for task in (fast, slow, open_task):
+            status(task, 0, 'PENDING', field=TaskEvent.CREATED)
+        status(fast, 2, 'IN_PROGRESS')
+        status(fast, 6, 'COMPLETED')
+        status(slow, 10, 'COMPLETED')  # never started; measured from creation
+        status(open_task, 1, 'IN_PROGRESS')
+
+        self.assertEqual(events.cycle_times(), {fast.pk: 4.0, slow.pk: 10.0})
+        now = start + timedelta(hours=20)
+        totals = events.time_in_status(now=now)
+        # Fast 2h + Slow 10h + Open 1h pending; Fast 4h + Open 19h in progress
+        self.assertEqual(totals['PENDING'], {'tasks': 3, 'total_hours': 13.0, 'mean_hours': 4.33})
+        self.assertEqual(totals['IN_PROGRESS'], {'tasks': 2, 'total_hours': 23.0, 'mean_hours': 11.5})
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(reverse('api:task-analytics'), {'team': 'TECH'}).json()
+        self.assertEqual(data['cycle_time']['tasks'], 2)
+        self.assertEqual(data['cycle_time']['median_hours'], 7.0)
+        self.assertEqual(data['time_in_status']['PENDING']['tasks'], 2)
+        self.assertNotIn('tasks_taskcomment', ' '.join(q['sql'] for q in queries.captured_queries))
@@ -0,0 +1,152 @@
+"""
+Derivative images (thumbnails/previews) for comment attachments
+
+Thumbnails live under MEDIA_ROOT/thumbnails/ and are named after the
+SHA-256 of the original file, so a URL never changes meaning and can be
+cached as immutable. They are generated off the request thread after an
+upload commits, or lazily by MediaFileView on first request.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = 'thumbnails'
+
+# Bounding boxes; images are scaled down to fit, never up
+THUMBNAIL_SIZES = {
+    'small': (320, 320),
+    'large': (1280, 1280),
+}
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp')
+
+THUMBNAIL_RE = re.compile(
+    rf'^{THUMBNAIL_DIR}/[0-9a-f]{{2}}/(?P<hash>[0-9a-f]{{64}})-(?P<size>{"|".join(THUMBNAIL_SIZES)})\.(?:webp|jpg)$'
+)
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='thumbnails')
+_output_format = None
+
+
+def output_format():
+    """('WEBP', 'webp') when Pillow was built with WebP support, else ('JPEG', 'jpg')"""
+    global _output_format
+    if _output_format is None:
+        from PIL import features
+        _output_format = ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+    return _output_format
+
+
+def decode_errors():
+    """Exceptions for images Pillow can't, or won't, decode (e.g. decompression bombs)"""
+    from PIL import Image
+    return (OSError, ValueError, Image.DecompressionBombError)
+
+
+def is_image_name(name):
+    return bool(name) and name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def file_hash(field_file):
+    """SHA-256 of a FieldFile or UploadedFile, read in chunks"""
+    digest = hashlib.sha256()
+    field_file.seek(0)
+    for chunk in field_file.chunks():
+        digest.update(chunk)
+    field_file.seek(0)
+    return digest.hexdigest()
+
+
+def thumbnail_name(content_hash, size):
+    """Path relative to MEDIA_ROOT, e.g. thumbnails/ab/ab12...-small.webp"""
+    extension = output_format()[1]
+    return f'{THUMBNAIL_DIR}/{content_hash[:2]}/{content_hash}-{size}.{extension}'
+
+
+def generate_thumbnails(comment):
+    """Write every missing size for comment's image attachment; returns the number written"""
+    from PIL import Image, ImageOps
+
+    if not comment.attachment_hash or not is_image_name(comment.attachment.name):
+        return 0
+
+    pending = {
+        size: Path(settings.MEDIA_ROOT) / thumbnail_name(comment.attachment_hash, size)
+        for size in THUMBNAIL_SIZES
+    }
+    pending = {size: target for size, target in pending.items() if not target.exists()}
+    if not pending:
+        return 0
+
+    image_format, _ = output_format()
+    written = 0
+    with Image.open(comment.attachment.path) as image:
+        image = ImageOps.exif_transpose(image)
+        for size, target in pending.items():
+            thumbnail = image.copy()
+            thumbnail.thumbnail(THUMBNAIL_SIZES[size])
+            if image_format == 'JPEG' and thumbnail.mode not in ('RGB', 'L'):
+                thumbnail = thumbnail.convert('RGB')
+
+            # Write to a temporary file first so readers never see a partial image
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    thumbnail.save(f, image_format, quality=80)
+                os.replace(temp_path, target)
+            except Exception:
+                os.unlink(temp_path)
+                raise
+            written += 1
+    return written
+
+
+def _generate_in_background(comment_id):
+    from .models import TaskComment
+    try:
+        comment = TaskComment.objects.filter(pk=comment_id).first()
+        if comment:
+            generate_thumbnails(comment)
+    except Exception:
+        logger.exception('Thumbnail generation failed for comment %s', comment_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_thumbnails(comment):
+    """Generate thumbnails off the request thread, or inline if THUMBNAIL_ASYNC is False"""
+    if getattr(settings, 'THUMBNAIL_ASYNC', True):
+        _executor.submit(_generate_in_background, comment.pk)
+    else:
+        generate_thumbnails(comment)
+
+
+def ensure_thumbnail(file_path):
+    """
+    Generate a requested thumbnail on demand. Returns True if file_path is a
+    thumbnail that now exists on disk.
+    """
+    from .models import TaskComment
+
+    match = THUMBNAIL_RE.match(file_path)
+    if not match:
+        return False
+    comment = TaskComment.objects.filter(attachment_hash=match['hash']).exclude(attachment='').first()
+    if comment is None:
+        return False
+    try:
+        generate_thumbnails(comment)
+    except decode_errors():
+        logger.exception('Could not generate %s', file_path)
+        return False
+    return (Path(settings.MEDIA_ROOT) / file_path).exists()
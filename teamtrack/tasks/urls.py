@@ -12,5 +12,6 @@ urlpatterns = [
     path("<int:pk>/delete/", views.task_delete, name="task_delete"),
     path("<int:pk>/status/", views.task_status_update, name="task_status_update"),
     path("<int:pk>/comment/", views.task_add_comment, name="task_add_comment"),
+    path("<int:pk>/comments/", views.task_comments, name="task_comments"),
     path("media/<path:file_path>", MediaFileView.as_view(), name="media_file"),
 ]
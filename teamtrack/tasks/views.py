@@ -3,9 +3,11 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Q
 from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from django.template.loader import render_to_string
 from django.conf import settings
 from django.db import transaction
+from . import events
 from .models import Task, TaskComment
 from accounts.models import User
 from notifications.models import Notification
@@ -14,6 +16,10 @@ from core.utils import (
     get_context_with_filters, handle_task_creation
 )
 from core.constants import ITEMS_PER_PAGE
+from core.pagination import PREVIOUS, cursor_paginate, decode_cursor, encode_cursor
+from core.search import get_search_backend
+
+COMMENTS_PER_PAGE = 20
 
 @login_required
 def task_list(request):
@@ -27,13 +33,11 @@ def task_list(request):
         tasks = Task.objects.all()
     else:
         tasks = Task.objects.filter(assigned_to=request.user)
+    tasks = tasks.select_related('assigned_to', 'assigned_by')
     
     # Apply filters
     if search_query:
-        tasks = tasks.filter(
-            Q(title__icontains=search_query) | 
-            Q(description__icontains=search_query)
-        )
+        tasks = get_search_backend().search(tasks, search_query)
     
     if status_filter:
         tasks = tasks.filter(status=status_filter)
@@ -41,11 +45,18 @@ def task_list(request):
     if priority_filter:
         tasks = tasks.filter(priority=priority_filter)
     
-    # Order by creation date (newest first)
-    tasks = tasks.order_by('-created_at')
+    # Search results are ranked, otherwise newest first
+    if search_query:
+        tasks = tasks.order_by('-search_rank', '-created_at')
+    else:
+        tasks = tasks.order_by('-created_at')
     
-    # Pagination using shared utility
-    page_obj = PaginationMixin.paginate_queryset(tasks, request, ITEMS_PER_PAGE)
+    # Pagination using shared utility: keyset cursors by default; ranked
+    # search results and legacy ?page=N links keep the offset paginator
+    pagination_mode = 'offset' if request.GET.get('page') or search_query else 'cursor'
+    page_obj = PaginationMixin.paginate_queryset(
+        tasks, request, ITEMS_PER_PAGE, mode=pagination_mode, count='approximate'
+    )
     
     # Get context with filters using shared utility
     context = get_context_with_filters(request, 
@@ -53,6 +64,7 @@ def task_list(request):
         tasks=page_obj,
         status_choices=Task.STATUS,
         priority_choices=Task.PRIORITY,
+        pagination_mode=pagination_mode,
     )
     
     return render(request, "tasks/task_list.html", context)
@@ -78,21 +90,32 @@ def task_create(request):
     }
     return render(request, 'tasks/task_create.html', context)
 
+def comment_page(task, cursor=None):
+    """One page of comments, newest first, authors joined in the same query"""
+    return cursor_paginate(task.comments.select_related('author'), cursor, COMMENTS_PER_PAGE)
+
+def newer_cursor(page, cursor=None):
+    """Token for fetching comments posted after the newest one in page"""
+    if page:
+        return encode_cursor(page.object_list[0], PREVIOUS)
+    position = decode_cursor(cursor)
+    return cursor if position and position[2] == PREVIOUS else None
+
 @login_required
 def task_detail(request, pk):
-    task = get_object_or_404(Task, pk=pk)
+    task = get_object_or_404(Task.objects.select_related('assigned_to', 'assigned_by'), pk=pk)
     
     # Check permissions using shared utility
     if not PermissionMixin.can_view_task(request.user, task):
         messages.error(request, 'You do not have permission to view this task.')
         return redirect('tasks:task_list')
     
-    # Get comments for this task
-    comments = task.comments.all()
+    comments = comment_page(task, request.GET.get('cursor'))
     
     context = {
         'task': task,
         'comments': comments,
+        'newer_cursor': newer_cursor(comments),
         'comment_types': TaskComment.COMMENT_TYPES,
     }
     return render(request, 'tasks/task_detail.html', context)
@@ -107,6 +130,7 @@ def task_update(request, pk):
         return redirect('tasks:task_list')
     
     if request.method == 'POST':
+        before = events.snapshot(task)
         task.title = request.POST.get('title', task.title)
         task.description = request.POST.get('description', task.description)
         task.status = request.POST.get('status', task.status)
@@ -123,7 +147,9 @@ def task_update(request, pk):
                 except User.DoesNotExist:
                     pass
         
-        task.save()
+        with transaction.atomic():
+            task.save()
+            events.record(task, before, request.user)
         
         # Create notification for status changes using shared utility
         if task.status == 'COMPLETED':
@@ -161,10 +187,11 @@ def task_delete(request, pk):
 @login_required
 def task_status_update(request, pk):
     """Allow team members to update their task status"""
-    task = get_object_or_404(Task, pk=pk)
+    # The notification names both users
+    task = get_object_or_404(Task.objects.select_related('assigned_to', 'assigned_by'), pk=pk)
     
     # Only allow the assigned user to update status
-    if task.assigned_to != request.user:
+    if task.assigned_to_id != request.user.pk:
         messages.error(request, 'You can only update tasks assigned to you.')
         return redirect('tasks:task_detail', pk=pk)
     
@@ -172,8 +199,11 @@ def task_status_update(request, pk):
         new_status = request.POST.get('status')
         if new_status in [choice[0] for choice in Task.STATUS]:
             old_status = task.status
+            before = events.snapshot(task)
             task.status = new_status
-            task.save()
+            with transaction.atomic():
+                task.save()
+                events.record(task, before, request.user)
             
             # Create notification using shared utility
             NotificationMixin.notify_status_change(task, old_status, new_status, request.user)
@@ -184,13 +214,48 @@ def task_status_update(request, pk):
     
     return redirect('tasks:task_detail', pk=pk)
 
+@login_required
+def task_comments(request, pk):
+    """
+    JSON page of comments with each one's rendered HTML. The cursor decides
+    the direction: next_cursor pages back through older comments, and
+    newer_cursor returns comments posted since, oldest batch first.
+    """
+    task = get_object_or_404(Task.objects.select_related('assigned_to'), pk=pk)
+    if not PermissionMixin.can_view_task(request.user, task):
+        return JsonResponse({'error': 'You do not have permission to view this task.'}, status=403)
+    
+    cursor = request.GET.get('cursor')
+    page = comment_page(task, cursor)
+    return JsonResponse({
+        'results': [
+            {
+                'id': comment.pk,
+                'author': comment.author.name,
+                'comment_type': comment.comment_type,
+                'message': comment.message,
+                'created_at': comment.created_at.isoformat(),
+                'html': render_to_string('tasks/comment.html', {'comment': comment}, request),
+            }
+            for comment in page
+        ],
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+        'newer_cursor': newer_cursor(page, cursor),
+    })
+
 @login_required
 def task_add_comment(request, pk):
     """Allow team members to add comments to their tasks"""
     task = get_object_or_404(Task, pk=pk)
     
+    # Posted from the detail page's script: answer with the new comment only
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    
     # Only allow the assigned user or manager to add comments
     if task.assigned_to != request.user and task.assigned_by != request.user:
+        if is_ajax:
+            return JsonResponse({'error': 'You can only comment on tasks assigned to you or created by you.'}, status=403)
         messages.error(request, 'You can only comment on tasks assigned to you or created by you.')
         return redirect('tasks:task_detail', pk=pk)
     
@@ -211,7 +276,12 @@ def task_add_comment(request, pk):
             # Create notification using shared utility
             NotificationMixin.notify_comment(task, comment, request.user)
             
+            if is_ajax:
+                html = render_to_string('tasks/comment.html', {'comment': comment}, request)
+                return HttpResponse(html, status=201)
             messages.success(request, 'Comment added successfully!')
+        elif is_ajax:
+            return JsonResponse({'error': 'Please enter a comment message.'}, status=400)
         else:
             messages.error(request, 'Please enter a comment message.')
     
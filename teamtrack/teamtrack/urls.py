@@ -25,6 +25,9 @@ urlpatterns = [
     path("notifications/", include(("notifications.urls", "notifications"), namespace="notifications")),
     path("dashboard/", include(("dashboard.urls", "dashboard"), namespace="dashboard")),
     path("attendance/", include(("attendance.urls", "attendance"), namespace="attendance")),
+
+    # REST API
+    path("api/v1/", include(("tasks.api_urls", "api"), namespace="api")),
 ]
 
 # Serve media files in development and production